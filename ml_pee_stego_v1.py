@@ -1,9 +1,11 @@
 import numpy as np
 import warnings
-from typing import Literal
-import math
+from typing import Literal, Sequence
 import time
 from utils.result import Result
+from utils.expansion import expansion_embed, expansion_extract
+from utils.key_sweep import PHASE_KEYS, iter_phase_keys, quality_metrics
+from utils.neighbours import predict_model
 
 # Disable only the specific NumPy deprecation warning
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -36,38 +38,8 @@ class MLPEEStego:
             if secret_key[phase - 1] == '0':
                 continue
 
-            for i in self.get_phase_indexes(phase, len(watermarked_data)):
-                if i + 4 >= len(watermarked_data):
-                    break
-
-                # Get error from predicted value and original value
-                original_value = watermarked_data[i+2]
-                predicted_value = int(self.model.predict(
-                    [[watermarked_data[i], watermarked_data[i+1], watermarked_data[i+3], watermarked_data[i+4]]]))
-                error_embedding = original_value - predicted_value
-
-                errors.append(error_embedding)
-
-                expanded_error = 0
-                # check threshold
-                if abs(error_embedding) < threshold:
-                    bit = 1 if secret_index < len(
-                        secret_data) and secret_data[secret_index] == '1' else 0
-                    expanded_error = 2*error_embedding + bit
-                    secret_index += 1
-                else:
-                    if error_embedding > 0:
-                        expanded_error = error_embedding + threshold
-                    else:
-                        expanded_error = error_embedding - threshold + 1
-
-                watermarked_value = predicted_value + expanded_error
-
-                # if (i + 2 == 8):
-                #     print('Index', i+2, 'Original', original_value, 'Predicted', predicted_value,
-                #           'Error Emb', error_embedding, 'Bit', bit, 'Watermark', watermarked_value)
-
-                watermarked_data[i+2] = watermarked_value
+            secret_index = self.embed_phase(watermarked_data, phase, secret_data,
+                                            secret_index, threshold, errors)
 
         end_time = time.time()
 
@@ -93,41 +65,73 @@ class MLPEEStego:
             if secret_key[phase - 1] == '0':
                 continue
 
-            for i in reversed(self.get_phase_indexes(phase, len(original_data))):
-                if i + 4 >= len(original_data):
-                    continue
-
-                # Get error from predicted value and watermarked value
-                watermarked_value = original_data[i+2]
-                predicted_value = int(self.model.predict(
-                    [[original_data[i], original_data[i+1], original_data[i+3], original_data[i+4]]]))
-                error_extraction = watermarked_value - predicted_value
-
-                # Check threshold
-                if error_extraction >= 2*threshold:
-                    original_value = watermarked_value - threshold
-                elif error_extraction <= -2*threshold + 1:
-                    original_value = watermarked_value + threshold - 1
-                else:
-                    # Extract the watermark bit
-                    bit = error_extraction - 2 * \
-                        math.floor(error_extraction / 2)
-
-                    # Get the original value
-                    original_value = watermarked_value - \
-                        math.floor(error_extraction / 2) - bit
-                    secret_data = ('1' if bit else '0') + secret_data
-
-                # if (i + 2 == 8):
-                #     print('Index', i+2, 'Original', original_value, 'Predicted', predicted_value,
-                #           'Error Ext', error_extraction, 'Bit', bit, 'Watermark', watermarked_value)
-
-                # Repack the ECG and secret data
-                original_data[i+2] = original_value
+            predicted_values = self.predict_phase(original_data, phase)
+            secret_data = expansion_extract(original_data, phase, predicted_values, threshold) + secret_data
 
             print(original_data[0: 10])
         return original_data, secret_data
 
+    def embed_phase(self, watermarked_data: np.ndarray[np.any, np.int64], phase: Literal[1, 2, 3],
+                    secret_data: str, secret_index: int = 0, threshold: int = 4, errors: list = None) -> int:
+        """
+        Menyisipkan secret mulai dari secret_index pada satu fase secara in-place.
+
+        Returns:
+        int: secret_index setelah fase selesai.
+        """
+        predicted_values = self.predict_phase(watermarked_data, phase)
+        secret_index, _, phase_errors = expansion_embed(watermarked_data, phase, predicted_values,
+                                                        secret_data, secret_index, threshold)
+        if errors is not None:
+            errors.extend(phase_errors.tolist())
+
+        return secret_index
+
+    def sweep_keys(self, original_data: np.ndarray[np.any, np.int64], secret_data: str,
+                   threshold: int = 4, secret_keys: Sequence[str] = PHASE_KEYS):
+        """
+        Evaluate every secret_key for one signal in a single call.
+
+        Phases shared by keys with the same prefix are embedded and predicted once,
+        so the eight keys need 7 phase predictions instead of 12.
+
+        Args:
+            original_data: Original signal.
+            secret_data: Secret bits.
+            threshold: Expansion threshold, same as `embed`.
+            secret_keys: Keys to evaluate. Default: all eight keys.
+
+        Returns:
+            pandas.DataFrame indexed by secret_key with capacity (inner-region samples),
+            embedded_bits, unhidden_secret_count, ncc, prd, snr and psnr, equal to the
+            values of separate `embed` calls.
+        """
+        import pandas as pd
+
+        def embed_phase(data, phase, secret_index):
+            return self.embed_phase(data, phase, secret_data, secret_index, threshold)
+
+        rows = {}
+        for secret_key, watermarked_data, secret_index in iter_phase_keys(
+                original_data, secret_keys, embed_phase, 0):
+            rows[secret_key] = {
+                'capacity': secret_index,
+                'embedded_bits': min(secret_index, len(secret_data)),
+                'unhidden_secret_count': len(secret_data) - secret_index,
+                **quality_metrics(original_data, watermarked_data),
+            }
+
+        table = pd.DataFrame.from_dict({key: rows[key] for key in secret_keys}, orient='index')
+        return table.rename_axis('secret_key')
+
+    def predict_phase(self, data: np.ndarray[np.any, np.int64], phase: Literal[1, 2, 3]) -> np.ndarray:
+        """
+        Memberikan prediksi model seluruh baris fase ke-x dalam satu panggilan predict.
+        Tetangga satu fase tidak pernah diubah oleh fase itu sendiri, sehingga prediksi
+        cukup dihitung sekali di awal fase.
+        """
+        return predict_model(self.model, data, phase)
+
     def get_phase_indexes(self, phase: Literal[1, 2, 3], max_len: int = 3_600):
         """
         Memberikan range untuk fase ke-x dengan panjang maksimal ke-sekian
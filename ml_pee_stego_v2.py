@@ -1,9 +1,12 @@
 import numpy as np
 import warnings
-from typing import Literal
+from typing import Literal, Sequence
 import math
 import time
 from utils.result import Result
+from utils.expansion import expansion_embed, expansion_extract, row_chunks
+from utils.key_sweep import PHASE_KEYS, iter_phase_keys, quality_metrics
+from utils.neighbours import PhasePredictionCache, phase_row_count, predict_model
 
 # Disable only the specific NumPy deprecation warning
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -32,6 +35,7 @@ class MLPEEStego:
 
         result = Result()
         errors = []
+        cache = PhasePredictionCache(self.model)
 
         # PEE for hiding the secret
         last_index = 0
@@ -39,78 +43,15 @@ class MLPEEStego:
             if secret_key[phase - 1] == '0':
                 continue
 
-            for i in self.get_phase_indexes(phase, len(watermarked_data)):
-                if i + 4 >= len(watermarked_data) or secret_index == len(secret_data):
-                    break
-
-                # Get error from predicted value and original value
-                original_value = watermarked_data[i+2]
-                predicted_value = int(self.model.predict(
-                    [[watermarked_data[i], watermarked_data[i+1], watermarked_data[i+3], watermarked_data[i+4]]]))
-                error_embedding = original_value - predicted_value
-
-                errors.append(error_embedding)
-
-                expanded_error = 0
-                # check threshold
-                if abs(error_embedding) < threshold:
-                    bit = 1 if secret_index < len(
-                        secret_data) and secret_data[secret_index] == '1' else 0
-                    expanded_error = 2*error_embedding + bit
-                    secret_index += 1
-                    last_index = i
-                else:
-                    if error_embedding > 0:
-                        expanded_error = error_embedding + threshold
-                    else:
-                        expanded_error = error_embedding - threshold + 1
-
-                watermarked_value = predicted_value + expanded_error
-
-                # if (i + 2 == 8):
-                #     print('Index', i+2, 'Original', original_value, 'Predicted', predicted_value,
-                #           'Error Emb', error_embedding, 'Bit', bit, 'Watermark', watermarked_value)
-
-                watermarked_data[i+2] = watermarked_value
+            secret_index, last_index = self.embed_phase(watermarked_data, phase, secret_data, secret_index,
+                                                        last_index, threshold, errors, cache)
 
         # Short PEE for hiding the secret index
         # Check max capacity of data hiding
         second_capacity = math.ceil(math.log2(len(original_data)))
         second_secret_data = bin(last_index)[2:].zfill(second_capacity)
         print(f"LI: {second_secret_data} {last_index} {second_capacity}")
-        second_secret_index = 0
-        for phase in range(1, 4):
-            if secret_key[phase - 1] == '1':
-                continue
-
-            for i in self.get_phase_indexes(phase, len(watermarked_data)):
-                if second_secret_index == second_capacity:
-                    break
-
-                # Get error from predicted value and original value
-                original_value = watermarked_data[i+2]
-                predicted_value = int(self.model.predict(
-                    [[watermarked_data[i], watermarked_data[i+1], watermarked_data[i+3], watermarked_data[i+4]]]))
-                error_embedding = original_value - predicted_value
-
-                errors.append(error_embedding)
-
-                expanded_error = 0
-                # check threshold
-                if abs(error_embedding) < threshold:
-                    bit = 1 if second_secret_index < len(
-                        second_secret_data) and second_secret_data[second_secret_index] == '1' else 0
-                    expanded_error = 2*error_embedding + bit
-                    second_secret_index += 1
-                else:
-                    if error_embedding > 0:
-                        expanded_error = error_embedding + threshold
-                    else:
-                        expanded_error = error_embedding - threshold + 1
-
-                watermarked_value = predicted_value + expanded_error
-
-                watermarked_data[i+2] = watermarked_value
+        self.embed_last_index(watermarked_data, second_secret_data, threshold, secret_key, errors, cache)
 
         end_time = time.time()
 
@@ -130,44 +71,25 @@ class MLPEEStego:
     def extract(self, watermarked_data: np.ndarray[np.any, np.int64],
                 threshold: int = 4, secret_key: str = '000'):
         original_data = watermarked_data.copy()
+        cache = PhasePredictionCache(self.model)
 
         # Short PEE for hiding the secret index
         # Check max capacity of data hiding
         second_capacity = math.ceil(math.log2(len(original_data)))
         second_secret_data = ''
-        second_secret_index = 0
         for phase in range(1, 4):
             if secret_key[phase - 1] == '1':
                 continue
 
-            for i in self.get_phase_indexes(phase, len(watermarked_data)):
-                if second_secret_index == second_capacity:
+            # Bit last_index hanya menempati baris awal fase, prediksi dibuat per potongan
+            for start, stop in row_chunks(phase_row_count(len(original_data), phase)):
+                if len(second_secret_data) == second_capacity:
                     break
-
-                # Get error from predicted value and watermarked value
-                watermarked_value = original_data[i+2]
-                predicted_value = int(self.model.predict(
-                    [[original_data[i], original_data[i+1], original_data[i+3], original_data[i+4]]]))
-                error_extraction = watermarked_value - predicted_value
-
-                # Check threshold
-                if error_extraction >= 2*threshold:
-                    original_value = watermarked_value - threshold
-                elif error_extraction <= -2*threshold + 1:
-                    original_value = watermarked_value + threshold - 1
-                else:
-                    # Extract the watermark bit
-                    bit = error_extraction - 2 * \
-                        math.floor(error_extraction / 2)
-
-                    # Get the original value
-                    original_value = watermarked_value - \
-                        math.floor(error_extraction / 2) - bit
-                    second_secret_data += ('1' if bit else '0')
-                    second_secret_index += 1
-
-                # Repack the ECG and secret data
-                original_data[i+2] = original_value
+                predicted_values = cache.predict(original_data, phase, start, stop)
+                second_secret_data += expansion_extract(original_data, phase, predicted_values, threshold,
+                                                        bit_limit=second_capacity - len(second_secret_data),
+                                                        row_offset=start)
+            self.check_last_index_fits(second_secret_data, second_capacity, phase)
 
         secret_data = ''
         last_index = int(second_secret_data, 2)
@@ -177,46 +99,138 @@ class MLPEEStego:
             if secret_key[phase - 1] == '0':
                 continue
 
-            for i in reversed(self.get_phase_indexes(phase, len(original_data))):
-                if i + 4 >= len(original_data):
-                    continue
+            # Baris diproses mundur dan dimulai dari baris last_index
+            row_count = None if is_last_index_got else 0
+            if not is_last_index_got and (last_index - phase + 1) % 3 == 0 \
+                    and 0 <= last_index < len(original_data) - 4:
+                row_count = (last_index - phase + 1) // 3 + 1
+                is_last_index_got = True
+
+            if row_count != 0:
+                predicted_values = cache.predict(original_data, phase, 0, row_count)
+                secret_data = expansion_extract(original_data, phase, predicted_values, threshold) + secret_data
+
+            print(original_data[0: 10])
+        return original_data, secret_data
+
+    def embed_phase(self, watermarked_data: np.ndarray[np.any, np.int64], phase: Literal[1, 2, 3],
+                    secret_data: str, secret_index: int = 0, last_index: int = 0, threshold: int = 4,
+                    errors: list = None, cache: PhasePredictionCache = None):
+        """
+        Menyisipkan secret mulai dari secret_index pada satu fase secara in-place,
+        berhenti ketika secret habis. Prediksi diambil dari cache jika diberikan.
+
+        Returns:
+        Tuple[int, int]: secret_index dan last_index (i terakhir yang berisi bit) setelah fase selesai.
+        """
+        cache = PhasePredictionCache(self.model) if cache is None else cache
+        predicted_values = cache.predict(watermarked_data, phase)
+        secret_index, phase_last_index, phase_errors = expansion_embed(
+            watermarked_data, phase, predicted_values, secret_data, secret_index, threshold,
+            bit_limit=len(secret_data) - secret_index)
+        if errors is not None:
+            errors.extend(phase_errors.tolist())
+
+        if phase_last_index is not None:
+            last_index = phase_last_index
+        return secret_index, last_index
+
+    def embed_last_index(self, watermarked_data: np.ndarray[np.any, np.int64], second_secret_data: str,
+                         threshold: int = 4, secret_key: str = '000', errors: list = None,
+                         cache: PhasePredictionCache = None):
+        """
+        Menyisipkan bit last_index pada fase yang tidak dipilih secret_key secara in-place.
 
-                if i == last_index:
-                    is_last_index_got = True
+        Bit last_index hanya menempati baris awal fase, sehingga prediksi dibuat per potongan
+        baris yang membesar dan berhenti begitu semua bit tersisip.
+        """
+        cache = PhasePredictionCache(self.model) if cache is None else cache
+        second_capacity = len(second_secret_data)
+        second_secret_index = 0
+        for phase in range(1, 4):
+            if secret_key[phase - 1] == '1':
+                continue
 
-                if is_last_index_got == False:
-                    continue
+            for start, stop in row_chunks(phase_row_count(len(watermarked_data), phase)):
+                if second_secret_index == second_capacity:
+                    break
+                predicted_values = cache.predict(watermarked_data, phase, start, stop)
+                second_secret_index, _, phase_errors = expansion_embed(
+                    watermarked_data, phase, predicted_values, second_secret_data, second_secret_index,
+                    threshold, bit_limit=second_capacity - second_secret_index, row_offset=start)
+                if errors is not None:
+                    errors.extend(phase_errors.tolist())
+            self.check_last_index_fits(second_secret_data[:second_secret_index], second_capacity, phase)
+
+    @staticmethod
+    def check_last_index_fits(second_secret_data: str, second_capacity: int, phase: Literal[1, 2, 3]):
+        """
+        Bit last_index yang belum selesai di akhir satu fase tidak dilanjutkan ke fase berikutnya,
+        melainkan error karena baris fase habis (perilaku sejak loop per sampel).
+        """
+        if len(second_secret_data) < second_capacity:
+            raise IndexError(f"Bit last_index tidak muat pada fase {phase}: "
+                             f"{len(second_secret_data)} dari {second_capacity} bit")
 
-                # Get error from predicted value and watermarked value
-                watermarked_value = original_data[i+2]
-                predicted_value = int(self.model.predict(
-                    [[original_data[i], original_data[i+1], original_data[i+3], original_data[i+4]]]))
-                error_extraction = watermarked_value - predicted_value
+    def sweep_keys(self, original_data: np.ndarray[np.any, np.int64], secret_data: str,
+                   threshold: int = 4, secret_keys: Sequence[str] = PHASE_KEYS):
+        """
+        Evaluate every secret_key for one signal in a single call.
+
+        The secret-hiding phases shared by keys with the same prefix are embedded once;
+        only the last_index pass runs separately per key. One prediction cache is shared
+        by all keys, so rows whose neighbours match an earlier key are not re-predicted.
+
+        Args:
+            original_data: Original signal.
+            secret_data: Secret bits.
+            threshold: Expansion threshold, same as `embed`.
+            secret_keys: Keys to evaluate. Default: all eight keys.
+
+        Returns:
+            pandas.DataFrame indexed by secret_key with embedded_bits, unhidden_secret_count,
+            last_index, ncc, prd, snr, psnr and error, equal to the values of separate `embed` calls.
+            A key whose `embed` would raise IndexError (last_index bits do not fit) gets NaN
+            metrics and the message in error; the other keys are still evaluated.
+        """
+        import pandas as pd
 
-                # Check threshold
-                if error_extraction >= 2*threshold:
-                    original_value = watermarked_value - threshold
-                elif error_extraction <= -2*threshold + 1:
-                    original_value = watermarked_value + threshold - 1
-                else:
-                    # Extract the watermark bit
-                    bit = error_extraction - 2 * \
-                        math.floor(error_extraction / 2)
+        # Satu cache untuk semua key: baris yang tetangganya sama antar key tidak diprediksi ulang
+        cache = PhasePredictionCache(self.model)
 
-                    # Get the original value
-                    original_value = watermarked_value - \
-                        math.floor(error_extraction / 2) - bit
-                    secret_data = ('1' if bit else '0') + secret_data
+        def embed_phase(data, phase, state):
+            return self.embed_phase(data, phase, secret_data, *state, threshold, cache=cache)
 
-                # if (i + 2 == 8):
-                #     print('Index', i+2, 'Original', original_value, 'Predicted', predicted_value,
-                #           'Error Ext', error_extraction, 'Bit', bit, 'Watermark', watermarked_value)
+        second_capacity = math.ceil(math.log2(len(original_data)))
+        rows = {}
+        for secret_key, watermarked_data, (secret_index, last_index) in iter_phase_keys(
+                original_data, secret_keys, embed_phase, (0, 0)):
+            watermarked_data = watermarked_data.copy()
+            second_secret_data = bin(last_index)[2:].zfill(second_capacity)
+            rows[secret_key] = {
+                'embedded_bits': secret_index,
+                'unhidden_secret_count': len(secret_data) - secret_index,
+                'last_index': last_index,
+            }
+            # Key yang bit last_index-nya tidak muat gagal sendiri, key lain tetap dievaluasi
+            try:
+                self.embed_last_index(watermarked_data, second_secret_data, threshold, secret_key, cache=cache)
+            except IndexError as error:
+                rows[secret_key].update({'ncc': np.nan, 'prd': np.nan, 'snr': np.nan, 'psnr': np.nan,
+                                         'error': str(error)})
+                continue
+            rows[secret_key].update({**quality_metrics(original_data, watermarked_data), 'error': None})
 
-                # Repack the ECG and secret data
-                original_data[i+2] = original_value
+        table = pd.DataFrame.from_dict({key: rows[key] for key in secret_keys}, orient='index')
+        return table.rename_axis('secret_key')
 
-            print(original_data[0: 10])
-        return original_data, secret_data
+    def predict_phase(self, data: np.ndarray[np.any, np.int64], phase: Literal[1, 2, 3]) -> np.ndarray:
+        """
+        Memberikan prediksi model seluruh baris fase ke-x dalam satu panggilan predict.
+        Tetangga satu fase tidak pernah diubah oleh fase itu sendiri, sehingga prediksi
+        cukup dihitung sekali di awal fase.
+        """
+        return predict_model(self.model, data, phase)
 
     def get_phase_indexes(self, phase: Literal[1, 2, 3], max_len: int = 3_600):
         """
@@ -1,9 +1,16 @@
 import numpy as np
 import warnings
-from typing import Literal, List
+from typing import Literal, List, Optional, Sequence, Tuple
 import math
 import time
+from utils.buffers import output_array
+from utils.calculation import Calculation, MetricAccumulator
 from utils.result import Result
+from utils.tuning import estimate_embedding, tune_setting
+from utils.framing import (HEADER_BITS, embed_header, extract_header, header_indexes, header_rows, pack_header,
+                           verify_payload)
+from utils.mirror import embed_layer, extract_layer, mirror_embed_values, mirror_extract_values
+from utils.neighbours import phase_neighbours, phase_targets
 
 # Disable only the specific NumPy deprecation warning
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -25,7 +32,10 @@ class PEEStego:
     def embed(self, original_data: np.ndarray[np.any, np.int64],
               secret_data: str,
               payload_rate: int = 1,
-              threshold: int = 0):
+              threshold: int = 0,
+              framed: bool = False,
+              out: Optional[np.ndarray] = None,
+              in_place: bool = False):
         """
         Embeds data using the PEE technique.
 
@@ -34,6 +44,12 @@ class PEEStego:
             secret_data (str): Secret data to be embedded.
             payload_rate (int, optional): Payload rate (number of bits to embed per phase). Defaults to 1.
             threshold (int, optional): Threshold for embedding. Defaults to 0.
+            framed (bool, optional): Embeds a header (length, bit limit, payload end, CRC) in the first
+                rows of phase 1 so `extract(..., framed=True)` only needs mirror_data. Defaults to False.
+            out (np.ndarray, optional): Buffer for the watermarked data instead of a new copy. Defaults to None.
+            in_place (bool, optional): Embeds directly into original_data. The metrics are then corrected
+                phase by phase from the modified samples, so only the original targets of one phase
+                (a third of the signal) are kept at a time. Defaults to False.
 
         Returns:
             Tuple[np.ndarray, List[int], int, int, int, Result]: A tuple containing:
@@ -43,12 +59,23 @@ class PEEStego:
                 - last_i (int): Last index processed during embedding.
                 - last_embedded_bit_total (int): Total number of bits embedded in the last embedding.
                 - result (Result): Result object with performance metrics.
+                When framed, mirror_data starts with the header mirror differences.
         """
         start_time = time.time()
 
-        watermarked_data = original_data.copy()
+        watermarked_data = output_array(original_data, out, in_place)
         secret_index = 0
 
+        # In place the original is overwritten, so only the current phase targets are kept
+        if in_place:
+            metrics = MetricAccumulator()
+            metrics.update(original_data)
+
+        # Header rows of phase 1 and their neighbours are left to the header
+        first_row = 0
+        if framed:
+            first_row, header_predictions = header_rows(watermarked_data, self.predict_phase)
+
         errors = []
         mirror_data = []
         last_phase = 0
@@ -63,7 +90,10 @@ class PEEStego:
             if has_embedding_end:
                 break
 
-            for i in self.get_phase_indexes(phase, len(watermarked_data)):
+            predicted_values = self.predict_phase(watermarked_data, phase)
+            if in_place:
+                phase_values = phase_targets(watermarked_data, phase).copy()
+            for row, i in enumerate(self.get_phase_indexes(phase, len(watermarked_data))):
                 secret_remainder = len(secret_data) - secret_index
                 if secret_remainder <= 0:
                     has_embedding_end = True
@@ -73,10 +103,12 @@ class PEEStego:
                 if i + 4 >= len(watermarked_data):
                     break
 
+                if row < first_row:
+                    continue
+
                 # Get error from predicted value and original value
                 original_value = watermarked_data[i+2]
-                predicted_value = int(llp(
-                    np.array([watermarked_data[i], watermarked_data[i+1], watermarked_data[i+3], watermarked_data[i+4]])))
+                predicted_value = int(predicted_values[row])
                 embedding_error = abs(original_value - predicted_value)
                 if embedding_error <= 1:
                     errors.append(embedding_error)
@@ -89,23 +121,10 @@ class PEEStego:
                     payload_rate + threshold) if available_bit >= payload_rate + threshold else available_bit
                 last_embedded_bit_total = embedded_bit_total
 
-                secret_value_limit = 2**embedded_bit_total
-                half_secret_value_limit = int((secret_value_limit/2) - 1)
-                mirror_total = math.floor(
-                    (embedding_error - half_secret_value_limit)/secret_value_limit) + 1
-
-                first_mirror_point = original_value - \
-                    half_secret_value_limit if predicted_value <= original_value else original_value + \
-                    half_secret_value_limit
-
                 secret_value = int(
                     secret_data[secret_index:secret_index+embedded_bit_total], 2)
-                embedding_diff = secret_value if mirror_total % 2 else (
-                    secret_value_limit - secret_value) % secret_value_limit
-
-                watermarked_value = first_mirror_point + \
-                    embedding_diff if predicted_value <= original_value else first_mirror_point - embedding_diff
-                mirror_diff = watermarked_value - original_value
+                watermarked_value, mirror_diff = self.embed_value(
+                    original_value, predicted_value, embedded_bit_total, secret_value)
                 mirror_data.append(mirror_diff)
 
                 secret_index += embedded_bit_total
@@ -115,8 +134,27 @@ class PEEStego:
                 # print("EMB -> i:", i, "OV:", original_value, "PV:", predicted_value,
                 #       "WV:", watermarked_value, "sv:", secret_value, "I:", mirror_diff)
 
+            # A phase only writes its own targets, so each sample is corrected once
+            if in_place:
+                watermarked_values = phase_targets(watermarked_data, phase)
+                modified = phase_values != watermarked_values
+                metrics.update_modified(phase_values[modified], watermarked_values[modified])
+                del phase_values, modified
+
             last_phase = phase
 
+        if framed:
+            header = pack_header(secret_data[:secret_index], math.ceil(payload_rate + threshold),
+                                 last_phase, last_i, last_embedded_bit_total)
+            if in_place:
+                header_targets = np.asarray(header_indexes(first_row)) + 2
+                header_values = watermarked_data[header_targets]
+            mirror_data = embed_header(watermarked_data, header_predictions, header, self.embed_value) + mirror_data
+            if in_place:
+                header_changed = watermarked_data[header_targets] != header_values
+                metrics.update_modified(header_values[header_changed],
+                                        watermarked_data[header_targets[header_changed]])
+
         end_time = time.time()
 
         print(watermarked_data[0: 10])
@@ -125,73 +163,101 @@ class PEEStego:
         if self.is_frequency_log:
             Result.log_frequency(errors, 1, is_greater=False)
         # Log result
-        result.calculate(original_data, watermarked_data,
-                         end_time - start_time)
+        if in_place:
+            result.calculate_from(metrics, end_time - start_time)
+        else:
+            result.calculate(original_data, watermarked_data,
+                             end_time - start_time)
 
         return watermarked_data, mirror_data, last_phase, last_i, last_embedded_bit_total, result
 
     def extract(self, watermarked_data: np.ndarray[np.any, np.int64],
                 mirror_data: List[int],
-                last_phase: int,
-                last_i: int,
-                last_embedded_bit_total: int,
+                last_phase: Optional[int] = None,
+                last_i: Optional[int] = None,
+                last_embedded_bit_total: Optional[int] = None,
                 payload_rate: int = 1,
-                threshold: int = 0):
+                threshold: int = 0,
+                framed: bool = False,
+                out: Optional[np.ndarray] = None,
+                in_place: bool = False):
         """
         Extracts secret data from watermarked data using the PEE (Phase-Encoded Embedding) technique.
 
+        Extraction starts at the last embedded row and stops once every mirror difference is used.
+
         Args:
             watermarked_data (np.ndarray): Watermarked data (e.g., an image) as a NumPy array.
             mirror_data (List[int]): List of mirror differences obtained during embedding.
-            last_phase (int): Last phase used during embedding.
-            last_i (int): Last index processed during embedding.
+            last_phase (int): Last phase used during embedding. Read from the header when framed.
+            last_i (int): Last index processed during embedding. Read from the header when framed.
             last_embedded_bit_total (int): Total number of bits embedded in the last phase.
+                Read from the header when framed.
             payload_rate (int, optional): Payload rate (number of bits embedded per phase). Defaults to 1.
-            threshold (int, optional): Threshold for embedding. Defaults to 0.
+                Ignored when framed.
+            threshold (int, optional): Threshold for embedding. Defaults to 0. Ignored when framed.
+            framed (bool, optional): Data was embedded with `embed(..., framed=True)`. Defaults to False.
+            out (np.ndarray, optional): Buffer for the restored data instead of a new copy. Defaults to None.
+            in_place (bool, optional): Restores watermarked_data itself. Defaults to False.
 
         Returns:
             Tuple[np.ndarray, str]: A tuple containing:
                 - original_data (np.ndarray): Original data after extraction.
                 - secret_data (str): Extracted secret data.
+
+        Raises:
+            ValueError: When framed and the payload does not match the header length or CRC.
         """
-        original_data = watermarked_data.copy()
-        secret_data = ''
+        original_data = output_array(watermarked_data, out, in_place)
+        secret_chunks = []
         has_last_phase = False
         has_last_i = False
         has_last_embedded_bit = False
 
+        # Header rows of phase 1 and their neighbours hold no payload
+        first_row = 0
+        if framed:
+            first_row, header_predictions = header_rows(original_data, self.predict_phase)
+            header = extract_header(original_data, header_predictions, mirror_data, self.extract_value)
+            mirror_data = mirror_data[HEADER_BITS:]
+            last_phase, last_i, last_embedded_bit_total = header['last_phase'], header['last_i'], header['last_bits']
+            payload_rate, threshold = header['bit_limit'], 0
+
+        # Mirror differences are used from the end, so only a position is kept
+        mirror_index = len(mirror_data)
+
         for phase in reversed(range(1, 4)):
             if not has_last_phase:
                 has_last_phase = phase == last_phase
                 if not has_last_phase:
                     continue
 
-            for i in reversed(self.get_phase_indexes(phase, len(original_data))):
-                if not has_last_i:
-                    has_last_i = i == last_i
-                    if not has_last_i:
-                        continue
+            indexes = self.get_phase_indexes(phase, len(original_data))[first_row:]
+            if not has_last_i:
+                has_last_i = last_i in indexes
+                indexes = indexes[:indexes.index(last_i) + 1] if has_last_i else range(0)
+
+            if mirror_index and indexes:
+                predicted_values = self.predict_phase(original_data, phase)
+            for i in reversed(indexes):
+                if mirror_index == 0:
+                    break
 
                 if i + 4 >= len(original_data):
                     continue
 
                 # Get error from predicted value and watermarked value
                 watermarked_value = original_data[i+2]
-                predicted_value = int(llp(
-                    np.array([original_data[i], original_data[i+1], original_data[i+3], original_data[i+4]])))
-
-                if len(mirror_data) == 0:
-                    continue
+                predicted_value = int(predicted_values[(i - phase + 1) // 3])
 
-                mirror_value = mirror_data[-1]
+                mirror_value = mirror_data[mirror_index - 1]
                 extraction_error = abs(watermarked_value - predicted_value) - mirror_value if predicted_value <= watermarked_value else abs(
                     watermarked_value - predicted_value) + mirror_value
 
                 if abs(watermarked_value - predicted_value) <= 1:
                     continue
 
-                original_value = watermarked_value - mirror_value
-                original_data[i+2] = original_value
+                original_data[i+2] = watermarked_value - mirror_value
 
                 available_bit = math.floor(math.log2(extraction_error))
                 if not has_last_embedded_bit:
@@ -201,32 +267,232 @@ class PEEStego:
                 extraction_bit_total = math.ceil(
                     payload_rate + threshold) if available_bit >= payload_rate + threshold else available_bit
 
-                secret_value_limit = 2**extraction_bit_total
-                half_secret_value_limit = int((secret_value_limit/2) - 1)
-                mirror_total = math.floor(
-                    (extraction_error - half_secret_value_limit)/secret_value_limit) + 1
+                _, secret_bits = self.extract_value(
+                    watermarked_value, predicted_value, mirror_value, extraction_bit_total)
+                secret_chunks.append(secret_bits)
 
-                first_mirror_point = original_value - \
-                    half_secret_value_limit if predicted_value <= watermarked_value else original_value + \
-                    half_secret_value_limit
+                mirror_index -= 1
 
-                secret_value = abs(watermarked_value - first_mirror_point) if mirror_total % 2 else (
-                    secret_value_limit - abs(watermarked_value - first_mirror_point)) % secret_value_limit
-                secret_data = bin(secret_value)[
-                    2:].zfill(extraction_bit_total) + secret_data
+            print(original_data[0: 10])
 
-                mirror_data = mirror_data[:-1]
+        secret_data = ''.join(reversed(secret_chunks))
+        if framed:
+            verify_payload(header, secret_data)
+        return original_data, secret_data
 
-                # print("EXT -> i:", i, "OV:", original_value, "PV:", predicted_value,
-                #       "WV:", watermarked_value, "sv:", secret_value, "I:", mirror_value)
+    def embed_layers(self, original_data: np.ndarray[np.any, np.int64],
+                     secret_data: str,
+                     layers: int = 2,
+                     payload_rate: int = 1,
+                     threshold: int = 0):
+        """
+        Embeds data in several passes, each over the watermarked data of the previous pass.
 
-                # print("191 -> SEC VALUE LIMIT: ", secret_value_limit,
-                #       "MIRROR TOTAL: ", mirror_total)
-                # print(i, secret_value, bin(secret_value)[
-                #     2:].zfill(extraction_bit_total))
+        Every layer is a full three-phase embedding with the vectorized mirror kernel and carries the
+        secret bits left over by the layers before it. Embedding stops early once the secret is used up
+        or a layer has no capacity left.
 
-            print(original_data[0: 10])
-        return original_data, secret_data
+        Args:
+            original_data (np.ndarray): Original data as a NumPy array.
+            secret_data (str): Secret data to be embedded.
+            layers (int, optional): Maximum number of embedding passes. Defaults to 2.
+            payload_rate (int, optional): Payload rate (number of bits to embed per phase). Defaults to 1.
+            threshold (int, optional): Threshold for embedding. Defaults to 0.
+
+        Returns:
+            Tuple[np.ndarray, List[tuple], Result, List[dict]]: A tuple containing:
+                - watermarked_data (np.ndarray): Watermarked data after the last layer.
+                - layer_side_info (List[tuple]): (mirror_data, last_phase, last_i, last_embedded_bit_total)
+                  per layer, in the same form as `embed` returns for a single pass.
+                - result (Result): Metrics of the final watermarked data against original_data.
+                - layer_stats (List[dict]): Per layer embedded_bits, total_bits, bits_per_sample,
+                  prd and snr against original_data, and time.
+        """
+        if layers < 1:
+            raise ValueError("layers minimal 1")
+
+        start_time = time.time()
+        embedded_bit_limit = math.ceil(payload_rate + threshold)
+        watermarked_data = output_array(original_data)
+        secret_index = 0
+
+        errors = []
+        layer_side_info = []
+        layer_stats = []
+        for layer in range(1, layers + 1):
+            layer_start_time = time.time()
+            layer_secret_index = secret_index
+            secret_index, side_info, layer_errors = embed_layer(watermarked_data, secret_data, secret_index,
+                                                                embedded_bit_limit, self.predict_phase)
+            if secret_index == layer_secret_index:
+                break
+
+            errors.append(layer_errors)
+            layer_side_info.append(side_info)
+            layer_stats.append({
+                'layer': layer,
+                'embedded_bits': secret_index - layer_secret_index,
+                'total_bits': secret_index,
+                'bits_per_sample': (secret_index - layer_secret_index) / len(watermarked_data),
+                'prd': float(Calculation.prd(original_data, watermarked_data)),
+                'snr': float(Calculation.snr(original_data, watermarked_data)),
+                'time': time.time() - layer_start_time,
+            })
+            if secret_index >= len(secret_data):
+                break
+
+        end_time = time.time()
+
+        # Log frekuensi yang muncul
+        if self.is_frequency_log and errors:
+            Result.log_frequency(np.concatenate(errors).tolist(), 1, is_greater=False)
+        # Log result
+        result = Result()
+        result.unhidden_secret_count = len(secret_data) - secret_index
+        result.calculate(original_data, watermarked_data, end_time - start_time)
+
+        return watermarked_data, layer_side_info, result, layer_stats
+
+    def extract_layers(self, watermarked_data: np.ndarray[np.any, np.int64],
+                       layer_side_info: Sequence[tuple],
+                       payload_rate: int = 1,
+                       threshold: int = 0):
+        """
+        Reverses `embed_layers`, restoring the last layer first.
+
+        Args:
+            watermarked_data (np.ndarray): Watermarked data as a NumPy array.
+            layer_side_info (Sequence[tuple]): Side info of every layer returned by `embed_layers`.
+            payload_rate (int, optional): Payload rate used during embedding. Defaults to 1.
+            threshold (int, optional): Threshold used during embedding. Defaults to 0.
+
+        Returns:
+            Tuple[np.ndarray, str]: A tuple containing:
+                - original_data (np.ndarray): Original data after extraction.
+                - secret_data (str): Extracted secret data, in layer order.
+        """
+        embedded_bit_limit = math.ceil(payload_rate + threshold)
+        original_data = output_array(watermarked_data)
+
+        secret_chunks = []
+        for side_info in reversed(layer_side_info):
+            secret_chunks.append(extract_layer(original_data, side_info, embedded_bit_limit, self.predict_phase))
+
+        return original_data, ''.join(reversed(secret_chunks))
+
+    @staticmethod
+    def embed_value(original_value: int, predicted_value: int,
+                    embedded_bit_total: int, secret_value: int) -> Tuple[int, int]:
+        """
+        Embeds one secret value into a sample by mirroring it around the original value.
+        The arithmetic is shared with the vectorized layers, see `mirror_embed_values`.
+
+        Args:
+            original_value (int): Sample value before embedding.
+            predicted_value (int): Predicted sample value.
+            embedded_bit_total (int): Number of secret bits carried by the sample.
+            secret_value (int): Secret bits as an integer.
+
+        Returns:
+            Tuple[int, int]: Watermarked value and mirror difference (watermarked - original).
+        """
+        return mirror_embed_values(int(original_value), int(predicted_value), embedded_bit_total, secret_value)
+
+    @staticmethod
+    def extract_value(watermarked_value: int, predicted_value: int,
+                      mirror_value: int, extraction_bit_total: int) -> Tuple[int, str]:
+        """
+        Reverses `embed_value` for one sample.
+
+        Args:
+            watermarked_value (int): Sample value after embedding.
+            predicted_value (int): Predicted sample value.
+            mirror_value (int): Mirror difference of the sample.
+            extraction_bit_total (int): Number of secret bits carried by the sample.
+
+        Returns:
+            Tuple[int, str]: Original value and the extracted bits.
+        """
+        original_value, secret_value = mirror_extract_values(int(watermarked_value), int(predicted_value),
+                                                             int(mirror_value), extraction_bit_total)
+        return original_value, bin(secret_value)[2:].zfill(extraction_bit_total)
+
+    def estimate(self, original_data: np.ndarray[np.any, np.int64],
+                 secret_length: int,
+                 payload_rate: int = 1,
+                 threshold: int = 0):
+        """
+        Estimates capacity and distortion of an embedding without running it.
+
+        Args:
+            original_data (np.ndarray): Original data as a NumPy array.
+            secret_length (int): Length of the secret data in bits.
+            payload_rate (int, optional): Payload rate (number of bits to embed per phase). Defaults to 1.
+            threshold (int, optional): Threshold for embedding. Defaults to 0.
+
+        Returns:
+            dict: Estimated capacity, embedded bits, noise power, PRD and SNR.
+        """
+        return estimate_embedding(self.get_phase_errors(original_data), secret_length,
+                                  math.ceil(payload_rate + threshold),
+                                  float(np.sum(original_data ** 2)),
+                                  self.expected_noise)
+
+    def tune(self, original_data: np.ndarray[np.any, np.int64],
+             secret_length: int,
+             target_prd: Optional[float] = None,
+             target_snr: Optional[float] = None,
+             payload_rates: Sequence[int] = (1, 2, 3),
+             thresholds: Sequence[int] = (0, 1),
+             secret_data: Optional[str] = None):
+        """
+        Picks payload_rate and threshold for a secret length and a PRD/SNR target.
+
+        Every candidate is estimated from the same vectorized phase errors, see `tune_setting`.
+
+        Args:
+            original_data (np.ndarray): Original data as a NumPy array.
+            secret_length (int): Length of the secret data in bits.
+            target_prd (float, optional): Maximum PRD allowed. Defaults to None.
+            target_snr (float, optional): Minimum SNR allowed. Defaults to None.
+            payload_rates (Sequence[int], optional): Candidate payload rates. Defaults to (1, 2, 3).
+            thresholds (Sequence[int], optional): Candidate thresholds. Defaults to (0, 1).
+            secret_data (str, optional): When given, the chosen setting is confirmed with one real embed.
+
+        Returns:
+            Tuple[dict, List[dict]]: A tuple containing:
+                - best (dict): Chosen estimate with payload_rate, threshold and meets_target.
+                  Holds the embed output under 'embedding' when secret_data is given.
+                - estimates (List[dict]): Estimates of every candidate.
+        """
+        return tune_setting(self, original_data, secret_length, target_prd, target_snr,
+                            payload_rates, thresholds, secret_data)
+
+    def get_phase_errors(self, data: np.ndarray[np.any, np.int64]) -> List[np.ndarray]:
+        """
+        Memberikan error absolut prediksi LLP tiap fase secara vektor, dihitung dari data yang diberikan
+        """
+        return [np.abs(phase_targets(data, phase) - self.predict_phase(data, phase))
+                for phase in range(1, 4)]
+
+    def predict_phase(self, data: np.ndarray[np.any, np.int64], phase: Literal[1, 2, 3]) -> np.ndarray:
+        """
+        Memberikan prediksi LLP seluruh baris fase ke-x sekaligus.
+        Tetangga satu fase tidak pernah diubah oleh fase itu sendiri, sehingga prediksi
+        cukup dihitung sekali di awal fase.
+        """
+        neighbours = phase_neighbours(data, phase)
+        return np.round(neighbours.sum(axis=(-2, -1)) / 4).astype(np.int64)
+
+    @staticmethod
+    def expected_noise(embedding_errors: np.ndarray, embedded_bits: np.ndarray) -> np.ndarray:
+        """
+        Ekspektasi kuadrat perubahan sampel untuk secret acak.
+        Perubahan sampel adalah embedding_diff - half_secret_value_limit dengan embedding_diff
+        seragam di [0, 2**bit), sehingga nilainya tidak bergantung pada error.
+        """
+        secret_value_limit = np.power(2.0, embedded_bits)
+        return (secret_value_limit ** 2 + 2) / 12
 
     def get_phase_indexes(self, phase: Literal[1, 2, 3], max_len: int = 3_600):
         """
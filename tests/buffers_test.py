@@ -0,0 +1,73 @@
+import contextlib
+import io
+import tracemalloc
+import unittest
+import numpy as np
+from ml_pee_stego_v3 import MLPEEStego
+from pee_stego_v4 import PEEStego
+from utils.buffers import output_array
+from utils.fuzzing import MeanPredictor
+
+
+class TestBuffers(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(6)
+        self.signal = np.cumsum(rng.integers(-9, 10, 2_000)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 800))
+
+    def test_output_array(self):
+        buffer = np.empty_like(self.signal)
+
+        self.assertIs(output_array(self.signal, in_place=True), self.signal)
+        self.assertIs(output_array(self.signal, buffer), buffer)
+        np.testing.assert_array_equal(buffer, self.signal)
+        self.assertIsNot(output_array(self.signal), self.signal)
+        with self.assertRaises(ValueError):
+            output_array(self.signal, buffer, in_place=True)
+
+    def test_in_place_and_out_match_copying_embed(self):
+        for stego in (PEEStego(is_frequency_log=False), MLPEEStego(MeanPredictor(), is_frequency_log=False)):
+            for framed in (False, True):
+                data = self.signal.copy()
+                buffer = np.empty_like(self.signal)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    expected = stego.embed(self.signal, self.secret_data, 2, 0, framed=framed)
+                    in_place = stego.embed(data, self.secret_data, 2, 0, framed=framed, in_place=True)
+                    out = stego.embed(self.signal, self.secret_data, 2, 0, framed=framed, out=buffer)
+                    side_info = in_place[1:2] if framed else in_place[1:5]
+                    restored_data, extracted_secret_data = stego.extract(
+                        data, *side_info, 2, 0, framed=framed, in_place=True)
+
+                self.assertIs(in_place[0], data)
+                self.assertIs(out[0], buffer)
+                np.testing.assert_array_equal(buffer, expected[0])
+                self.assertIs(restored_data, data)
+                np.testing.assert_array_equal(data, self.signal)
+                self.assertEqual(extracted_secret_data, self.secret_data)
+
+                expected_result, in_place_result = expected[-1], in_place[-1]
+                self.assertEqual((in_place_result.prd, in_place_result.snr, in_place_result.psnr),
+                                 (expected_result.prd, expected_result.snr, expected_result.psnr))
+                self.assertAlmostEqual(in_place_result.ncc, expected_result.ncc, places=12)
+
+    def test_in_place_embed_peak_memory_is_below_copying_embed(self):
+        rng = np.random.default_rng(7)
+        signal = np.cumsum(rng.integers(-20, 21, 20_000)).astype(np.int64)
+        secret_data = ''.join(rng.choice(['0', '1'], 150_000))
+
+        peaks = {}
+        for in_place in (False, True):
+            data = signal.copy()
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracemalloc.start()
+                try:
+                    PEEStego(is_frequency_log=False).embed(data, secret_data, 2, 0, in_place=in_place)
+                    peaks[in_place] = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+        self.assertLess(peaks[True], peaks[False] - signal.nbytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from utils.calculation import Calculation
+from utils.calculation import Calculation, MetricAccumulator
 
 
 class TestCalculation(unittest.TestCase):
@@ -37,6 +37,27 @@ class TestCalculation(unittest.TestCase):
         # Check if the calculated SNR is approximately equal to the expected value
         self.assertAlmostEqual(actual_snr, expected_snr, places=6)
 
+    def test_accumulator_matches_batch_metrics(self):
+        rng = np.random.default_rng(0)
+        original_signal = np.cumsum(rng.integers(-20, 21, 10_000)) + 900
+        reconstructed_signal = original_signal.copy()
+        modified = rng.choice(len(original_signal), 3_000, replace=False)
+        reconstructed_signal[modified] += rng.integers(-6, 7, len(modified))
+        changed = reconstructed_signal != original_signal
+
+        chunked = MetricAccumulator()
+        for start in range(0, len(original_signal), 999):
+            chunked.update(original_signal[start:start + 999], reconstructed_signal[start:start + 999])
+        per_sample = MetricAccumulator()
+        per_sample.update(original_signal)
+        per_sample.update_modified(original_signal[changed], reconstructed_signal[changed])
+
+        for accumulator in (chunked, per_sample):
+            self.assertEqual(accumulator.prd(), Calculation.prd(original_signal, reconstructed_signal))
+            self.assertEqual(accumulator.snr(), Calculation.snr(original_signal, reconstructed_signal))
+            self.assertEqual(accumulator.psnr(), Calculation.psnr(original_signal, reconstructed_signal))
+            self.assertAlmostEqual(accumulator.ncc(), Calculation.ncc(original_signal, reconstructed_signal), places=12)
+
 
 if __name__ == "__main__":
     unittest.main()
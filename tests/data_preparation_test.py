@@ -0,0 +1,117 @@
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+import numpy as np
+import wfdb
+from utils.data_preparation import PrefetchLoader, load_record, slice_windows
+
+
+def write_record(folder_path, name, signal, sig_name='MLII'):
+    wfdb.wrsamp(name, fs=360, units=['mV'], sig_name=[sig_name], p_signal=signal[:, None] / 1000,
+                fmt=['16'], adc_gain=[1000], baseline=[0], write_dir=folder_path)
+
+
+class SlowLoader(PrefetchLoader):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded = []
+
+    def _load_windows(self, patient_code):
+        self.loaded.append(patient_code)
+        if patient_code != 'a':
+            time.sleep(0.2)
+        return [np.arange(3)]
+
+
+class CountingLoader(PrefetchLoader):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.resident = 0
+        self.max_resident = 0
+
+    def _release(self):
+        with self.lock:
+            self.resident -= 1
+
+    def _load_windows(self, patient_code):
+        with self.lock:
+            self.resident += 1
+            self.max_resident = max(self.max_resident, self.resident)
+        record = np.arange(6)
+        weakref.finalize(record, self._release)
+        return [record[:3], record[3:]]
+
+
+class TestDataPreparation(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder_path = self.temp_dir.name
+        rng = np.random.default_rng(0)
+        self.signal = np.cumsum(rng.integers(-20, 21, 1_000)).astype(np.int64)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_record_reads_mlii(self):
+        write_record(self.folder_path, '900', self.signal)
+        write_record(self.folder_path, '901', self.signal, sig_name='V5')
+
+        np.testing.assert_array_equal(load_record('900', self.folder_path), self.signal)
+        self.assertEqual(len(load_record('901', self.folder_path)), 0)
+
+    def test_slice_windows_count_with_stride_and_max_windows(self):
+        self.assertEqual(len(slice_windows(self.signal, 300)), 3)
+        self.assertEqual(len(slice_windows(self.signal, 300, stride=100)), 8)
+        self.assertEqual(len(slice_windows(self.signal, 300, stride=100, max_windows=5)), 5)
+        self.assertEqual(slice_windows(self.signal[:299], 300), [])
+
+        windows = slice_windows(self.signal, 300, stride=100)
+        np.testing.assert_array_equal(windows[2], self.signal[200:500])
+        self.assertTrue(np.shares_memory(windows[0], self.signal))
+
+    def test_prefetch_loader_keeps_record_order(self):
+        patient_codes = [f'9{index:02d}' for index in range(6)]
+        for index, patient_code in enumerate(patient_codes):
+            write_record(self.folder_path, patient_code, self.signal + index)
+        write_record(self.folder_path, '990', self.signal, sig_name='V5')
+
+        loader = PrefetchLoader(patient_codes + ['990'], self.folder_path, window_size=400,
+                                workers=3, buffer_size=2)
+        items = list(loader)
+
+        self.assertEqual([(code, index) for code, index, _ in items],
+                         [(code, index) for code in patient_codes for index in range(2)])
+        np.testing.assert_array_equal(items[-1][2], self.signal[400:800] + 5)
+
+    def test_prefetch_loader_holds_at_most_buffer_size_records(self):
+        loader = CountingLoader([str(code) for code in range(10)], self.folder_path, workers=4, buffer_size=3)
+        iterator = iter(loader)
+        count = 0
+        while True:
+            item = next(iterator, None)
+            if item is None:
+                break
+            count += 1
+            time.sleep(0.01)
+            del item
+
+        self.assertEqual(count, 20)
+        self.assertEqual(loader.max_resident, 3)
+        self.assertEqual(loader.resident, 0)
+
+    def test_prefetch_loader_cancels_pending_records_on_close(self):
+        loader = SlowLoader(['a', 'b', 'c', 'd', 'e'], self.folder_path, workers=1, buffer_size=4)
+        iterator = iter(loader)
+        self.assertEqual(next(iterator)[0], 'a')
+        iterator.close()
+
+        # 'b' mungkin sudah berjalan di worker saat iterator ditutup; sisanya harus dibatalkan
+        self.assertEqual(loader.loaded[0], 'a')
+        self.assertLessEqual(set(loader.loaded), {'a', 'b'})
+
+
+if __name__ == '__main__':
+    unittest.main()
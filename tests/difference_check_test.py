@@ -0,0 +1,61 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from utils.difference_check import bit_errors, bit_errors_batch, check_difference
+
+
+class TestDifferenceCheck(unittest.TestCase):
+    def test_bit_errors_reports_positions_and_bursts(self):
+        report = bit_errors('1011001110', '1001111110')
+
+        self.assertEqual(report.error_count, 3)
+        np.testing.assert_array_equal(report.error_positions, [2, 4, 5])
+        self.assertEqual(report.first_mismatch, 2)
+        self.assertEqual(report.burst_count, 2)
+        self.assertEqual(report.max_burst_length, 2)
+        self.assertAlmostEqual(report.bit_error_rate, 0.3)
+
+    def test_bit_errors_missing_bits(self):
+        self.assertEqual(bit_errors('101100', '1011').error_count, 2)
+        # Dengan pad '0' perilakunya sama dengan ljust pada check_difference
+        self.assertEqual(bit_errors('101100', '1011', pad='0').error_count, 0)
+        self.assertEqual(bit_errors('1011', '1011').first_mismatch, -1)
+
+    def test_batch_matches_single_pair(self):
+        rng = np.random.default_rng(0)
+        secrets = [''.join(rng.choice(['0', '1'], rng.integers(0, 40))) for _ in range(20)]
+        extracted = [''.join(rng.choice(['0', '1'], rng.integers(0, 40))) for _ in range(20)]
+
+        for pad in (None, '0', '1'):
+            batch = bit_errors_batch(secrets, extracted, pad=pad)
+            for index, (secret, extracted_secret) in enumerate(zip(secrets, extracted)):
+                report = bit_errors(secret, extracted_secret, pad=pad)
+                self.assertEqual(batch['length'][index], report.length)
+                self.assertEqual(batch['error_count'][index], report.error_count)
+                self.assertEqual(batch['first_mismatch'][index], report.first_mismatch)
+                self.assertEqual(batch['burst_count'][index], report.burst_count)
+                self.assertEqual(batch['max_burst_length'][index], report.max_burst_length)
+
+    def test_rejects_non_bit_values(self):
+        for bits in ['10a1', '10 1', '1/01', '10\u00e91', np.array([0, 2, 1])]:
+            with self.assertRaises(ValueError):
+                bit_errors(bits, '1011')
+            with self.assertRaises(ValueError):
+                bit_errors_batch(['1011'], [bits])
+        self.assertEqual(bit_errors(np.array([1, 0, 1, 1], dtype=bool), '1001').error_count, 1)
+
+    def test_check_difference_output(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            check_difference('abc', 'abd')
+            check_difference('xyz', 'xyz')
+
+        self.assertEqual(output.getvalue().splitlines(), [
+            "Perbedaan ditemukan pada indeks 2: 'c' != 'd'",
+            "Tidak ada perbedaan di antara keduanya.",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
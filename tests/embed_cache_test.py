@@ -0,0 +1,119 @@
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from ml_pee_stego_v3 import MLPEEStego
+from pee_stego_v4 import PEEStego
+from utils.embed_cache import CachedStego, predictor_identity
+from utils.fuzzing import MeanPredictor
+from utils.neighbours import MemoizedPredictor
+from utils.server import BatchingPredictor
+
+
+class TestEmbedCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.signal = np.cumsum(rng.integers(-8, 9, 600)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 200))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hit_returns_same_output_without_recomputing(self):
+        stego = CachedStego(PEEStego(is_frequency_log=False), self.temp_dir.name)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = stego.embed(self.signal, self.secret_data, payload_rate=2)
+            with mock.patch.object(stego.stego, 'embed', side_effect=AssertionError('recomputed')):
+                second = stego.embed(self.signal, self.secret_data, 2, 0)
+
+            extracted = stego.extract(first[0], *first[1:5], payload_rate=2)
+
+        np.testing.assert_array_equal(first[0], second[0])
+        self.assertEqual(first[1:5], second[1:5])
+        self.assertEqual(first[5].snr, second[5].snr)
+        np.testing.assert_array_equal(extracted[0], self.signal)
+        self.assertEqual(stego.stats()['hits'], 1)
+        self.assertEqual(stego.stats()['misses'], 2)
+
+        # Cache tetap terbaca oleh objek baru (misalnya setelah restart)
+        reopened = CachedStego(PEEStego(is_frequency_log=False), self.temp_dir.name)
+        reopened.embed(self.signal, self.secret_data, payload_rate=2)
+        self.assertEqual(reopened.hit_rate, 1.0)
+
+    def test_hit_honours_out_and_in_place(self):
+        stego = CachedStego(PEEStego(is_frequency_log=False), self.temp_dir.name)
+        buffer = np.full_like(self.signal, -1)
+        data = self.signal.copy()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = stego.embed(self.signal, self.secret_data, payload_rate=2)
+            with mock.patch.object(stego.stego, 'embed', side_effect=AssertionError('recomputed')):
+                out = stego.embed(self.signal, self.secret_data, payload_rate=2, out=buffer)
+                in_place = stego.embed(data, self.secret_data, payload_rate=2, in_place=True)
+
+        self.assertIs(out[0], buffer)
+        self.assertIs(in_place[0], data)
+        np.testing.assert_array_equal(buffer, expected[0])
+        np.testing.assert_array_equal(data, expected[0])
+        self.assertEqual(in_place[1:5], expected[1:5])
+        self.assertEqual((stego.hits, stego.misses), (2, 1))
+
+    def test_source_change_invalidates_entries(self):
+        module_dir = os.path.join(self.temp_dir.name, 'module')
+        os.makedirs(module_dir)
+        module_path = os.path.join(module_dir, 'cached_stego_module.py')
+        with open(module_path, 'w') as module_file:
+            module_file.write('from pee_stego_v4 import PEEStego\n\n\nclass Stego(PEEStego):\n    pass\n')
+        sys.path.insert(0, module_dir)
+        self.addCleanup(sys.path.remove, module_dir)
+        self.addCleanup(sys.modules.pop, 'cached_stego_module', None)
+        module = importlib.import_module('cached_stego_module')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            stego = CachedStego(module.Stego(is_frequency_log=False), cache_dir)
+            stego.embed(self.signal, self.secret_data, payload_rate=2)
+
+            with open(module_path, 'a') as module_file:
+                module_file.write('\n# perubahan implementasi\n')
+            module = importlib.reload(module)
+            changed = CachedStego(module.Stego(is_frequency_log=False), cache_dir)
+            changed.embed(self.signal, self.secret_data, payload_rate=2)
+
+        self.assertNotEqual(stego.version, changed.version)
+        self.assertEqual((changed.hits, changed.misses), (0, 1))
+
+    def test_wrapped_predictor_identity_uses_inner_model(self):
+        model = MeanPredictor()
+        expected = predictor_identity(MLPEEStego(model))
+        memoized = MemoizedPredictor(model)
+        batching = BatchingPredictor(model)
+        self.addCleanup(batching.close)
+
+        before = predictor_identity(MLPEEStego(memoized))
+        memoized.predict(np.arange(8, dtype=np.float64).reshape(2, 4))
+        self.assertEqual(predictor_identity(MLPEEStego(memoized)), before)
+        self.assertEqual(before, f'MemoizedPredictor>{expected}')
+        self.assertEqual(predictor_identity(MLPEEStego(batching)), f'BatchingPredictor>{expected}')
+
+    def test_lru_eviction_respects_max_bytes(self):
+        stego = CachedStego(PEEStego(is_frequency_log=False), self.temp_dir.name, max_bytes=12_000)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for payload_rate in [1, 2, 3, 1]:
+                stego.embed(self.signal, self.secret_data, payload_rate=payload_rate)
+
+        self.assertLessEqual(stego.total_bytes, 12_000)
+        self.assertLess(len(stego.index), 3)
+        self.assertEqual(stego.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import math
+import unittest
+import numpy as np
+from utils.expansion import expansion_embed, expansion_extract
+from utils.neighbours import phase_row_count
+
+
+def reference_embed(data, phase, predicted_values, secret_data, threshold, bit_limit=None):
+    secret_index = 0
+    for row in range(phase_row_count(len(data), phase)):
+        if bit_limit is not None and secret_index == bit_limit:
+            break
+        i = phase - 1 + 3 * row
+        error = int(data[i + 2]) - int(predicted_values[row])
+        if abs(error) < threshold:
+            bit = 1 if secret_index < len(secret_data) and secret_data[secret_index] == '1' else 0
+            expanded_error = 2 * error + bit
+            secret_index += 1
+        elif error > 0:
+            expanded_error = error + threshold
+        else:
+            expanded_error = error - threshold + 1
+        data[i + 2] = int(predicted_values[row]) + expanded_error
+    return secret_index
+
+
+def reference_extract(data, phase, predicted_values, threshold):
+    secret_data = ''
+    for row in reversed(range(phase_row_count(len(data), phase))):
+        i = phase - 1 + 3 * row
+        error = int(data[i + 2]) - int(predicted_values[row])
+        if error >= 2 * threshold:
+            data[i + 2] -= threshold
+        elif error <= -2 * threshold + 1:
+            data[i + 2] += threshold - 1
+        else:
+            bit = error - 2 * math.floor(error / 2)
+            data[i + 2] -= math.floor(error / 2) + bit
+            secret_data = ('1' if bit else '0') + secret_data
+    return secret_data
+
+
+class TestExpansion(unittest.TestCase):
+    def test_matches_per_sample_loop(self):
+        rng = np.random.default_rng(5)
+        for case in range(200):
+            length = int(rng.integers(3, 80))
+            phase = int(rng.integers(1, 4))
+            threshold = int(rng.integers(-1, 7))
+            data = rng.integers(-50, 50, length).astype(np.int64)
+            predicted_values = rng.integers(-50, 50, phase_row_count(length, phase)).astype(np.int64)
+            secret_data = ''.join(rng.choice(['0', '1'], int(rng.integers(0, 30))))
+            bit_limit = None if case % 2 else len(secret_data)
+
+            expected = data.copy()
+            expected_index = reference_embed(expected, phase, predicted_values, secret_data, threshold, bit_limit)
+            actual = data.copy()
+            actual_index, _, _ = expansion_embed(actual, phase, predicted_values, secret_data, 0, threshold, bit_limit)
+            np.testing.assert_array_equal(actual, expected)
+            self.assertEqual(actual_index, expected_index)
+
+            restored = expected.copy()
+            expected_bits = reference_extract(restored, phase, predicted_values, threshold)
+            self.assertEqual(expansion_extract(actual, phase, predicted_values, threshold), expected_bits)
+            np.testing.assert_array_equal(actual, restored)
+            if bit_limit is None and threshold > 0:
+                np.testing.assert_array_equal(actual, data)
+
+    def test_embed_reports_last_index_and_stops_at_bit_limit(self):
+        data = np.zeros(20, dtype=np.int64)
+        predicted_values = np.zeros(phase_row_count(20, 2), dtype=np.int64)
+
+        secret_index, last_index, errors = expansion_embed(data, 2, predicted_values, '11', threshold=1, bit_limit=2)
+
+        self.assertEqual((secret_index, last_index, len(errors)), (2, 4, 2))
+        np.testing.assert_array_equal(data[[3, 6, 9]], [1, 1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
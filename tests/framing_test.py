@@ -0,0 +1,50 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from ml_pee_stego_v3 import MLPEEStego
+from pee_stego_v4 import PEEStego
+from utils.framing import HEADER_BITS, pack_header, unpack_header, verify_payload
+from utils.fuzzing import MeanPredictor
+
+
+class TestFraming(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.signal = np.cumsum(rng.integers(-9, 10, 2_000)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 700))
+
+    def test_header_round_trip(self):
+        header_bits = pack_header('0110', 3, 2, 1_234, 1)
+        header = unpack_header(header_bits)
+
+        self.assertEqual(len(header_bits), HEADER_BITS)
+        self.assertEqual((header['length'], header['bit_limit'], header['last_phase'], header['last_i'],
+                          header['last_bits']), (4, 3, 2, 1_234, 1))
+        verify_payload(header, '0110')
+        with self.assertRaises(ValueError):
+            verify_payload(header, '0111')
+
+    def test_framed_extract_needs_only_mirror_data(self):
+        for stego in (PEEStego(is_frequency_log=False), MLPEEStego(MeanPredictor(), is_frequency_log=False)):
+            for secret_data in (self.secret_data, self.secret_data[:40], ''):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    watermarked_data, mirror_data, *_ = stego.embed(self.signal, secret_data, 2, 1, framed=True)
+                    restored_data, extracted_secret_data = stego.extract(watermarked_data, mirror_data, framed=True)
+
+                np.testing.assert_array_equal(restored_data, self.signal)
+                self.assertEqual(extracted_secret_data, secret_data)
+
+    def test_framed_extract_detects_corrupted_payload(self):
+        stego = PEEStego(is_frequency_log=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            watermarked_data, mirror_data, *_ = stego.embed(self.signal, self.secret_data, 2, 0, framed=True)
+            changed = np.flatnonzero(watermarked_data != self.signal)
+            watermarked_data[changed[-1]] += 4
+
+            with self.assertRaises(ValueError):
+                stego.extract(watermarked_data, mirror_data, framed=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
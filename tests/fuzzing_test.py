@@ -0,0 +1,30 @@
+import unittest
+from unittest import mock
+import numpy as np
+from utils import fuzzing
+
+
+class TestFuzzing(unittest.TestCase):
+    def test_fuzz_v4_round_trip(self):
+        report = fuzzing.fuzz(cases=40, versions=[4], workers=2, batch_size=10, max_length=200)
+
+        self.assertEqual(report[4]['cases'], 40)
+        self.assertEqual(report[4]['failures'], 0)
+        self.assertGreater(report[4]['cases_per_second'], 0)
+
+    def test_shrink_case_keeps_failure(self):
+        case = fuzzing.random_case(4, seed=0, index=0)
+        case['signal'] = np.arange(100, dtype=np.int64)
+
+        def fake_run_case(candidate):
+            return 'signal_mismatch: palsu' if len(candidate['signal']) >= 7 else None
+
+        with mock.patch.object(fuzzing, 'run_case', fake_run_case):
+            shrunk = fuzzing.shrink_case(case, 'signal_mismatch: palsu')
+
+        self.assertEqual(len(shrunk['signal']), 7)
+        self.assertEqual(len(shrunk['secret_data']), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from ml_pee_stego_v1 import MLPEEStego as MLPEEStegoV1
+from ml_pee_stego_v2 import MLPEEStego as MLPEEStegoV2
+from utils.fuzzing import MeanPredictor
+from utils.key_sweep import PHASE_KEYS
+
+
+class CountingPredictor(MeanPredictor):
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+
+    def predict(self, neighbours):
+        self.calls += 1
+        self.rows += len(neighbours)
+        return super().predict(neighbours)
+
+
+class TestKeySweep(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.signal = np.cumsum(rng.integers(-6, 7, 900)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 250))
+
+    def assert_matches_separate_embeds(self, stego_class):
+        model = CountingPredictor()
+        table = stego_class(model, is_frequency_log=False).sweep_keys(self.signal, self.secret_data, threshold=3)
+        self.assertEqual(list(table.index), list(PHASE_KEYS))
+
+        for secret_key in PHASE_KEYS:
+            with contextlib.redirect_stdout(io.StringIO()), np.errstate(all='ignore'):
+                _, result = stego_class(MeanPredictor(), is_frequency_log=False).embed(
+                    self.signal, self.secret_data, threshold=3, secret_key=secret_key)
+            row = table.loc[secret_key]
+            self.assertEqual(row['unhidden_secret_count'], result.unhidden_secret_count)
+            for metric in ('ncc', 'prd', 'snr', 'psnr'):
+                np.testing.assert_equal(row[metric], getattr(result, metric))
+        return model, table
+
+    def test_v1_matches_separate_embeds_with_shared_predictions(self):
+        model, table = self.assert_matches_separate_embeds(MLPEEStegoV1)
+        self.assertEqual(model.calls, 7)
+        self.assertEqual(table.loc['000', 'capacity'], 0)
+
+    def test_v2_matches_separate_embeds(self):
+        self.assert_matches_separate_embeds(MLPEEStegoV2)
+
+    def test_v2_keys_whose_last_index_does_not_fit_fail_alone(self):
+        rng = np.random.default_rng(34)
+        signal = np.cumsum(rng.integers(-6, 7, 40)).astype(np.int64)
+        secret_data = ''.join(rng.choice(['0', '1'], 13))
+        with contextlib.redirect_stdout(io.StringIO()), np.errstate(all='ignore'):
+            table = MLPEEStegoV2(MeanPredictor(), is_frequency_log=False).sweep_keys(signal, secret_data, threshold=3)
+
+            failed = table['error'].notna()
+            self.assertTrue(0 < failed.sum() < len(PHASE_KEYS))
+            for secret_key in PHASE_KEYS:
+                stego = MLPEEStegoV2(MeanPredictor(), is_frequency_log=False)
+                row = table.loc[secret_key]
+                if failed[secret_key]:
+                    self.assertTrue(np.isnan(row['snr']))
+                    with self.assertRaises(IndexError):
+                        stego.embed(signal, secret_data, threshold=3, secret_key=secret_key)
+                else:
+                    _, result = stego.embed(signal, secret_data, threshold=3, secret_key=secret_key)
+                    np.testing.assert_equal(row['snr'], result.snr)
+
+    def test_v2_last_index_pass_predicts_only_leading_rows(self):
+        signal = np.tile(self.signal, 20)
+        model = CountingPredictor()
+        stego = MLPEEStegoV2(model, is_frequency_log=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            watermarked_data, _ = stego.embed(signal, self.secret_data, threshold=3, secret_key='100')
+            embed_rows = model.rows
+            restored_data, extracted_secret_data = stego.extract(watermarked_data, threshold=3, secret_key='100')
+
+        phase_rows = (len(signal) - 4 + 2) // 3
+        self.assertLess(embed_rows, phase_rows + 300)
+        self.assertLess(model.rows - embed_rows, phase_rows + 300)
+        np.testing.assert_array_equal(restored_data, signal)
+        self.assertEqual(extracted_secret_data, self.secret_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
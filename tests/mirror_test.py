@@ -0,0 +1,66 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from pee_stego_v4 import PEEStego
+from utils.fuzzing import random_case
+from utils.mirror import mirror_embed_values, mirror_extract_values
+
+
+class TestMirrorLayers(unittest.TestCase):
+    def setUp(self):
+        self.stego = PEEStego(is_frequency_log=False)
+        rng = np.random.default_rng(5)
+        self.signal = np.cumsum(rng.integers(-6, 7, 3_600)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 3_564))
+
+    def test_mirror_values_are_the_same_for_scalars_and_arrays(self):
+        rng = np.random.default_rng(8)
+        original_values = rng.integers(-500, 500, 200)
+        predicted_values = original_values + rng.choice([-1, 1], 200) * rng.integers(2, 60, 200)
+        bit_totals = rng.integers(1, 4, 200)
+        secret_values = rng.integers(0, 1 << bit_totals)
+
+        watermarked_values, mirror_values = mirror_embed_values(original_values, predicted_values, bit_totals,
+                                                                secret_values)
+        for row in range(200):
+            self.assertEqual(PEEStego.embed_value(original_values[row], predicted_values[row], int(bit_totals[row]),
+                                                  int(secret_values[row])),
+                             (watermarked_values[row], mirror_values[row]))
+
+        restored_values, extracted_values = mirror_extract_values(watermarked_values, predicted_values,
+                                                                  mirror_values, bit_totals)
+        np.testing.assert_array_equal(restored_values, original_values)
+        np.testing.assert_array_equal(extracted_values, secret_values)
+
+    def test_single_layer_matches_embed(self):
+        for index in range(60):
+            case = random_case(4, 3, index)
+            options = {'payload_rate': case['payload_rate'], 'threshold': case['threshold']}
+            with contextlib.redirect_stdout(io.StringIO()):
+                watermarked_data, *side_info, _ = self.stego.embed(case['signal'], case['secret_data'], **options)
+                layered_data, layer_side_info, _, _ = self.stego.embed_layers(case['signal'], case['secret_data'],
+                                                                              layers=1, **options)
+
+            np.testing.assert_array_equal(layered_data, watermarked_data)
+            if side_info[0]:
+                self.assertEqual(layer_side_info, [tuple(side_info)])
+
+    def test_layers_round_trip_and_add_capacity(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, _, result, layer_stats = self.stego.embed_layers(self.signal, self.secret_data, 1, 2)
+            watermarked_data, layer_side_info, layered_result, layered_stats = self.stego.embed_layers(
+                self.signal, self.secret_data, 3, 2)
+            restored_data, extracted_secret_data = self.stego.extract_layers(watermarked_data, layer_side_info, 2)
+
+        self.assertGreater(result.unhidden_secret_count, 0)
+        self.assertGreater(len(layered_stats), 1)
+        self.assertLess(layered_result.unhidden_secret_count, result.unhidden_secret_count)
+        self.assertEqual(layered_stats[0]['embedded_bits'], layer_stats[0]['embedded_bits'])
+        self.assertEqual(layered_stats[-1]['total_bits'], len(extracted_secret_data))
+        np.testing.assert_array_equal(restored_data, self.signal)
+        self.assertEqual(extracted_secret_data, self.secret_data[:len(extracted_secret_data)])
+
+
+if __name__ == '__main__':
+    unittest.main()
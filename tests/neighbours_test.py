@@ -0,0 +1,93 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from ml_pee_stego_v3 import MLPEEStego
+from utils.fuzzing import MeanPredictor
+from utils.neighbours import (MemoizedPredictor, PhasePredictionCache, neighbour_matrix, phase_neighbours,
+                              phase_targets, predict_model, training_pairs)
+
+
+class CountingPredictor(MeanPredictor):
+    def __init__(self):
+        self.rows = 0
+
+    def predict(self, neighbours):
+        self.rows += len(neighbours)
+        return super().predict(neighbours)
+
+
+class TestNeighbours(unittest.TestCase):
+    def test_phase_neighbours_match_manual_rows(self):
+        signal = np.arange(100, 120, dtype=np.int64)
+
+        for phase in range(1, 4):
+            indexes = [i for i in range(phase - 1, len(signal), 3) if i + 4 < len(signal)]
+            expected = [[signal[i], signal[i+1], signal[i+3], signal[i+4]] for i in indexes]
+
+            neighbours = phase_neighbours(signal, phase)
+            self.assertTrue(np.shares_memory(neighbours, signal))
+            np.testing.assert_array_equal(neighbour_matrix(signal, phase), expected)
+            np.testing.assert_array_equal(phase_targets(signal, phase), [signal[i+2] for i in indexes])
+
+    def test_batch_of_signals(self):
+        signals = np.arange(60, dtype=np.int64).reshape(3, 20)
+
+        matrix = neighbour_matrix(signals, 2)
+        self.assertEqual(matrix.shape, (3, 5, 4))
+        np.testing.assert_array_equal(matrix[1], neighbour_matrix(signals[1], 2))
+
+    def test_training_pairs_and_short_signal(self):
+        signal = np.arange(11, dtype=np.int64)
+
+        features, targets = training_pairs(signal, phases=(1, 2, 3))
+        self.assertEqual(features.shape, (len(targets), 4))
+        np.testing.assert_array_equal(features[0], [0, 1, 3, 4])
+        self.assertEqual(targets[0], 2)
+        self.assertEqual(neighbour_matrix(signal[:4], 1).shape, (0, 4))
+
+    def test_prediction_cache_only_repredicts_changed_rows(self):
+        signal = np.cumsum(np.random.default_rng(1).integers(-9, 10, 60)).astype(np.int64)
+        cache = PhasePredictionCache(MeanPredictor())
+
+        np.testing.assert_array_equal(cache.predict(signal, 2, 3, 9), predict_model(MeanPredictor(), signal, 2)[3:9])
+        self.assertEqual(cache.predicted_rows, 6)
+
+        signal[13] += 5  # tetangga baris 3 dan 4 fase 2
+        np.testing.assert_array_equal(cache.predict(signal, 2), predict_model(MeanPredictor(), signal, 2))
+        self.assertEqual(cache.predicted_rows, 6 + 2 + len(neighbour_matrix(signal, 2)) - 6)
+
+    def test_memoized_predictor_predicts_each_tuple_once(self):
+        model = CountingPredictor()
+        predictor = MemoizedPredictor(model, max_size=3)
+        neighbours = np.array([[1, 2, 3, 4], [5, 6, 7, 8], [1, 2, 3, 4], [1, 2, 3, 5]], dtype=np.float64)
+
+        np.testing.assert_array_equal(predictor.predict(neighbours), MeanPredictor().predict(neighbours))
+        self.assertEqual(model.rows, 3)
+        np.testing.assert_array_equal(predictor.predict(neighbours[:2]), MeanPredictor().predict(neighbours[:2]))
+        self.assertEqual(model.rows, 3)
+        self.assertEqual((predictor.hits, predictor.misses), (3, 3))
+
+        predictor.predict(np.array([[0, 0, 0, 0]]))  # [1, 2, 3, 5] paling lama tidak dipakai
+        predictor.predict(neighbours[3:])
+        self.assertEqual(model.rows, 5)
+        self.assertEqual(predictor.evictions, 2)
+        self.assertEqual(len(predictor), 3)
+
+    def test_memoized_predictor_keeps_stego_output(self):
+        rng = np.random.default_rng(2)
+        signal = np.tile(np.cumsum(rng.integers(-9, 10, 300)), 10).astype(np.int64)
+        secret_data = ''.join(rng.choice(['0', '1'], 900))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = MLPEEStego(MeanPredictor(), is_frequency_log=False).embed(signal, secret_data, 2, 0)
+            stego = MLPEEStego(MemoizedPredictor(MeanPredictor()), is_frequency_log=False)
+            actual = stego.embed(signal, secret_data, 2, 0)
+
+        np.testing.assert_array_equal(actual[0], expected[0])
+        self.assertEqual(actual[1:5], expected[1:5])
+        self.assertGreater(stego.model.hit_rate, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
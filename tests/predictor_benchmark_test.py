@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from utils.fuzzing import MeanPredictor
+from utils.neighbours import training_pairs
+from utils.predictor_benchmark import LLPPredictor, benchmark, discover_predictors
+
+
+class TestPredictorBenchmark(unittest.TestCase):
+    def test_leaderboard_rows_and_histograms(self):
+        rng = np.random.default_rng(2)
+        signal = np.cumsum(rng.integers(-5, 6, 3_000)).astype(np.int64)
+        features, targets = training_pairs(signal, phases=(1, 2, 3))
+        chunks = [(features[:1_000], targets[:1_000]), (features[1_000:], targets[1_000:])]
+
+        def broken():
+            raise ImportError('no backend')
+
+        table, histograms = benchmark(chunks, {'LLP': LLPPredictor, 'MEAN': MeanPredictor, 'BROKEN': broken})
+
+        self.assertEqual(table.loc['LLP', 'stego'], 'v4')
+        self.assertEqual(table.loc['MEAN', 'rows'], len(targets))
+        self.assertGreater(table.loc['MEAN', 'predictions_per_second'], 0)
+        self.assertIn('ImportError', table.loc['BROKEN', 'error'])
+        self.assertEqual(histograms['LLP'][1].sum(), len(targets))
+
+        llp_errors = targets - np.round(features.sum(axis=1) / 4)
+        self.assertAlmostEqual(table.loc['LLP', 'mae'], np.abs(llp_errors).mean())
+        self.assertEqual(table.loc['LLP', 'expansion_bits'], np.count_nonzero(np.abs(llp_errors) < 4))
+
+    def test_discovers_llp_and_model_files(self):
+        predictors = discover_predictors('models')
+        self.assertIn('LLP', predictors)
+        self.assertIn('lasso_model.pkl', predictors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import tracemalloc
+import unittest
+import numpy as np
+from utils.pso import AnnSwarmObjective, pso, unpack_ann_params
+
+
+def sphere(positions):
+    return np.sum((positions - 0.25) ** 2, axis=1)
+
+
+class PickleCountingSphere:
+    pickles = 0
+
+    def __getstate__(self):
+        PickleCountingSphere.pickles += 1
+        return {}
+
+    def __call__(self, positions):
+        return sphere(positions)
+
+
+class TestPSO(unittest.TestCase):
+    def test_pso_finds_sphere_minimum(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            best, best_value = pso(sphere, [-1.0] * 3, [1.0] * 3, swarmsize=30, maxiter=200, seed=0)
+
+        np.testing.assert_allclose(best, [0.25] * 3, atol=1e-3)
+        self.assertLess(best_value, 1e-6)
+
+    def test_pso_process_pool_matches_serial(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            serial = pso(sphere, [-1.0] * 2, [1.0] * 2, swarmsize=8, maxiter=20, seed=1)
+            pooled = pso(sphere, [-1.0] * 2, [1.0] * 2, swarmsize=8, maxiter=20, seed=1, processes=2)
+
+        np.testing.assert_array_equal(serial[0], pooled[0])
+        self.assertEqual(serial[1], pooled[1])
+
+    def test_pso_process_pool_sends_objective_once_per_worker(self):
+        PickleCountingSphere.pickles = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            pso(PickleCountingSphere(), [-1.0] * 2, [1.0] * 2, swarmsize=8, maxiter=20, seed=1, processes=2)
+
+        self.assertLessEqual(PickleCountingSphere.pickles, 2)
+
+    def test_ann_objective_matches_single_particle_forward(self):
+        rng = np.random.default_rng(2)
+        x = rng.normal(size=(50, 4))
+        y = rng.normal(size=50)
+        objective = AnnSwarmObjective(x, y, hidden_units=10, batch_size=16)
+        swarm = rng.uniform(-1, 1, size=(5, objective.dimension))
+
+        expected = []
+        for params in swarm:
+            weights_layer1, bias_layer1, weights_layer2, bias_layer2 = unpack_ann_params(params, 4, 10)
+            hidden = np.maximum(x @ weights_layer1 + bias_layer1, 0)
+            predicted = (hidden @ weights_layer2).reshape(-1) + bias_layer2
+            expected.append(np.mean((predicted - y) ** 2))
+
+        np.testing.assert_allclose(objective(swarm), expected)
+
+    def test_ann_objective_chunks_by_byte_budget(self):
+        rng = np.random.default_rng(3)
+        x = rng.normal(size=(20_000, 4))
+        y = rng.normal(size=20_000)
+        bounded = AnnSwarmObjective(x, y, max_bytes=1 << 20)
+        unbounded = AnnSwarmObjective(x, y, max_bytes=1 << 40)
+        swarm = rng.uniform(-1, 1, size=(50, bounded.dimension))
+
+        self.assertEqual(bounded.chunk_rows(50), (1 << 20) // (50 * 12 * 8))
+        self.assertEqual(bounded.chunk_rows(10 ** 6), 1)
+
+        tracemalloc.start()
+        try:
+            values = bounded(swarm)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 4 << 20)
+        np.testing.assert_allclose(values, unbounded(swarm))
+
+
+if __name__ == "__main__":
+    unittest.main()
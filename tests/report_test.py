@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import wfdb
+from pee_stego_v4 import PEEStego
+from utils.report import envelope_decimate, generate_reports, record_reports
+
+
+class EmptyExtractStego(PEEStego):
+    def extract(self, *args, **kwargs):
+        restored_data, _ = super().extract(*args, **kwargs)
+        return restored_data, ''
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.signal = (np.cumsum(rng.integers(-20, 21, 5_000)) + 500).astype(np.int64)
+
+    def test_envelope_keeps_extremes_of_each_bucket(self):
+        time, values = envelope_decimate(self.signal, 100)
+
+        self.assertEqual(len(values), 200)
+        self.assertEqual(values.min(), self.signal.min())
+        self.assertEqual(values.max(), self.signal.max())
+        self.assertEqual((values[0], values[1]), (self.signal[:50].min(), self.signal[:50].max()))
+        self.assertEqual(time[2], 50 / 360)
+
+        time, values = envelope_decimate(self.signal[:150], 100)
+        np.testing.assert_array_equal(values, self.signal[:150])
+
+    def test_generate_reports_writes_images_and_summary(self):
+        watermarked_data = self.signal.copy()
+        watermarked_data[::7] += 1
+        with tempfile.TemporaryDirectory() as output_dir:
+            table = generate_reports([{'name': 'a', 'original_data': self.signal,
+                                       'watermarked_data': watermarked_data, 'restored_data': self.signal}],
+                                     output_dir, workers=1, width=400, height=300)
+
+            self.assertTrue(os.path.getsize(os.path.join(output_dir, 'a.png')) > 0)
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'summary.csv')))
+            self.assertLess(table.loc[0, 'ncc'], 1)
+
+    def test_record_reports_round_trip(self):
+        with tempfile.TemporaryDirectory() as folder_path:
+            wfdb.wrsamp('900', fs=360, units=['mV'], sig_name=['MLII'], p_signal=self.signal[:, None] / 1000,
+                        fmt=['16'], adc_gain=[1000], baseline=[0], write_dir=folder_path)
+            table = record_reports(['900', '900'], PEEStego(is_frequency_log=False), '1011' * 100,
+                                   folder_path, folder_path, workers=2,
+                                   render_options={'width': 400, 'height': 300}, payload_rate=2)
+
+        self.assertEqual(list(table['name']), ['900', '900'])
+        self.assertTrue(table['is_restored'].all())
+        self.assertTrue(table['is_secret_extracted'].all())
+
+    def test_record_reports_flags_empty_or_truncated_extraction(self):
+        with tempfile.TemporaryDirectory() as folder_path:
+            wfdb.wrsamp('900', fs=360, units=['mV'], sig_name=['MLII'], p_signal=self.signal[:, None] / 1000,
+                        fmt=['16'], adc_gain=[1000], baseline=[0], write_dir=folder_path)
+            options = {'render_options': {'width': 400, 'height': 300}, 'workers': 1, 'payload_rate': 2}
+            # Secret jauh melebihi kapasitas 5.000 sampel sehingga hanya sebagian yang terekstrak
+            truncated = record_reports(['900'], PEEStego(is_frequency_log=False), '10' * 20_000,
+                                       folder_path, folder_path, **options)
+            empty = record_reports(['900'], EmptyExtractStego(is_frequency_log=False), '1011' * 100,
+                                   folder_path, folder_path, **options)
+
+        self.assertTrue(truncated['is_restored'].all())
+        self.assertFalse(truncated['is_secret_extracted'].any())
+        self.assertTrue(empty['is_restored'].all())
+        self.assertFalse(empty['is_secret_extracted'].any())
+
+
+if __name__ == '__main__':
+    unittest.main()
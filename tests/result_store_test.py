@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from utils.result_store import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.temp_dir.name, 'results.sqlite'))
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_import_csv_and_aggregate(self):
+        csv_path = os.path.join(self.temp_dir.name, 'result_v4_20240604_193154.csv')
+        with open(csv_path, 'w') as csv_file:
+            csv_file.write('payload_rate,threshold,index_signal,secret_name,len_secret_data,'
+                           'len_extracted_secret_data,ncc,prd,snr,time\n'
+                           '1,0,0,secret_0.99_bps,3564,3105,0.99,0.2,54.0,0.1\n'
+                           '1,0,1,secret_0.99_bps,3564,3564,0.99,0.4,50.0,0.3\n'
+                           '2,0,0,secret_0.99_bps,3564,3564,0.99,0.3,52.0,0.2\n')
+
+        self.assertEqual(self.store.import_csv(csv_path, predictor='LLP'), 3)
+
+        means = self.store.mean_metrics(version=4)
+        self.assertEqual([(row['payload_rate'], row['count']) for row in means], [(1, 2), (2, 1)])
+        self.assertAlmostEqual(means[0]['snr'], 52.0)
+
+        failures = self.store.capacity_failures()
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0]['failures'], 1)
+        self.assertEqual(failures[0]['missing_bits'], 459)
+
+    def test_insert_many_from_dict_rows(self):
+        rows = [{'payload_rate': 1, 'threshold': 0, 'index_signal': signal, 'secret_name': 'secret',
+                 'len_secret_data': 10, 'len_extracted_secret_data': 10, 'snr': 40.0 + signal}
+                for signal in range(4)]
+        self.assertEqual(self.store.insert_many(rows, version=3, predictor='SVR'), 4)
+
+        means = self.store.mean_metrics(group_by=['predictor'])
+        self.assertEqual(means[0]['predictor'], 'SVR')
+        self.assertAlmostEqual(means[0]['snr'], 41.5)
+
+    def test_old_database_gets_added_columns(self):
+        database_path = os.path.join(self.temp_dir.name, 'old.sqlite')
+        connection = sqlite3.connect(database_path)
+        connection.execute("CREATE TABLE results (id INTEGER PRIMARY KEY, version TEXT, predictor TEXT, "
+                           "payload_rate REAL, threshold REAL, index_signal INTEGER, secret_name TEXT, "
+                           "len_secret_data INTEGER, len_extracted_secret_data INTEGER, ncc REAL, prd REAL, "
+                           "snr REAL, psnr REAL, time REAL, source TEXT)")
+        connection.execute("INSERT INTO results (version, snr) VALUES ('4', 50.0)")
+        connection.commit()
+        connection.close()
+
+        with ResultStore(database_path) as store:
+            store.insert_many([{'snr': 52.0, 'unhidden_secret_count': 2, 'extra': {'embed_time': 0.5}}],
+                              version=4)
+            rows = store.query("SELECT snr, unhidden_secret_count, extra FROM results ORDER BY id")
+
+        self.assertEqual(rows, [{'snr': 50.0, 'unhidden_secret_count': None, 'extra': None},
+                                {'snr': 52.0, 'unhidden_secret_count': 2, 'extra': '{"embed_time": 0.5}'}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from utils.result import Result, ResultAccumulator
+from utils.result_store import ResultStore
+
+
+class TestResultAccumulator(unittest.TestCase):
+    def test_append_extend_and_exports(self):
+        result = Result()
+        result.ncc, result.prd, result.snr, result.psnr, result.timer = 0.99, 0.2, 54.0, 40.0, 0.01
+        result.unhidden_secret_count = 3
+
+        results = ResultAccumulator(chunk_size=4, timing_fields=('extract_time',))
+        results.append(result, version=4, predictor='LLP', payload_rate=1, threshold=0, index_signal=0,
+                       secret_name='secret_0.99_bps', len_secret_data=10, len_extracted_secret_data=7,
+                       extract_time=0.02)
+        results.extend(version=np.full(9, 3), predictor=['SVR', 'LASSO', 'SVR'] * 3,
+                       index_signal=np.arange(9), ncc=np.linspace(0, 1, 9),
+                       len_secret_data=np.full(9, 10), len_extracted_secret_data=np.full(9, 10))
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(results._chunks), 3)
+        self.assertEqual(results.records['unhidden_secret_count'][0], 3)
+        self.assertEqual(results.column('predictor').tolist(), ['LLP'] + ['SVR', 'LASSO', 'SVR'] * 3)
+        self.assertIsNone(results.column('secret_name')[1])
+        np.testing.assert_array_equal(results.column('index_signal')[1:], np.arange(9))
+        self.assertTrue(np.isnan(results.column('extract_time')[1]))
+
+        table = results.to_pandas()
+        self.assertEqual(table.loc[0, 'snr'], 54.0)
+        self.assertEqual(table['version'].tolist(), ['4'] + ['3'] * 9)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, 'result.csv')
+            results.to_csv(csv_path, columns=('payload_rate', 'threshold', 'secret_name', 'ncc', 'time'))
+            self.assertEqual(list(pd.read_csv(csv_path).columns),
+                             ['payload_rate', 'threshold', 'secret_name', 'ncc', 'time'])
+
+            with ResultStore(os.path.join(temp_dir, 'results.sqlite')) as store:
+                self.assertEqual(results.to_store(store, source='test'), 10)
+                rows = store.query("SELECT predictor, COUNT(*) AS count FROM results GROUP BY predictor ORDER BY predictor")
+                self.assertEqual([(row['predictor'], row['count']) for row in rows],
+                                 [('LASSO', 3), ('LLP', 1), ('SVR', 6)])
+                self.assertEqual(store.query("SELECT time, source, unhidden_secret_count, extra FROM results "
+                                             "WHERE predictor = 'LLP'"),
+                                 [{'time': 0.01, 'source': 'test', 'unhidden_secret_count': 3,
+                                   'extra': '{"extract_time": 0.02}'}])
+                self.assertEqual(store.query("SELECT COUNT(*) AS count FROM results WHERE extra IS NULL"),
+                                 [{'count': 9}])
+
+    def test_records_are_cached_until_rows_are_added(self):
+        results = ResultAccumulator(chunk_size=4)
+        results.extend(ncc=np.linspace(0, 1, 6))
+
+        records = results.records
+        self.assertIs(results.records, records)
+        self.assertFalse(records.flags.writeable)
+
+        results.append(ncc=2.0)
+        self.assertEqual(results.column('ncc')[-1], 2.0)
+        results.extend(ncc=[3.0, 4.0])
+        self.assertEqual(results.column('ncc')[-2:].tolist(), [3.0, 4.0])
+        self.assertEqual(len(records), 6)
+
+    def test_to_store_applies_defaults_to_unset_columns(self):
+        results = ResultAccumulator()
+        results.append(version=3, payload_rate=2, index_signal=5, ncc=0.9)
+        results.append(predictor='SVR', ncc=0.8)
+
+        self.assertEqual(results.column('index_signal').tolist(), [5, None])
+        self.assertTrue(results.to_pandas()['len_secret_data'].isna().all())
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with ResultStore(os.path.join(temp_dir, 'results.sqlite')) as store:
+                self.assertEqual(results.to_store(store, version=4, predictor='LLP', threshold=1), 2)
+                rows = store.query("SELECT version, predictor, payload_rate, threshold, index_signal, "
+                                   "len_secret_data, ncc FROM results ORDER BY id")
+
+        self.assertEqual(rows, [
+            {'version': '3', 'predictor': 'LLP', 'payload_rate': 2.0, 'threshold': 1.0, 'index_signal': 5,
+             'len_secret_data': None, 'ncc': 0.9},
+            {'version': '4', 'predictor': 'SVR', 'payload_rate': None, 'threshold': 1.0, 'index_signal': None,
+             'len_secret_data': None, 'ncc': 0.8},
+        ])
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ResultAccumulator().append(model_name='SVR')
+
+
+if __name__ == '__main__':
+    unittest.main()
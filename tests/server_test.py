@@ -0,0 +1,95 @@
+import contextlib
+import io
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from ml_pee_stego_v3 import MLPEEStego
+from utils.fuzzing import MeanPredictor
+from utils.server import BatchingPredictor, StegoClient, StegoService, make_server, to_json_value
+
+
+class SlowMeanPredictor(MeanPredictor):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, neighbours):
+        self.batch_sizes.append(len(neighbours))
+        time.sleep(0.01)
+        return super().predict(neighbours)
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.signal = np.cumsum(rng.integers(-8, 9, 600)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 200))
+
+        self.service = StegoService({'MEAN': MeanPredictor()}, max_wait=0.01)
+        self.server = make_server(self.service, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = StegoClient(f'http://127.0.0.1:{self.server.server_address[1]}')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+
+    def test_round_trip_matches_local_stego(self):
+        watermarked_data, *side_info, result = self.client.embed(
+            self.signal, self.secret_data, stego='v3:MEAN', payload_rate=2)
+        restored_data, extracted_secret_data = self.client.extract(
+            watermarked_data, *side_info, stego='v3:MEAN', payload_rate=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = MLPEEStego(MeanPredictor(), is_frequency_log=False).embed(
+                self.signal, self.secret_data, payload_rate=2)
+
+        np.testing.assert_array_equal(watermarked_data, expected[0])
+        self.assertEqual(side_info, to_json_value(expected[1:5]))
+        self.assertAlmostEqual(result['snr'], expected[5].snr)
+        np.testing.assert_array_equal(restored_data, self.signal)
+        self.assertEqual(extracted_secret_data, self.secret_data[:len(extracted_secret_data)])
+
+        estimate = self.client.capacity(self.signal, len(self.secret_data), payload_rate=2)
+        self.assertGreater(estimate['capacity'], 0)
+
+    def test_concurrent_handlers_are_silenced_per_thread(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                outputs = list(executor.map(
+                    lambda stego: self.service.handle('embed', {'stego': stego, 'signal': self.signal,
+                                                                'secret_data': self.secret_data,
+                                                                'payload_rate': 2}),
+                    ['v4', 'v3:MEAN'] * 4))
+                print('main')
+
+        self.assertEqual(output.getvalue(), 'main\n')
+        for first, second in zip(outputs[:2] * 3, outputs[2:]):
+            np.testing.assert_array_equal(first[0], second[0])
+
+    def test_unknown_stego_is_reported(self):
+        with self.assertRaises(RuntimeError):
+            self.client.embed(self.signal, self.secret_data, stego='v9')
+
+    def test_concurrent_predictions_are_batched(self):
+        model = SlowMeanPredictor()
+        predictor = BatchingPredictor(model, max_wait=0.05)
+        features = [np.full((count, 4), count, dtype=np.float64) for count in range(1, 9)]
+        try:
+            with ThreadPoolExecutor(max_workers=len(features)) as executor:
+                predicted_values = list(executor.map(predictor.predict, features))
+        finally:
+            predictor.close()
+
+        for feature, values in zip(features, predicted_values):
+            np.testing.assert_array_equal(values, feature.mean(axis=1))
+        self.assertEqual(predictor.request_count, len(features))
+        self.assertLess(predictor.batch_count, len(features))
+        self.assertEqual(sum(model.batch_sizes), sum(len(feature) for feature in features))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from utils.sweep import SweepExecutor, cell_key
+
+
+def make_cells():
+    return [{'version': 4, 'predictor': 'LLP', 'payload_rate': payload_rate, 'threshold': 0,
+             'index_signal': 0, 'secret_name': 'secret'} for payload_rate in [1, 2, 3]]
+
+
+def double_payload(cell):
+    return {'value': cell['payload_rate'] * 2}
+
+
+class TestSweepExecutor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.executor = SweepExecutor(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_restart_skips_completed_cells(self):
+        calls = []
+
+        def failing_run(cell):
+            if cell['payload_rate'] == 3:
+                raise RuntimeError('crash')
+            calls.append(cell['payload_rate'])
+            return double_payload(cell)
+
+        with self.assertRaises(RuntimeError):
+            self.executor.run(make_cells(), failing_run)
+        self.assertEqual(calls, [1, 2])
+
+        self.assertEqual(self.executor.run(make_cells(), double_payload), 1)
+        rows = sorted(self.executor.results(), key=lambda row: row['payload_rate'])
+        self.assertEqual([row['value'] for row in rows], [2, 4, 6])
+        self.assertEqual(os.listdir(self.executor.lock_dir), [])
+
+    def test_locked_cell_is_skipped_until_stale(self):
+        key = cell_key(make_cells()[0])
+        self.assertTrue(self.executor.claim(key))
+        self.assertEqual(self.executor.run(make_cells(), double_payload), 2)
+        self.assertFalse(self.executor.is_done(key))
+
+        stale_time = time.time() - self.executor.lock_timeout - 1
+        os.utime(self.executor.lock_path(key), (stale_time, stale_time))
+        self.assertEqual(self.executor.run(make_cells(), double_payload), 1)
+
+    def test_release_keeps_lock_taken_over_by_another_worker(self):
+        key = cell_key(make_cells()[0])
+        other = SweepExecutor(self.temp_dir.name)
+        self.assertTrue(self.executor.claim(key))
+
+        stale_time = time.time() - self.executor.lock_timeout - 1
+        os.utime(self.executor.lock_path(key), (stale_time, stale_time))
+        self.assertTrue(other.claim(key))
+        self.executor.release(key)
+
+        self.assertTrue(other.owns(key))
+        self.assertFalse(self.executor.owns(key))
+
+    def test_late_takeover_keeps_fresh_lock(self):
+        key = cell_key(make_cells()[0])
+        dead = SweepExecutor(self.temp_dir.name)
+        other = SweepExecutor(self.temp_dir.name)
+        self.assertTrue(dead.claim(key))
+        stale_token = dead._owner_tokens[key]
+        stale_time = time.time() - self.executor.lock_timeout - 1
+        os.utime(dead.lock_path(key), (stale_time, stale_time))
+
+        # Worker lain sudah membaca lock basi, lalu kalah cepat dari executor ini
+        self.assertTrue(self.executor.claim(key))
+        os.utime(self.executor.lock_path(key), (stale_time, stale_time))
+        read_lock = other._read_lock
+        reads = iter([stale_token])
+        other._read_lock = lambda path: next(reads, None) or read_lock(path)
+
+        self.assertFalse(other.claim(key))
+        self.assertTrue(self.executor.owns(key))
+        self.assertEqual(os.listdir(self.executor.lock_dir), [f'{key}.lock'])
+
+    def test_three_workers_racing_on_stale_lock(self):
+        key = cell_key(make_cells()[0])
+        stale_time = time.time() - self.executor.lock_timeout - 1
+        for _ in range(50):
+            dead = SweepExecutor(self.temp_dir.name)
+            self.assertTrue(dead.claim(key))
+            os.utime(dead.lock_path(key), (stale_time, stale_time))
+
+            workers = [SweepExecutor(self.temp_dir.name) for _ in range(3)]
+            barrier = threading.Barrier(len(workers))
+            claims = [None] * len(workers)
+
+            def race(index):
+                barrier.wait()
+                claims[index] = workers[index].claim(key)
+
+            threads = [threading.Thread(target=race, args=(index,)) for index in range(len(workers))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(claims.count(True), 1)
+            self.assertEqual([worker.owns(key) for worker in workers], claims)
+            self.assertEqual(os.listdir(self.executor.lock_dir), [f'{key}.lock'])
+            workers[claims.index(True)].release(key)
+
+    def test_third_worker_claim_during_takeover_is_not_removed(self):
+        key = cell_key(make_cells()[0])
+        dead = SweepExecutor(self.temp_dir.name)
+        slow = SweepExecutor(self.temp_dir.name)
+        third = SweepExecutor(self.temp_dir.name)
+        self.assertTrue(dead.claim(key))
+        stale_time = time.time() - self.executor.lock_timeout - 1
+        os.utime(dead.lock_path(key), (stale_time, stale_time))
+
+        # slow sudah melihat lock basi, lalu executor ini mengambil alih dan third mencoba claim
+        # sebelum slow melanjutkan
+        getmtime = os.path.getmtime
+        calls = []
+
+        def paused_getmtime(path):
+            mtime = getmtime(path)
+            if not calls:
+                calls.append(path)
+                self.assertTrue(self.executor.claim(key))
+                self.assertFalse(third.claim(key))
+            return mtime
+
+        with mock.patch('os.path.getmtime', paused_getmtime):
+            self.assertFalse(slow.claim(key))
+        self.assertTrue(self.executor.owns(key))
+        self.assertFalse(third.owns(key))
+        self.assertEqual(os.listdir(self.executor.lock_dir), [f'{key}.lock'])
+
+    def test_heartbeat_keeps_long_cell_locked(self):
+        executor = SweepExecutor(self.temp_dir.name, lock_timeout=0.3, heartbeat_interval=0.05)
+        other = SweepExecutor(self.temp_dir.name, lock_timeout=0.3)
+        claims = []
+
+        def slow_run(cell):
+            time.sleep(0.6)
+            claims.append(other.claim(cell_key(cell)))
+            return double_payload(cell)
+
+        self.assertEqual(executor.run(make_cells()[:1], slow_run), 1)
+        self.assertEqual(claims, [False])
+        self.assertEqual(os.listdir(executor.lock_dir), [])
+
+    def test_parallel_workers_do_not_duplicate(self):
+        self.assertEqual(self.executor.run(make_cells(), double_payload, workers=3), 3)
+        self.assertEqual(len(self.executor.results()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import wfdb
+from sklearn.linear_model import ElasticNet, Lasso, Ridge
+from utils.neighbours import training_pairs
+from utils.training import fit_linear, fit_sgd, iter_record_chunks
+
+
+def split_chunks(features, targets, chunk_size=70):
+    for start in range(0, len(targets), chunk_size):
+        yield features[start:start + chunk_size], targets[start:start + chunk_size]
+
+
+class TestTraining(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        signal = (np.cumsum(rng.integers(-20, 21, 1_000)) + 500).astype(np.int64)
+        self.features, self.targets = training_pairs(signal, phases=(1, 2, 3))
+
+    def test_streamed_linear_models_match_sklearn(self):
+        for kind, reference in [('ridge', Ridge(alpha=10.0)),
+                                ('lasso', Lasso(alpha=5.0, tol=1e-8, max_iter=100_000)),
+                                ('elastic_net', ElasticNet(alpha=5.0, l1_ratio=0.3, tol=1e-8, max_iter=100_000))]:
+            options = {'alpha': reference.alpha, 'tol': 1e-10, 'max_iter': 100_000}
+            if kind == 'ridge':
+                options = {'alpha': reference.alpha}
+            if kind == 'elastic_net':
+                options['l1_ratio'] = reference.l1_ratio
+
+            model = fit_linear(split_chunks(self.features, self.targets), kind, **options)
+            reference.fit(self.features, self.targets)
+
+            np.testing.assert_allclose(model.coef_, reference.coef_, rtol=1e-4, atol=1e-6)
+            np.testing.assert_allclose(model.predict(self.features[:10]),
+                                       reference.predict(self.features[:10]), rtol=1e-6)
+
+    def test_sgd_pipeline_trains_incrementally(self):
+        model = fit_sgd(lambda: split_chunks(self.features, self.targets), epochs=3, random_state=0)
+
+        errors = model.predict(self.features) - self.targets
+        self.assertLess(np.sqrt(np.mean(errors ** 2)), np.std(self.targets))
+
+    def test_record_chunks_cover_whole_record(self):
+        rng = np.random.default_rng(1)
+        signal = np.cumsum(rng.integers(-5, 6, 1_000)) / 1000
+
+        with tempfile.TemporaryDirectory() as folder_path:
+            wfdb.wrsamp('900', fs=360, units=['mV'], sig_name=['MLII'],
+                        p_signal=signal.reshape(-1, 1), fmt=['212'], write_dir=folder_path)
+            record, _ = wfdb.rdsamp(os.path.join(folder_path, '900'), channel_names=['MLII'])
+            expected_features, expected_targets = training_pairs(
+                (record[:, 0] * 1000).astype(np.int64), phases=(1,))
+
+            chunks = list(iter_record_chunks(folder_path, phases=(1,), chunk_size=50, segment_samples=100))
+
+        self.assertTrue(all(len(targets) <= 50 for _, targets in chunks))
+        features = np.concatenate([features for features, _ in chunks])
+        targets = np.concatenate([targets for _, targets in chunks])
+        self.assertEqual(sorted(map(tuple, features)), sorted(map(tuple, expected_features)))
+        self.assertEqual(sorted(targets), sorted(expected_targets))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from ml_pee_stego_v3 import MLPEEStego
+from pee_stego_v4 import PEEStego
+from utils.fuzzing import MeanPredictor
+from utils.tuning import select_setting
+
+
+class TestTuning(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.signal = np.cumsum(rng.integers(-8, 9, 3600)).astype(np.int64)
+        self.secret_data = ''.join(rng.choice(['0', '1'], 1500))
+
+    def test_select_setting_prefers_target_then_distortion(self):
+        estimates = [
+            {'fits': False, 'embedded_bits': 90, 'noise_power': 1.0, 'prd': 0.1, 'snr': 60.0},
+            {'fits': True, 'embedded_bits': 100, 'noise_power': 9.0, 'prd': 0.5, 'snr': 45.0},
+            {'fits': True, 'embedded_bits': 100, 'noise_power': 4.0, 'prd': 0.3, 'snr': 50.0},
+        ]
+
+        best = select_setting(estimates, target_snr=40)
+        self.assertEqual(best['noise_power'], 4.0)
+        self.assertTrue(best['meets_target'])
+
+        best = select_setting(estimates, target_snr=55)
+        self.assertFalse(best['meets_target'])
+        self.assertTrue(best['fits'])
+
+    def test_tune_estimates_close_to_real_embed(self):
+        stego = PEEStego(is_frequency_log=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            best, estimates = stego.tune(self.signal, len(self.secret_data),
+                                         secret_data=self.secret_data)
+
+        self.assertEqual(len(estimates), 6)
+        # (1, 1) dan (2, 0) memiliki ceil(payload_rate + threshold) yang sama
+        self.assertEqual(estimates[1]['noise_power'], estimates[2]['noise_power'])
+
+        result = best['embedding'][-1]
+        self.assertAlmostEqual(best['snr'], result.snr, delta=1.0)
+
+    def test_v3_tune_matches_estimate_and_real_embed(self):
+        stego = MLPEEStego(MeanPredictor(), is_frequency_log=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            best, estimates = stego.tune(self.signal, len(self.secret_data), target_snr=30,
+                                         payload_rates=(1, 2), thresholds=(0, 1),
+                                         secret_data=self.secret_data)
+            watermarked_data, *side_info, result = best['embedding']
+            restored_data, extracted_secret_data = stego.extract(
+                watermarked_data, *side_info, payload_rate=best['payload_rate'], threshold=best['threshold'])
+
+        self.assertEqual([(estimate['payload_rate'], estimate['threshold']) for estimate in estimates],
+                         [(1, 0), (1, 1), (2, 0), (2, 1)])
+        for estimate in estimates:
+            expected = stego.estimate(self.signal, len(self.secret_data),
+                                      estimate['payload_rate'], estimate['threshold'])
+            self.assertEqual({key: estimate[key] for key in expected}, expected)
+
+        self.assertAlmostEqual(best['snr'], result.snr, delta=1.0)
+        np.testing.assert_array_equal(restored_data, self.signal)
+        self.assertEqual(extracted_secret_data, self.secret_data[:len(extracted_secret_data)])
+
+
+if __name__ == "__main__":
+    unittest.main()
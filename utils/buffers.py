@@ -0,0 +1,32 @@
+from typing import Optional
+import numpy as np
+
+
+def output_array(data: np.ndarray, out: Optional[np.ndarray] = None, in_place: bool = False) -> np.ndarray:
+    """
+    Array kerja embed/extract tanpa alokasi tambahan jika diminta.
+
+    Parameters:
+    - data (np.ndarray): Sinyal masukan.
+    - out (np.ndarray, opsional): Buffer milik pemanggil berbentuk sama; isinya ditimpa salinan data.
+    - in_place (bool): Jika True, data itu sendiri yang diubah. Default: False.
+
+    Returns:
+    np.ndarray: data (in_place), out berisi salinan data, atau salinan baru seperti sebelumnya.
+
+    Raises:
+    ValueError: Jika out dan in_place diberikan bersamaan.
+
+    Example:
+    buffer = np.empty_like(original_data)
+    for original_data in windows:
+        watermarked_data, *side_info, result = stego.embed(original_data, secret_data, out=buffer)
+    """
+    if in_place and out is not None:
+        raise ValueError("out dan in_place tidak bisa dipakai bersamaan")
+    if in_place:
+        return data
+    if out is None:
+        return data.copy()
+    np.copyto(out, data)
+    return out
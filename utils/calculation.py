@@ -77,3 +77,157 @@ class Calculation:
             return 100  # Jika MSE nol, artinya tidak ada noise pada sinyal.
         psnr = 10 * np.log10(max_value**2 / mse)
         return psnr / 2
+
+
+def _dot(first: np.ndarray, second: np.ndarray):
+    """
+    Sum of first * second, exact (Python int) for integer arrays.
+    """
+    if first.dtype.kind in 'iub' and second.dtype.kind in 'iub':
+        return int(np.dot(first.astype(np.int64, copy=False), second.astype(np.int64, copy=False)))
+    return float(np.dot(first.astype(np.float64, copy=False), second.astype(np.float64, copy=False)))
+
+
+def _sum(values: np.ndarray):
+    return int(values.sum(dtype=np.int64)) if values.dtype.kind in 'iub' else float(values.sum(dtype=np.float64))
+
+
+class MetricAccumulator:
+    """
+    Running sums for PRD, NCC, SNR and PSNR, updated per chunk or per modified sample so the
+    full original and reconstructed signals never have to be in memory together.
+
+    For integer signals the sums are exact, so PRD, SNR and PSNR equal the `Calculation`
+    results exactly. NCC is computed from the exact sums and matches the batch value to
+    floating-point rounding.
+
+    Example:
+    metrics = MetricAccumulator()
+    for original_chunk, watermarked_chunk in chunks:
+        metrics.update(original_chunk, watermarked_chunk)
+    metrics.snr()
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sum_original = 0
+        self.sum_reconstructed = 0
+        self.sum_original_squared = 0
+        self.sum_reconstructed_squared = 0
+        self.sum_cross = 0
+        self.sum_difference_squared = 0
+        self.max_value = None
+
+    def _update_max(self, values: np.ndarray):
+        if len(values):
+            value = values.max().item()
+            self.max_value = value if self.max_value is None else max(self.max_value, value)
+
+    def update(self, original_chunk: np.ndarray, reconstructed_chunk: np.ndarray = None):
+        """
+        Add a chunk of samples.
+
+        Parameters:
+        - original_chunk (numpy.ndarray): Original samples.
+        - reconstructed_chunk (numpy.ndarray, optional): Reconstructed samples at the same positions.
+          Defaults to the original chunk, i.e. samples that are not modified (yet).
+        """
+        original_chunk = np.asarray(original_chunk)
+        if reconstructed_chunk is None:
+            # Unmodified samples: every reconstructed sum equals the original one
+            original_sum = _sum(original_chunk)
+            original_squared = _dot(original_chunk, original_chunk)
+            self.count += len(original_chunk)
+            self.sum_original += original_sum
+            self.sum_reconstructed += original_sum
+            self.sum_original_squared += original_squared
+            self.sum_reconstructed_squared += original_squared
+            self.sum_cross += original_squared
+            self._update_max(original_chunk)
+            return
+
+        reconstructed_chunk = np.asarray(reconstructed_chunk)
+        difference = original_chunk - reconstructed_chunk
+
+        self.count += len(original_chunk)
+        self.sum_original += _sum(original_chunk)
+        self.sum_reconstructed += _sum(reconstructed_chunk)
+        self.sum_original_squared += _dot(original_chunk, original_chunk)
+        self.sum_reconstructed_squared += _dot(reconstructed_chunk, reconstructed_chunk)
+        self.sum_cross += _dot(original_chunk, reconstructed_chunk)
+        self.sum_difference_squared += _dot(difference, difference)
+        self._update_max(original_chunk)
+        self._update_max(reconstructed_chunk)
+
+    def update_modified(self, original_values: np.ndarray, reconstructed_values: np.ndarray):
+        """
+        Correct samples that were added unmodified with `update(original_chunk)` and were later
+        changed, e.g. by embedding in place.
+
+        Parameters:
+        - original_values (numpy.ndarray): Original values of the modified samples.
+        - reconstructed_values (numpy.ndarray): Final values of the same samples.
+
+        Notes:
+        Each position must be reported at most once, with its final value. Unmodified samples
+        never exceed the original maximum, so the PSNR peak only needs the modified values.
+        """
+        original_values = np.asarray(original_values)
+        reconstructed_values = np.asarray(reconstructed_values)
+        delta = reconstructed_values - original_values
+
+        self.sum_reconstructed += _sum(delta)
+        self.sum_reconstructed_squared += (_dot(reconstructed_values, reconstructed_values)
+                                           - _dot(original_values, original_values))
+        self.sum_cross += _dot(original_values, delta)
+        self.sum_difference_squared += _dot(delta, delta)
+        self._update_max(reconstructed_values)
+
+    def merge(self, other: 'MetricAccumulator') -> 'MetricAccumulator':
+        """
+        Add the sums of another accumulator, e.g. from another worker or record segment.
+        """
+        for name in ('count', 'sum_original', 'sum_reconstructed', 'sum_original_squared',
+                     'sum_reconstructed_squared', 'sum_cross', 'sum_difference_squared'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        if other.max_value is not None:
+            self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        return self
+
+    def prd(self) -> float:
+        """
+        PRD in percentage, see `Calculation.prd`.
+        """
+        return (np.sqrt(np.float64(self.sum_difference_squared)) / np.sqrt(np.float64(self.sum_original_squared))) * 100
+
+    def ncc(self) -> float:
+        """
+        NCC, see `Calculation.ncc`.
+        """
+        numerator = self.count * self.sum_cross - self.sum_original * self.sum_reconstructed
+        original_variance = self.count * self.sum_original_squared - self.sum_original ** 2
+        reconstructed_variance = self.count * self.sum_reconstructed_squared - self.sum_reconstructed ** 2
+        return np.float64(numerator) / np.sqrt(np.float64(original_variance) * np.float64(reconstructed_variance))
+
+    def snr(self) -> float:
+        """
+        SNR in decibels, see `Calculation.snr`.
+        """
+        return 10 * np.log10(np.float64(self.sum_original_squared) / np.float64(self.sum_difference_squared))
+
+    def psnr(self) -> float:
+        """
+        PSNR in decibels, see `Calculation.psnr`.
+        """
+        mse = np.float64(self.sum_difference_squared) / self.count
+        if mse == 0:
+            return 100  # Jika MSE nol, artinya tidak ada noise pada sinyal.
+        psnr = 10 * np.log10(np.float64(self.max_value) ** 2 / mse)
+        return psnr / 2
+
+    def metrics(self) -> dict:
+        """
+        NCC, PRD, SNR and PSNR as a dict, like `utils.key_sweep.quality_metrics`.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {'ncc': self.ncc(), 'prd': self.prd(), 'snr': self.snr(), 'psnr': self.psnr()}
@@ -1,7 +1,9 @@
 import wfdb
 import numpy as np
 import os
-from typing import List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
 
 ECG_FOLDER_PATH = 'data/mit-bih-arrhythmia-database-1.0.0/'
 
@@ -115,3 +117,116 @@ def get_filenames_from_folder(extension: str, folder_path: str):
     file_names_without_extension = [os.path.splitext(f)[0] for f in files]
 
     return file_names_without_extension
+
+
+def load_record(patient_code: str, folder_path: str = ECG_FOLDER_PATH) -> np.ndarray:
+    """
+    Mengambil seluruh record MLII pasien dalam satuan mV x 1000 (int64).
+
+    Parameters:
+    - patient_code (str): Kode pasien/nama file tanpa ekstensi.
+    - folder_path (str): Folder database MIT-BIH.
+
+    Returns:
+    numpy.ndarray: Seluruh sinyal record, kosong jika record tidak memiliki kanal MLII.
+    """
+    record, _ = wfdb.rdsamp(os.path.join(folder_path, patient_code), channel_names=['MLII'])
+    if record is None or record.shape[1] == 0:
+        return np.empty(0, dtype=np.int64)
+    return (record[:, 0] * 1000).astype(np.int64)
+
+
+def slice_windows(signal: np.ndarray, window_size: int = 3_600, stride: Optional[int] = None,
+                  max_windows: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Memotong sinyal menjadi window penuh berukuran window_size tanpa menyalin data.
+
+    Parameters:
+    - signal (np.ndarray): Sinyal record.
+    - window_size (int): Panjang window. Default: 3600 (10 detik pada 360 Hz).
+    - stride (int, opsional): Jarak awal antar window. Default: window_size (tanpa overlap).
+    - max_windows (int, opsional): Jumlah window maksimal per record.
+
+    Returns:
+    List[np.ndarray]: Daftar window berupa view dari sinyal.
+
+    Notes:
+    Window berbagi memori dengan sinyal record. Jika stride < window_size, window saling overlap,
+    sehingga mengubah satu window (misalnya `embed(..., in_place=True)`) ikut mengubah window
+    berikutnya. Gunakan mode salinan default atau `out=` untuk window yang overlap.
+    """
+    stride = window_size if stride is None else stride
+    starts = range(0, len(signal) - window_size + 1, stride)
+    if max_windows is not None:
+        starts = starts[:max_windows]
+    return [signal[start:start + window_size] for start in starts]
+
+
+class PrefetchLoader:
+    """
+    Iterator window sinyal yang memuat record berikutnya di thread pool selama window saat ini diproses.
+
+    Decode wfdb dan konversi NumPy sebagian besar melepas GIL, sehingga I/O record berjalan
+    bersamaan dengan embedding. Loader memegang paling banyak buffer_size record sekaligus,
+    termasuk record yang window-nya sedang dikonsumsi: record pengganti baru dimuat setelah window
+    terakhir record saat ini diambil. Window yang masih disimpan konsumen tidak termasuk batas ini.
+    Window yang dihasilkan adalah view record (lihat `slice_windows`), jadi jangan ubah in-place
+    jika stride < window_size.
+
+    Example:
+    for patient_code, window_index, signal in PrefetchLoader(max_windows=1):
+        stego.embed(signal, secret_data)
+    """
+
+    def __init__(self, patient_codes: Optional[Sequence[str]] = None,
+                 folder_path: str = ECG_FOLDER_PATH,
+                 window_size: int = 3_600,
+                 stride: Optional[int] = None,
+                 max_windows: Optional[int] = None,
+                 workers: int = 4,
+                 buffer_size: int = 8):
+        if patient_codes is None:
+            patient_codes = sorted(get_filenames_from_folder('dat', folder_path))
+        if buffer_size < 1:
+            raise ValueError("buffer_size minimal 1")
+
+        self.patient_codes = list(patient_codes)
+        self.folder_path = folder_path
+        self.window_size = window_size
+        self.stride = stride
+        self.max_windows = max_windows
+        self.workers = workers
+        self.buffer_size = buffer_size
+
+    def __len__(self) -> int:
+        return len(self.patient_codes)
+
+    def _load_windows(self, patient_code: str) -> List[np.ndarray]:
+        signal = load_record(patient_code, self.folder_path)
+        return slice_windows(signal, self.window_size, self.stride, self.max_windows)
+
+    def __iter__(self) -> Iterator[Tuple[str, int, np.ndarray]]:
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            remaining_codes = iter(self.patient_codes)
+
+            def submit_next():
+                patient_code = next(remaining_codes, None)
+                if patient_code is not None:
+                    pending.append((patient_code, executor.submit(self._load_windows, patient_code)))
+
+            for _ in range(self.buffer_size):
+                submit_next()
+
+            try:
+                while pending:
+                    patient_code, future = pending.popleft()
+                    windows = future.result()
+                    for window_index, window in enumerate(windows):
+                        yield patient_code, window_index, window
+                    # Lepas record saat ini sebelum memuat penggantinya
+                    windows = window = future = None
+                    submit_next()
+            finally:
+                for _, future in pending:
+                    future.cancel()
@@ -1,3 +1,197 @@
+import numpy as np
+from typing import NamedTuple, Optional, Sequence, Union
+
+BitData = Union[str, np.ndarray]
+
+# Jumlah bit 1 untuk setiap nilai byte, dipakai menghitung error dari hasil XOR packed bits
+_POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+# Jumlah bit 0 di depan bit 1 pertama (urutan MSB dulu seperti np.packbits)
+_LEADING_ZEROS_TABLE = np.array([8 - value.bit_length() for value in range(256)], dtype=np.int64)
+
+
+class BitErrorReport(NamedTuple):
+    length: int
+    error_count: int
+    bit_error_rate: float
+    error_positions: np.ndarray
+    first_mismatch: int
+    burst_count: int
+    max_burst_length: int
+    mean_burst_length: float
+
+
+def to_bit_array(bits: BitData) -> np.ndarray:
+    """
+    Mengubah string bit ('0101...') atau array menjadi array uint8 berisi 0/1 tanpa loop Python.
+    Nilai selain 0/1 ditolak dengan ValueError agar data rusak tidak terhitung sebagai bit valid.
+    """
+    if isinstance(bits, str):
+        try:
+            values = np.frombuffer(bits.encode('ascii'), dtype=np.uint8) - np.uint8(ord('0'))
+        except UnicodeEncodeError:
+            raise ValueError("Bit hanya boleh berisi karakter '0' atau '1'.") from None
+        # Karakter di bawah '0' ikut menjadi > 1 karena uint8 berputar
+        if (values > 1).any():
+            raise ValueError("Bit hanya boleh berisi karakter '0' atau '1'.")
+        return values
+
+    values = np.asarray(bits)
+    if values.size and not np.isin(values, (0, 1)).all():
+        raise ValueError("Bit hanya boleh bernilai 0 atau 1.")
+    return values.astype(np.uint8, copy=False)
+
+
+def bit_errors(secret: BitData, extracted_secret: BitData, pad: Optional[str] = None) -> BitErrorReport:
+    """
+    Menganalisis error bit antara secret dan hasil ekstraksinya secara vektor.
+
+    Parameters:
+        secret (str | np.ndarray): Bit secret asli.
+        extracted_secret (str | np.ndarray): Bit hasil ekstraksi.
+        pad (str, opsional): Jika None, bit yang hilang karena panjang berbeda dihitung sebagai error.
+            Jika '0' atau '1', string yang lebih pendek diisi nilai tersebut (seperti `ljust`).
+
+    Returns:
+        BitErrorReport: Panjang perbandingan, jumlah dan posisi error, BER, indeks perbedaan
+        pertama (-1 jika sama), serta statistik burst (deret error berurutan).
+    """
+    secret_bits = to_bit_array(secret)
+    extracted_bits = to_bit_array(extracted_secret)
+    length = max(len(secret_bits), len(extracted_bits))
+
+    if pad is None:
+        common_length = min(len(secret_bits), len(extracted_bits))
+    else:
+        common_length = length
+        secret_bits = _pad_bits(secret_bits, length, int(pad))
+        extracted_bits = _pad_bits(extracted_bits, length, int(pad))
+
+    difference = np.packbits(secret_bits[:common_length]) ^ np.packbits(extracted_bits[:common_length])
+    error_count = int(_POPCOUNT_TABLE[difference].sum(dtype=np.int64))
+    if error_count:
+        error_positions = np.flatnonzero(np.unpackbits(difference, count=common_length))
+    else:
+        error_positions = np.empty(0, dtype=np.int64)
+
+    if common_length < length:
+        error_positions = np.concatenate([error_positions, np.arange(common_length, length)])
+        error_count += length - common_length
+
+    burst_lengths = _burst_lengths(error_positions)
+    return BitErrorReport(
+        length=length,
+        error_count=error_count,
+        bit_error_rate=error_count / length if length else 0.0,
+        error_positions=error_positions,
+        first_mismatch=int(error_positions[0]) if error_count else -1,
+        burst_count=len(burst_lengths),
+        max_burst_length=int(burst_lengths.max()) if len(burst_lengths) else 0,
+        mean_burst_length=float(burst_lengths.mean()) if len(burst_lengths) else 0.0,
+    )
+
+
+def bit_errors_batch(secrets: Sequence[BitData], extracted_secrets: Sequence[BitData],
+                     pad: Optional[str] = None) -> dict:
+    """
+    Versi batch dari `bit_errors` untuk banyak pasangan secret/ekstraksi sekaligus.
+
+    Semua pasangan disusun menjadi satu matriks packed bits (8 bit per byte), sehingga
+    perbandingan dilakukan dengan XOR dan popcount seperti `bit_errors` dalam satu operasi NumPy.
+
+    Returns:
+        dict: Array per pasangan untuk 'length', 'error_count', 'bit_error_rate',
+        'first_mismatch', 'burst_count' dan 'max_burst_length'.
+    """
+    if len(secrets) != len(extracted_secrets):
+        raise ValueError("Jumlah secret dan hasil ekstraksi harus sama.")
+
+    secret_rows = [to_bit_array(bits) for bits in secrets]
+    extracted_rows = [to_bit_array(bits) for bits in extracted_secrets]
+    secret_lengths = np.array([len(row) for row in secret_rows], dtype=np.int64)
+    extracted_lengths = np.array([len(row) for row in extracted_rows], dtype=np.int64)
+    lengths = np.maximum(secret_lengths, extracted_lengths)
+    # Minimal satu byte agar argmax tetap terdefinisi saat semua bit kosong
+    byte_width = max(1, (int(lengths.max()) + 7) // 8 if len(lengths) else 0)
+
+    secret_matrix = _packed_matrix(secret_rows, byte_width)
+    extracted_matrix = _packed_matrix(extracted_rows, byte_width)
+    secret_valid = _packed_valid(secret_lengths, byte_width)
+    extracted_valid = _packed_valid(extracted_lengths, byte_width)
+
+    if pad is None:
+        mismatch = ((secret_matrix ^ extracted_matrix) & secret_valid & extracted_valid) | \
+            (secret_valid ^ extracted_valid)
+    else:
+        fill = np.uint8(0xFF if int(pad) else 0)
+        mismatch = ((secret_matrix & secret_valid) | (fill & ~secret_valid)) ^ \
+            ((extracted_matrix & extracted_valid) | (fill & ~extracted_valid))
+
+    error_count = _POPCOUNT_TABLE[mismatch].sum(axis=1, dtype=np.int64)
+    rows = np.arange(len(mismatch))
+    first_byte = np.argmax(mismatch != 0, axis=1)
+    first_mismatch = np.where(error_count > 0,
+                              first_byte * 8 + _LEADING_ZEROS_TABLE[mismatch[rows, first_byte]], -1)
+
+    # Awal burst: bit error yang bit sebelumnya bukan error, akhir burst: bit error yang bit
+    # sesudahnya bukan error. Bit tetangga lintas byte diambil dari byte sebelah.
+    previous_bits = mismatch >> 1
+    previous_bits[:, 1:] |= (mismatch[:, :-1] & 1) << 7
+    next_bits = mismatch << 1
+    next_bits[:, :-1] |= mismatch[:, 1:] >> 7
+    burst_starts = mismatch & ~previous_bits
+    burst_ends = mismatch & ~next_bits
+
+    start_rows, start_positions = _set_bit_positions(burst_starts)
+    _, end_positions = _set_bit_positions(burst_ends)
+    max_burst_length = np.zeros(len(mismatch), dtype=np.int64)
+    np.maximum.at(max_burst_length, start_rows, end_positions - start_positions + 1)
+
+    return {
+        'length': lengths,
+        'error_count': error_count,
+        'bit_error_rate': np.divide(error_count, lengths, out=np.zeros(len(lengths)), where=lengths > 0),
+        'first_mismatch': first_mismatch,
+        'burst_count': _POPCOUNT_TABLE[burst_starts].sum(axis=1, dtype=np.int64),
+        'max_burst_length': max_burst_length,
+    }
+
+
+def _pad_bits(bits: np.ndarray, length: int, value: int) -> np.ndarray:
+    if len(bits) >= length:
+        return bits
+    return np.concatenate([bits, np.full(length - len(bits), value, dtype=np.uint8)])
+
+
+def _burst_lengths(error_positions: np.ndarray) -> np.ndarray:
+    if len(error_positions) == 0:
+        return np.empty(0, dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(error_positions) != 1)
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.concatenate([breaks, [len(error_positions) - 1]])
+    return ends - starts + 1
+
+
+def _packed_matrix(rows: Sequence[np.ndarray], byte_width: int) -> np.ndarray:
+    matrix = np.zeros((len(rows), byte_width), dtype=np.uint8)
+    for index, row in enumerate(rows):
+        packed = np.packbits(row)
+        matrix[index, :len(packed)] = packed
+    return matrix
+
+
+def _packed_valid(lengths: np.ndarray, byte_width: int) -> np.ndarray:
+    # Byte penuh bernilai 0xFF, byte terakhir hanya berisi bit sisa di bagian MSB
+    valid_bits = np.clip(lengths[:, None] - 8 * np.arange(byte_width), 0, 8)
+    return (0xFF00 >> valid_bits).astype(np.uint8)
+
+
+def _set_bit_positions(packed: np.ndarray):
+    # Hanya byte tidak nol yang di-unpack, urutan hasil per baris tetap naik
+    rows, columns = np.nonzero(packed)
+    byte_indexes, bits = np.nonzero(np.unpackbits(packed[rows, columns][:, None], axis=1))
+    return rows[byte_indexes], columns[byte_indexes] * 8 + bits
+
+
 def check_difference(secret, extracted_secret):
     """
     Memeriksa perbedaan antara dua string.
@@ -14,34 +208,24 @@ def check_difference(secret, extracted_secret):
         - Jika ada perbedaan, pesan juga akan mencantumkan indeks pertama di mana perbedaan terjadi
           serta karakter yang berbeda pada masing-masing string pada indeks tersebut.
 
+    Notes:
+        Untuk analisis bit error lengkap (BER, posisi, burst) gunakan `bit_errors`.
+
     Examples:
         >>> check_difference('abc', 'abd')
-        2
         Perbedaan ditemukan pada indeks 2: 'c' != 'd'
         >>> check_difference('xyz', 'xyz')
         Tidak ada perbedaan di antara keduanya.
     """
-    def first_different_index(str1, str2):
-        # Tentukan panjang string terpendek
-        min_len = min(len(str1), len(str2))
-        # Loop melalui karakter-karakter string
-        for i in range(min_len):
-            if str1[i] != str2[i]:
-                return i
-
-        # Jika semua karakter sama sampai panjang minimal, namun panjang string tidak sama,
-        # kembalikan panjang minimal
-        if len(str1) != len(str2):
-            return min_len
-
-        # Jika tidak ada perbedaan ditemukan sampai panjang minimal, kembalikan -1
-        return -1
-
     max_len = len(secret) if len(secret) > len(
         extracted_secret) else len(extracted_secret)
     string1 = secret.ljust(max_len, '0')
     string2 = extracted_secret.ljust(max_len, '0')
-    different_index = first_different_index(string1, string2)
+
+    # Bandingkan code point semua karakter sekaligus
+    mismatch = np.frombuffer(string1.encode('utf-32-le'), dtype=np.uint32) != \
+        np.frombuffer(string2.encode('utf-32-le'), dtype=np.uint32)
+    different_index = int(np.argmax(mismatch)) if mismatch.any() else -1
 
     if different_index != -1:
         print(
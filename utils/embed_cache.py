@@ -0,0 +1,253 @@
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+
+# Argumen yang hanya menentukan di mana output ditulis, bukan isinya
+OUTPUT_ARGUMENTS = ('out', 'in_place')
+
+# Naikkan jika format output yang di-cache berubah tanpa perubahan kode stego
+IMPLEMENTATION_VERSION = 1
+
+
+def implementation_identity(stego_type: type) -> str:
+    """
+    Hash source kode yang menentukan output kelas stego untuk kunci cache.
+
+    Yang di-hash adalah file modul kelas stego beserta semua modul proyek (file di bawah folder
+    modul tersebut) yang diimpor olehnya secara transitif, misalnya utils/mirror.py untuk PEEStego.
+    Setiap perubahan kode embedding menghasilkan kunci baru sehingga output lama tidak terpakai lagi.
+
+    Parameters:
+    - stego_type (type): Kelas stego, misalnya PEEStego.
+
+    Returns:
+    str: Versi implementasi dan hash sha1 source.
+    """
+    root_module = sys.modules[stego_type.__module__]
+    root_dir = os.path.dirname(os.path.abspath(root_module.__file__))
+    pending = [root_module]
+    paths = {}
+    while pending:
+        module = pending.pop()
+        path = getattr(module, '__file__', None)
+        if path is None:
+            continue
+        path = os.path.abspath(path)
+        if path in paths or not path.startswith(root_dir + os.sep):
+            continue
+        paths[path] = module
+        for value in vars(module).values():
+            module_name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if isinstance(module_name, str) and module_name in sys.modules:
+                pending.append(sys.modules[module_name])
+
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, root_dir).encode('utf-8'))
+        with open(path, 'rb') as source_file:
+            digest.update(source_file.read())
+    return f'{IMPLEMENTATION_VERSION}:{digest.hexdigest()}'
+
+
+def predictor_identity(stego, predictor_name: Optional[str] = None) -> str:
+    """
+    Identitas prediktor objek stego untuk kunci cache.
+
+    Parameters:
+    - stego: Objek PEEStego/MLPEEStego.
+    - predictor_name (str, opsional): Nama eksplisit, misalnya 'SVR 2.0'. Jika tidak ada, dipakai
+      hash pickle model; model yang tidak bisa di-pickle (misalnya Keras) wajib diberi nama.
+
+    Notes:
+    Pembungkus yang menyimpan model aslinya di atribut `model` (MemoizedPredictor,
+    BatchingPredictor) tidak mengubah prediksi, sehingga yang di-hash adalah model terdalam.
+    State pembungkus seperti isi cache LRU atau thread tidak ikut kunci.
+
+    Returns:
+    str: Identitas prediktor.
+    """
+    if predictor_name is not None:
+        return predictor_name
+
+    model = getattr(stego, 'model', None)
+    if model is None:
+        return 'LLP'
+
+    # vars() dipakai agar __getattr__ pembungkus tidak meneruskan pencarian `model` ke model aslinya
+    wrappers = []
+    while 'model' in getattr(model, '__dict__', {}):
+        wrappers.append(type(model).__name__)
+        model = vars(model)['model']
+    try:
+        model_hash = hashlib.sha1(pickle.dumps(model)).hexdigest()
+    except Exception as error:
+        raise ValueError("Model tidak bisa di-pickle, berikan predictor_name untuk cache") from error
+    return ''.join(f'{wrapper}>' for wrapper in wrappers) + f'{type(model).__name__}:{model_hash}'
+
+
+class CachedStego:
+    """
+    Pembungkus cache berbasis konten untuk kelas stego.
+
+    Kunci cache adalah hash dari (bytes sinyal, bit secret atau side info, versi, identitas prediktor,
+    parameter). Versi berisi nama kelas dan hash source implementasinya (lihat
+    `implementation_identity`), sehingga cache lama otomatis tidak terpakai setelah kode berubah. Hasil embed/extract disimpan di disk sebagai pickle dengan batas ukuran total dan
+    eviksi LRU. Method lain diteruskan ke objek stego aslinya.
+
+    `out` dan `in_place` tidak ikut kunci; saat hit, sinyal hasil disalin ke buffer out atau ke
+    sinyal masukan (in_place) seperti pada pemanggilan langsung.
+
+    Example:
+    stego = CachedStego(PEEStego(), 'out/cache')
+    watermarked_data, mirror_data, last_phase, last_i, last_embedded_bit_total, result = stego.embed(
+        original_data, secret_data, payload_rate=2)
+    """
+
+    def __init__(self, stego, cache_dir: str = 'out/cache', max_bytes: int = 1 << 30,
+                 predictor_name: Optional[str] = None):
+        self.stego = stego
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = f'{type(stego).__module__}.{type(stego).__qualname__}:{implementation_identity(type(stego))}'
+        self.predictor = predictor_identity(stego, predictor_name)
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Index LRU: key -> ukuran file, urut dari yang paling lama tidak dipakai
+        entries = []
+        for filename in os.listdir(cache_dir):
+            if filename.endswith('.pkl'):
+                path = os.path.join(cache_dir, filename)
+                entries.append((os.path.getmtime(path), filename[:-4], os.path.getsize(path)))
+        self.index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self.total_bytes = sum(self.index.values())
+
+    def __getattr__(self, name):
+        if name == 'stego':
+            raise AttributeError(name)
+        return getattr(self.stego, name)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'entries': len(self.index), 'bytes': self.total_bytes}
+
+    def embed(self, *args, **kwargs):
+        return self._cached('embed', args, kwargs)
+
+    def extract(self, *args, **kwargs):
+        return self._cached('extract', args, kwargs)
+
+    def _arguments(self, method_name: str, args: tuple, kwargs: dict) -> inspect.BoundArguments:
+        method = getattr(type(self.stego), method_name)
+        arguments = inspect.signature(method).bind(self.stego, *args, **kwargs)
+        arguments.apply_defaults()
+        return arguments
+
+    def cache_key(self, method_name: str, args: tuple, kwargs: dict) -> str:
+        """
+        Hash dari argumen yang sudah dinormalisasi dengan signature method, sehingga argumen posisi
+        dan keyword dengan nilai sama (termasuk default) menghasilkan kunci yang sama.
+        """
+        arguments = self._arguments(method_name, args, kwargs)
+
+        digest = hashlib.sha256()
+        digest.update(f'{self.version}|{self.predictor}|{method_name}'.encode('utf-8'))
+        for name, value in list(arguments.arguments.items())[1:]:
+            if name in OUTPUT_ARGUMENTS:
+                continue
+            digest.update(f'|{name}='.encode('utf-8'))
+            if isinstance(value, np.ndarray):
+                value = np.ascontiguousarray(value)
+                digest.update(f'{value.dtype.str}{value.shape}'.encode('utf-8'))
+                digest.update(value.tobytes())
+            else:
+                digest.update(repr(value).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _output_target(self, method_name: str, args: tuple, kwargs: dict) -> Optional[np.ndarray]:
+        """
+        Array yang harus berisi sinyal hasil menurut out/in_place, atau None untuk salinan baru.
+        """
+        arguments = self._arguments(method_name, args, kwargs).arguments
+        if arguments.get('out') is not None:
+            return arguments['out']
+        if arguments.get('in_place'):
+            return list(arguments.values())[1]
+        return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def _cached(self, method_name: str, args: tuple, kwargs: dict):
+        key = self.cache_key(method_name, args, kwargs)
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as cache_file:
+                output = pickle.load(cache_file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            output = None
+        else:
+            self.hits += 1
+            os.utime(path)
+            if key not in self.index:
+                self.index[key] = os.path.getsize(path)
+                self.total_bytes += self.index[key]
+            self.index.move_to_end(key)
+
+            target = self._output_target(method_name, args, kwargs)
+            if target is not None:
+                np.copyto(target, output[0])
+                output = (target,) + tuple(output[1:])
+            return output
+
+        self.misses += 1
+        output = getattr(self.stego, method_name)(*args, **kwargs)
+        self._store(key, output)
+        return output
+
+    def _store(self, key: str, output):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                pickle.dump(output, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.total_bytes -= self.index.pop(key, 0)
+        self.index[key] = os.path.getsize(self._path(key))
+        self.total_bytes += self.index[key]
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.index) > 1:
+            key, size = self.index.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for key in list(self.index):
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        self.index.clear()
+        self.total_bytes = 0
@@ -0,0 +1,132 @@
+import numpy as np
+from typing import Literal, Optional, Tuple
+from utils.neighbours import PHASE_STEP, TARGET_OFFSET, phase_row_count
+
+
+def secret_bits(secret_data: str, start: int, count: int) -> np.ndarray:
+    """
+    Bit secret_data[start:start + count] sebagai array 0/1. Posisi setelah secret habis diisi 0,
+    karakter selain '1' dianggap 0.
+    """
+    chunk = secret_data[start:start + count]
+    bits = np.zeros(count, dtype=np.int64)
+    bits[:len(chunk)] = np.frombuffer(chunk.encode('utf-32-le'), dtype=np.uint32) == ord('1')
+    return bits
+
+
+def _limit_rows(inner: np.ndarray, bit_limit: Optional[int]) -> int:
+    """
+    Jumlah baris yang diproses jika proses berhenti tepat setelah baris inner ke-bit_limit.
+    """
+    if bit_limit is None:
+        return len(inner)
+    if bit_limit <= 0:
+        return 0
+    inner_count = np.cumsum(inner)
+    if len(inner_count) == 0 or inner_count[-1] < bit_limit:
+        return len(inner)
+    return int(np.searchsorted(inner_count, bit_limit)) + 1
+
+
+def _target_slice(phase: int, rows: int, row_offset: int = 0) -> slice:
+    start = phase - 1 + TARGET_OFFSET + PHASE_STEP * row_offset
+    return slice(start, start + PHASE_STEP * rows, PHASE_STEP)
+
+
+def row_chunks(total_rows: int, first_rows: int = 256):
+    """
+    Potongan baris (start, stop) yang ukurannya berlipat dua, untuk pass yang biasanya hanya
+    membutuhkan sedikit baris di awal fase.
+    """
+    start = 0
+    size = max(1, first_rows)
+    while start < total_rows:
+        yield start, min(total_rows, start + size)
+        start += size
+        size *= 2
+
+
+def expansion_embed(watermarked_data: np.ndarray, phase: Literal[1, 2, 3], predicted_values: np.ndarray,
+                    secret_data: str, secret_index: int = 0, threshold: int = 4,
+                    bit_limit: Optional[int] = None, row_offset: int = 0) -> Tuple[int, Optional[int], np.ndarray]:
+    """
+    Expansion embedding berbasis threshold (v1/v2) untuk satu fase secara in-place.
+
+    Error e = x - prediksi dengan |e| < threshold menjadi 2e + bit, sisanya digeser
+    e + threshold (e > 0) atau e - threshold + 1. Hasilnya sama persis dengan loop per sampel.
+
+    Parameters:
+    - watermarked_data (np.ndarray): Sinyal yang diubah in-place.
+    - phase (int): Fase 1, 2, atau 3.
+    - predicted_values (np.ndarray): Prediksi baris row_offset dan seterusnya, misalnya dari
+      `predict_phase`. Hanya baris yang memiliki prediksi yang diproses.
+    - secret_data (str): Secret biner.
+    - secret_index (int): Posisi bit secret pertama untuk fase ini. Default: 0.
+    - threshold (int): Threshold expansion. Default: 4.
+    - bit_limit (int, opsional): Berhenti tepat setelah bit ke-bit_limit disisipkan, seperti
+      `break` ketika secret habis di v2. Default: semua baris diproses.
+    - row_offset (int): Baris pertama yang diproses. Default: 0.
+
+    Returns:
+    Tuple[int, Optional[int], np.ndarray]: secret_index baru, i terakhir yang berisi bit (None jika
+    tidak ada), dan error baris yang diproses.
+    """
+    rows = max(0, min(phase_row_count(len(watermarked_data), phase) - row_offset, len(predicted_values)))
+    predicted_values = np.asarray(predicted_values[:rows], dtype=np.int64)
+    errors = watermarked_data[_target_slice(phase, rows, row_offset)] - predicted_values
+    inner = np.abs(errors) < threshold
+
+    rows = _limit_rows(inner, bit_limit)
+    errors = errors[:rows]
+    inner = inner[:rows]
+    inner_rows = np.flatnonzero(inner)
+
+    expanded_errors = np.where(errors > 0, errors + threshold, errors - threshold + 1)
+    expanded_errors[inner] = 2 * errors[inner] + secret_bits(secret_data, secret_index, len(inner_rows))
+    watermarked_data[_target_slice(phase, rows, row_offset)] = predicted_values[:rows] + expanded_errors
+
+    last_index = int(phase - 1 + PHASE_STEP * (row_offset + inner_rows[-1])) if len(inner_rows) else None
+    return secret_index + len(inner_rows), last_index, errors
+
+
+def expansion_extract(original_data: np.ndarray, phase: Literal[1, 2, 3], predicted_values: np.ndarray,
+                      threshold: int = 4, row_count: Optional[int] = None,
+                      bit_limit: Optional[int] = None, row_offset: int = 0) -> str:
+    """
+    Kebalikan `expansion_embed` untuk satu fase secara in-place.
+
+    Parameters:
+    - original_data (np.ndarray): Sinyal watermark yang dipulihkan in-place.
+    - phase (int): Fase 1, 2, atau 3.
+    - predicted_values (np.ndarray): Prediksi baris row_offset dan seterusnya dari sinyal saat ini.
+    - threshold (int): Threshold expansion. Default: 4.
+    - row_count (int, opsional): Hanya memproses baris 0..row_count-1. Default: semua baris.
+    - bit_limit (int, opsional): Berhenti tepat setelah bit ke-bit_limit terekstrak.
+    - row_offset (int): Baris pertama yang diproses. Default: 0.
+
+    Returns:
+    str: Bit yang terekstrak dari baris yang diproses, urut dari baris pertama.
+    """
+    rows = max(0, min(phase_row_count(len(original_data), phase) - row_offset, len(predicted_values)))
+    if row_count is not None:
+        rows = min(rows, row_count)
+    watermarked_values = original_data[_target_slice(phase, rows, row_offset)]
+    predicted_values = np.asarray(predicted_values[:rows], dtype=np.int64)
+    errors = watermarked_values - predicted_values
+
+    upper = errors >= 2 * threshold
+    lower = ~upper & (errors <= -2 * threshold + 1)
+    inner = ~(upper | lower)
+
+    rows = _limit_rows(inner, bit_limit)
+    watermarked_values = watermarked_values[:rows]
+    errors = errors[:rows]
+    upper, lower, inner = upper[:rows], lower[:rows], inner[:rows]
+
+    half_errors = errors // 2
+    bits = errors - 2 * half_errors
+    original_data[_target_slice(phase, rows, row_offset)] = np.where(
+        upper, watermarked_values - threshold,
+        np.where(lower, watermarked_values + threshold - 1, watermarked_values - half_errors - bits))
+
+    return (bits[inner] + ord('0')).astype(np.uint8).tobytes().decode('ascii')
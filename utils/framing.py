@@ -0,0 +1,160 @@
+import binascii
+from typing import Callable, List, Sequence, Tuple
+import numpy as np
+from utils.expansion import row_chunks
+from utils.neighbours import PHASE_STEP, TARGET_OFFSET, phase_row_count, phase_targets
+
+# Header framing v3/v4: (nama field, jumlah bit), diikuti CRC-16 dari field dan payload
+HEADER_FIELDS = (
+    ('length', 32),
+    ('bit_limit', 8),
+    ('last_phase', 2),
+    ('last_i', 32),
+    ('last_bits', 8),
+)
+CRC_BITS = 16
+HEADER_BITS = sum(bits for _, bits in HEADER_FIELDS) + CRC_BITS
+
+# Header selalu disisipkan 1 bit per sampel di fase 1, sehingga bisa dibaca tanpa parameter
+HEADER_PHASE = 1
+HEADER_BIT_TOTAL = 1
+
+
+def _crc(field_bits: str, secret_data: str) -> int:
+    return binascii.crc_hqx((field_bits + secret_data).encode('ascii'), 0xFFFF)
+
+
+def pack_header(secret_data: str, bit_limit: int, last_phase: int, last_i: int, last_bits: int) -> str:
+    """
+    Membuat bit header framing untuk payload yang sudah disisipkan.
+
+    Parameters:
+    - secret_data (str): Bagian secret yang benar-benar tersisipkan.
+    - bit_limit (int): ceil(payload_rate + threshold) saat embed.
+    - last_phase, last_i, last_bits (int): Posisi akhir payload seperti side info embed.
+
+    Returns:
+    str: HEADER_BITS bit header.
+    """
+    values = {'length': len(secret_data), 'bit_limit': bit_limit, 'last_phase': last_phase,
+              'last_i': last_i, 'last_bits': last_bits}
+    field_bits = ''
+    for name, bits in HEADER_FIELDS:
+        if not 0 <= values[name] < 2 ** bits:
+            raise ValueError(f"Field header {name}={values[name]} tidak muat dalam {bits} bit")
+        field_bits += format(values[name], f'0{bits}b')
+    return field_bits + format(_crc(field_bits, secret_data), f'0{CRC_BITS}b')
+
+
+def unpack_header(header_bits: str) -> dict:
+    """
+    Kebalikan `pack_header`: field header dan CRC dari bit header.
+    """
+    header = {}
+    position = 0
+    for name, bits in HEADER_FIELDS:
+        header[name] = int(header_bits[position:position + bits], 2)
+        position += bits
+    header['field_bits'] = header_bits[:position]
+    header['crc'] = int(header_bits[position:position + CRC_BITS], 2)
+    return header
+
+
+def verify_payload(header: dict, secret_data: str):
+    """
+    Memastikan payload hasil ekstraksi sesuai panjang dan CRC header.
+
+    Raises:
+    ValueError: Jika panjang atau CRC tidak cocok.
+    """
+    if len(secret_data) != header['length']:
+        raise ValueError(f"Panjang payload {len(secret_data)} tidak sesuai header ({header['length']})")
+    if _crc(header['field_bits'], secret_data) != header['crc']:
+        raise ValueError("CRC payload tidak cocok dengan header")
+
+
+def header_rows(data: np.ndarray, predict_phase: Callable[[np.ndarray, int], np.ndarray],
+                first_rows: int = 256) -> Tuple[int, np.ndarray]:
+    """
+    Jumlah baris awal fase 1 yang dipakai header, yaitu baris sampai sampel ber-error >= 2 ke-HEADER_BITS.
+
+    Sampel dengan error <= 1 tidak disisipi, dan sampel yang disisipi tetap ber-error >= 2, sehingga
+    hasilnya sama untuk sinyal asli maupun sinyal watermark. Prediksi dihitung dari potongan awal
+    sinyal yang diperbesar dua kali lipat, bukan seluruh fase.
+
+    Parameters:
+    - data (np.ndarray): Sinyal asli atau watermark.
+    - predict_phase (Callable): Fungsi prediksi fase kelas stego.
+
+    Returns:
+    Tuple[int, np.ndarray]: Jumlah baris header dan prediksi baris-baris tersebut.
+
+    Raises:
+    ValueError: Jika sinyal terlalu pendek untuk header.
+    """
+    total_rows = phase_row_count(len(data), HEADER_PHASE)
+    for _, rows in row_chunks(total_rows, first_rows):
+        prefix = data[:PHASE_STEP * rows + TARGET_OFFSET]
+        predicted_values = np.asarray(predict_phase(prefix, HEADER_PHASE), dtype=np.int64)
+        embeddable = np.abs(phase_targets(prefix, HEADER_PHASE) - predicted_values) > 1
+        embeddable_count = np.cumsum(embeddable)
+        if len(embeddable_count) and embeddable_count[-1] >= HEADER_BITS:
+            row_count = int(np.searchsorted(embeddable_count, HEADER_BITS)) + 1
+            return row_count, predicted_values[:row_count]
+
+    raise ValueError(f"Sinyal terlalu pendek untuk header framing ({HEADER_BITS} bit)")
+
+
+def header_indexes(row_count: int) -> range:
+    """
+    Indeks i baris header di fase 1.
+    """
+    return range(HEADER_PHASE - 1, HEADER_PHASE - 1 + PHASE_STEP * row_count, PHASE_STEP)
+
+
+def embed_header(watermarked_data: np.ndarray, predicted_values: np.ndarray, header_bits: str,
+                 embed_value: Callable[[int, int, int, int], Tuple[int, int]]) -> List[int]:
+    """
+    Menyisipkan header 1 bit per sampel ber-error >= 2 pada baris header fase 1 secara in-place,
+    dengan aturan mirror kelas stego (`embed_value`).
+
+    Returns:
+    List[int]: Mirror data header, diletakkan sebelum mirror data payload.
+    """
+    mirror_data = []
+    for row, i in enumerate(header_indexes(len(predicted_values))):
+        original_value = watermarked_data[i + TARGET_OFFSET]
+        predicted_value = int(predicted_values[row])
+        if abs(original_value - predicted_value) <= 1:
+            continue
+
+        watermarked_value, mirror_diff = embed_value(original_value, predicted_value, HEADER_BIT_TOTAL,
+                                                     int(header_bits[len(mirror_data)]))
+        watermarked_data[i + TARGET_OFFSET] = watermarked_value
+        mirror_data.append(mirror_diff)
+    return mirror_data
+
+
+def extract_header(original_data: np.ndarray, predicted_values: np.ndarray, mirror_data: Sequence[int],
+                   extract_value: Callable[[int, int, int, int], Tuple[int, str]]) -> dict:
+    """
+    Kebalikan `embed_header`: memulihkan baris header secara in-place dan membaca field header.
+
+    Raises:
+    ValueError: Jika mirror_data lebih pendek dari header.
+    """
+    if len(mirror_data) < HEADER_BITS:
+        raise ValueError(f"mirror_data berisi {len(mirror_data)} nilai, header membutuhkan {HEADER_BITS}")
+
+    header_bits = []
+    for row, i in enumerate(header_indexes(len(predicted_values))):
+        watermarked_value = original_data[i + TARGET_OFFSET]
+        predicted_value = int(predicted_values[row])
+        if abs(watermarked_value - predicted_value) <= 1:
+            continue
+
+        original_value, bits = extract_value(watermarked_value, predicted_value,
+                                             mirror_data[len(header_bits)], HEADER_BIT_TOTAL)
+        original_data[i + TARGET_OFFSET] = original_value
+        header_bits.append(bits)
+    return unpack_header(''.join(header_bits))
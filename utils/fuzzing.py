@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+import numpy as np
+
+VERSIONS = (1, 2, 3, 4)
+
+
+class MeanPredictor:
+    """
+    Model pengganti untuk MLPEEStego: rata-rata 4 tetangga, tanpa dependensi sklearn/keras.
+    """
+
+    def predict(self, neighbours):
+        return np.asarray(neighbours, dtype=np.float64).mean(axis=1)
+
+
+def make_stego(version: int, model=None):
+    """
+    Membuat objek stego untuk versi 1-4 tanpa log frekuensi.
+    """
+    model = MeanPredictor() if model is None else model
+    if version == 1:
+        from ml_pee_stego_v1 import MLPEEStego
+        return MLPEEStego(model, is_frequency_log=False)
+    if version == 2:
+        from ml_pee_stego_v2 import MLPEEStego
+        return MLPEEStego(model, is_frequency_log=False)
+    if version == 3:
+        from ml_pee_stego_v3 import MLPEEStego
+        return MLPEEStego(model, is_frequency_log=False)
+    if version == 4:
+        from pee_stego_v4 import PEEStego
+        return PEEStego(is_frequency_log=False)
+    raise ValueError(f"Versi {version} tidak dikenal")
+
+
+def random_case(version: int, seed: int, index: int, max_length: int = 600, max_secret: int = 600) -> dict:
+    """
+    Membuat kasus acak yang deterministik dari (seed, index): sinyal random walk seperti EKG,
+    secret biner, dan parameter sesuai versi.
+    """
+    rng = np.random.default_rng([seed, version, index])
+    length = int(rng.integers(16, max_length + 1))
+    step = int(rng.integers(1, 40))
+    signal = (int(rng.integers(-1_000, 1_000)) +
+              np.cumsum(rng.integers(-step, step + 1, length))).astype(np.int64)
+    secret_data = ''.join(rng.choice(['0', '1'], int(rng.integers(1, max_secret + 1))))
+
+    case = {'version': version, 'seed': seed, 'index': index,
+            'signal': signal, 'secret_data': secret_data}
+    if version in (1, 2):
+        case['threshold'] = int(rng.integers(1, 7))
+        case['secret_key'] = format(int(rng.integers(0, 8)), '03b')
+    else:
+        case['payload_rate'] = int(rng.integers(1, 4))
+        case['threshold'] = int(rng.integers(0, 2))
+    return case
+
+
+def run_case(case: dict) -> Optional[str]:
+    """
+    Menjalankan embed -> extract untuk satu kasus.
+
+    Returns:
+    Optional[str]: None jika sinyal dan secret kembali persis, atau pesan kegagalan
+    berformat '<jenis>: <detail>'.
+    """
+    stego = make_stego(case['version'])
+    signal = case['signal']
+    secret_data = case['secret_data']
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), np.errstate(all='ignore'):
+            if case['version'] in (1, 2):
+                parameters = {'threshold': case['threshold'], 'secret_key': case['secret_key']}
+                watermarked_signal, result = stego.embed(signal, secret_data, **parameters)
+                restored_signal, extracted_secret_data = stego.extract(watermarked_signal, **parameters)
+                hidden_total = min(len(secret_data), len(secret_data) - result.unhidden_secret_count)
+                expected_secret_data = secret_data[:hidden_total]
+                if case['version'] == 1:
+                    # v1 tetap menyisipkan bit 0 setelah secret habis
+                    extracted_secret_data = extracted_secret_data[:hidden_total]
+            else:
+                parameters = {'payload_rate': case['payload_rate'], 'threshold': case['threshold']}
+                watermarked_signal, *side_info, result = stego.embed(signal, secret_data, **parameters)
+                restored_signal, extracted_secret_data = stego.extract(
+                    watermarked_signal, *side_info, **parameters)
+                expected_secret_data = secret_data[:len(extracted_secret_data)]
+                # Jika secret tidak muat, embed ulang dengan hasil ekstraksi harus memberi
+                # sinyal yang sama; ini memastikan tidak ada bit yang hilang di akhir.
+                if expected_secret_data == extracted_secret_data and len(extracted_secret_data) < len(secret_data):
+                    rewatermarked_signal = stego.embed(signal, extracted_secret_data, **parameters)[0]
+                    if not np.array_equal(rewatermarked_signal, watermarked_signal):
+                        return (f"secret_truncated: {len(extracted_secret_data)} dari "
+                                f"{len(secret_data)} bit terekstrak padahal kapasitas lebih")
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+    if not np.array_equal(restored_signal, signal):
+        differences = np.flatnonzero(restored_signal != signal)
+        return f"signal_mismatch: {len(differences)} sampel berbeda, pertama di indeks {differences[0]}"
+    if extracted_secret_data != expected_secret_data:
+        return (f"secret_mismatch: panjang {len(extracted_secret_data)} vs {len(expected_secret_data)}, "
+                f"awal {extracted_secret_data[:16]!r} vs {expected_secret_data[:16]!r}")
+    return None
+
+
+def shrink_case(case: dict, failure: str, max_steps: int = 200) -> dict:
+    """
+    Memperkecil kasus gagal menjadi reproducer minimal dengan memotong sinyal dan secret
+    selama jenis kegagalannya tetap sama.
+    """
+    failure_kind = failure.split(':')[0]
+
+    def still_fails(candidate):
+        candidate_failure = run_case(candidate)
+        return candidate_failure is not None and candidate_failure.split(':')[0] == failure_kind
+
+    for _ in range(max_steps):
+        for candidate in _shrink_candidates(case):
+            if still_fails(candidate):
+                case = candidate
+                break
+        else:
+            break
+    return case
+
+
+def _shrink_candidates(case: dict):
+    signal = case['signal']
+    secret_data = case['secret_data']
+
+    chunk = len(signal) // 2
+    while chunk >= 1:
+        if len(signal) - chunk >= 5:
+            yield dict(case, signal=signal[:-chunk])
+            yield dict(case, signal=signal[chunk:])
+        chunk //= 2
+
+    chunk = len(secret_data) // 2
+    while chunk >= 1:
+        if len(secret_data) - chunk >= 1:
+            yield dict(case, secret_data=secret_data[:-chunk])
+            yield dict(case, secret_data=secret_data[chunk:])
+        chunk //= 2
+
+    if secret_data.count('1'):
+        yield dict(case, secret_data=secret_data.replace('1', '0'))
+
+
+def _run_batch(arguments):
+    version, seed, indexes, max_length, max_secret = arguments
+    failures = []
+    for index in indexes:
+        case = random_case(version, seed, index, max_length, max_secret)
+        failure = run_case(case)
+        if failure is not None:
+            failures.append((case, failure))
+    return len(indexes), failures
+
+
+def fuzz(cases: int = 1_000,
+         versions: Sequence[int] = VERSIONS,
+         workers: Optional[int] = None,
+         seed: int = 0,
+         max_length: int = 600,
+         max_secret: int = 600,
+         batch_size: int = 50,
+         max_shrink: int = 5) -> dict:
+    """
+    Fuzzing round-trip embed -> extract secara paralel untuk setiap versi.
+
+    Parameters:
+    - cases (int): Jumlah kasus per versi. Default: 1000.
+    - versions (Sequence[int]): Versi yang diuji. Default: (1, 2, 3, 4).
+    - workers (int, opsional): Jumlah proses. Default: jumlah CPU.
+    - seed (int): Seed agar kasus bisa diulang. Default: 0.
+    - max_length (int): Panjang sinyal maksimal. Default: 600.
+    - max_secret (int): Panjang secret maksimal. Default: 600.
+    - batch_size (int): Jumlah kasus per tugas worker. Default: 50.
+    - max_shrink (int): Jumlah kegagalan per versi yang diperkecil. Default: 5.
+
+    Returns:
+    dict: Per versi berisi jumlah kasus, kegagalan, cases_per_second, dan daftar reproducer
+    minimal (kasus yang sudah diperkecil beserta pesan kegagalannya).
+    """
+    report = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for version in versions:
+            tasks = [(version, seed, range(start, min(start + batch_size, cases)), max_length, max_secret)
+                     for start in range(0, cases, batch_size)]
+
+            start_time = time.time()
+            total = 0
+            failures = []
+            for batch_total, batch_failures in executor.map(_run_batch, tasks):
+                total += batch_total
+                failures.extend(batch_failures)
+            elapsed = time.time() - start_time
+
+            report[version] = {
+                'cases': total,
+                'failures': len(failures),
+                'elapsed': elapsed,
+                'cases_per_second': total / elapsed if elapsed > 0 else float('inf'),
+                'reproducers': [],
+            }
+            for case, failure in failures[:max_shrink]:
+                minimal_case = shrink_case(case, failure)
+                report[version]['reproducers'].append((minimal_case, run_case(minimal_case)))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzzing round-trip embed/extract PEE stego')
+    parser.add_argument('--cases', type=int, default=1_000)
+    parser.add_argument('--versions', type=int, nargs='+', default=list(VERSIONS))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-length', type=int, default=600)
+    parser.add_argument('--max-secret', type=int, default=600)
+    arguments = parser.parse_args()
+
+    report = fuzz(arguments.cases, arguments.versions, arguments.workers, arguments.seed,
+                  arguments.max_length, arguments.max_secret)
+    for version, version_report in report.items():
+        print(f"v{version}: {version_report['cases']} kasus, {version_report['failures']} gagal, "
+              f"{version_report['cases_per_second']:.1f} kasus/detik")
+        for case, failure in version_report['reproducers']:
+            parameters = {key: value for key, value in case.items() if key not in ('signal', 'secret_data')}
+            print(f"  {failure}")
+            print(f"    minimal: {parameters} signal={case['signal'].tolist()} secret={case['secret_data']!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+from typing import Callable, Iterator, Sequence, Tuple, TypeVar
+from utils.calculation import Calculation
+
+PHASE_KEYS = tuple(format(key, '03b') for key in range(8))
+
+State = TypeVar('State')
+
+
+def iter_phase_keys(original_data: np.ndarray,
+                    secret_keys: Sequence[str],
+                    embed_phase: Callable[[np.ndarray, int, State], State],
+                    initial_state: State) -> Iterator[Tuple[str, np.ndarray, State]]:
+    """
+    Menelusuri pohon prefix secret_key agar fase yang sama pada prefix yang sama hanya
+    di-embed (dan diprediksi) sekali untuk semua key.
+
+    Parameters:
+    - original_data (np.ndarray): Sinyal asli, tidak diubah.
+    - secret_keys (Sequence[str]): Key 3 bit yang dievaluasi, misalnya PHASE_KEYS.
+    - embed_phase (Callable): Fungsi (data, phase, state) -> state baru yang menyisipkan satu fase
+      secara in-place. State harus immutable (misalnya int atau tuple).
+    - initial_state: State sebelum fase pertama, misalnya secret_index = 0.
+
+    Returns:
+    Iterator[Tuple[str, np.ndarray, State]]: (secret_key, sinyal hasil fase-fase key, state akhir).
+    Sinyal bisa dipakai bersama antar key yang hanya berbeda di fase yang dilewati, jadi jangan
+    diubah in-place oleh pemanggil.
+
+    Notes:
+    Fase 1..3 diproses berurutan, sehingga key dengan prefix sama memiliki sinyal dan state yang
+    sama sampai fase itu. Delapan key membutuhkan 7 embed fase, bukan 12 seperti embed terpisah.
+    """
+    secret_keys = set(secret_keys)
+
+    def walk(data, prefix, state):
+        if len(prefix) == 3:
+            yield prefix, data, state
+            return
+
+        if any(key.startswith(prefix + '0') for key in secret_keys):
+            yield from walk(data, prefix + '0', state)
+        if any(key.startswith(prefix + '1') for key in secret_keys):
+            next_data = data.copy()
+            next_state = embed_phase(next_data, len(prefix) + 1, state)
+            yield from walk(next_data, prefix + '1', next_state)
+
+    yield from walk(original_data, '', initial_state)
+
+
+def quality_metrics(original_data: np.ndarray, watermarked_data: np.ndarray) -> dict:
+    """
+    NCC, PRD, SNR, dan PSNR seperti `Result.calculate`, tanpa mencetak.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'ncc': Calculation.ncc(original_data, watermarked_data),
+            'prd': Calculation.prd(original_data, watermarked_data),
+            'snr': Calculation.snr(original_data, watermarked_data),
+            'psnr': Calculation.psnr(original_data, watermarked_data),
+        }
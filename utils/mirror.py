@@ -0,0 +1,300 @@
+import numpy as np
+from typing import Callable, List, Literal, Optional, Sequence, Tuple
+from utils.neighbours import PHASE_STEP, TARGET_OFFSET, phase_row_count
+
+
+def _target_slice(phase: int, rows: int) -> slice:
+    start = phase - 1 + TARGET_OFFSET
+    return slice(start, start + PHASE_STEP * rows, PHASE_STEP)
+
+
+def _floor_log2(values: np.ndarray) -> np.ndarray:
+    """
+    floor(log2(x)) seperti `math.floor(math.log2(x))`; ValueError jika ada x <= 0.
+    """
+    if np.any(values <= 0):
+        raise ValueError("math domain error")
+    return np.floor(np.log2(values.astype(np.float64))).astype(np.int64)
+
+
+def _select(condition, first, second):
+    """
+    first jika condition, selain itu second; berlaku untuk skalar maupun array.
+    """
+    return second + condition * (first - second)
+
+
+def _secret_value_limits(bit_totals):
+    secret_value_limit = 1 << bit_totals
+    # Sama dengan int(secret_value_limit / 2 - 1), termasuk 0 untuk bit_total = 0
+    return secret_value_limit, (secret_value_limit >> 1) - (secret_value_limit > 1)
+
+
+def mirror_embed_values(original_values, predicted_values, bit_totals, secret_values):
+    """
+    Aturan mirror embedding v4 untuk satu sampel (int) atau banyak sampel (np.ndarray) sekaligus.
+
+    Sampel dicerminkan di sekitar titik cermin pertama ke arah error prediksi, sehingga error
+    setelah embedding tetap >= 2 dan nilai asli bisa dipulihkan dari selisihnya.
+
+    Parameters:
+    - original_values: Nilai sampel sebelum embedding.
+    - predicted_values: Nilai prediksi.
+    - bit_totals: Jumlah bit secret per sampel.
+    - secret_values: Bit secret sebagai integer.
+
+    Returns:
+    Tuple: Nilai watermark dan mirror data (watermark - asli).
+    """
+    embedding_errors = abs(original_values - predicted_values)
+    secret_value_limit, half_secret_value_limit = _secret_value_limits(bit_totals)
+    mirror_total = (embedding_errors - half_secret_value_limit) // secret_value_limit + 1
+
+    direction = 2 * (predicted_values <= original_values) - 1
+    first_mirror_point = original_values - direction * half_secret_value_limit
+    embedding_diff = _select(mirror_total % 2, secret_values,
+                             (secret_value_limit - secret_values) % secret_value_limit)
+    watermarked_values = first_mirror_point + direction * embedding_diff
+    return watermarked_values, watermarked_values - original_values
+
+
+def mirror_extract_values(watermarked_values, predicted_values, mirror_values, bit_totals):
+    """
+    Kebalikan `mirror_embed_values`, untuk satu sampel (int) atau banyak sampel (np.ndarray).
+
+    Returns:
+    Tuple: Nilai asli dan bit secret sebagai integer.
+    """
+    direction = 2 * (predicted_values <= watermarked_values) - 1
+    extraction_errors = abs(watermarked_values - predicted_values) - direction * mirror_values
+    original_values = watermarked_values - mirror_values
+
+    secret_value_limit, half_secret_value_limit = _secret_value_limits(bit_totals)
+    mirror_total = (extraction_errors - half_secret_value_limit) // secret_value_limit + 1
+    first_mirror_point = original_values - direction * half_secret_value_limit
+    mirror_distances = abs(watermarked_values - first_mirror_point)
+    secret_values = _select(mirror_total % 2, mirror_distances,
+                            (secret_value_limit - mirror_distances) % secret_value_limit)
+    return original_values, secret_values
+
+
+def _secret_values(secret_data: str, starts: np.ndarray, bit_totals: np.ndarray) -> np.ndarray:
+    """
+    int(secret_data[start:start + bit_total], 2) untuk setiap baris sekaligus.
+    """
+    bits = np.frombuffer(secret_data.encode('ascii'), dtype=np.uint8).astype(np.int64) - ord('0')
+    if np.any((bits != 0) & (bits != 1)):
+        raise ValueError("secret_data hanya boleh berisi '0' dan '1'")
+
+    values = np.zeros(len(starts), dtype=np.int64)
+    for offset in range(int(bit_totals.max(initial=0))):
+        used = offset < bit_totals
+        values[used] = 2 * values[used] + bits[starts[used] + offset]
+    return values
+
+
+def mirror_embed(watermarked_data: np.ndarray, phase: Literal[1, 2, 3], predicted_values: np.ndarray,
+                 secret_data: str, secret_index: int, bit_limit: int
+                 ) -> Tuple[int, Optional[int], int, np.ndarray, np.ndarray, bool]:
+    """
+    Mirror embedding PEEStego (v4) untuk satu fase secara vektor dan in-place.
+
+    Hasilnya sama persis dengan loop per sampel `PEEStego.embed`: sampel ber-error e >= 2 membawa
+    min(floor(log2 e), bit_limit, sisa secret) bit, dan fase berhenti tepat setelah secret habis.
+
+    Parameters:
+    - watermarked_data (np.ndarray): Sinyal yang diubah in-place.
+    - phase (int): Fase 1, 2, atau 3.
+    - predicted_values (np.ndarray): Prediksi seluruh baris fase dari sinyal saat ini.
+    - secret_data (str): Secret biner.
+    - secret_index (int): Posisi bit secret pertama untuk fase ini.
+    - bit_limit (int): ceil(payload_rate + threshold), minimal 1.
+
+    Returns:
+    Tuple: secret_index baru, i terakhir yang disisipi (None jika tidak ada), jumlah bit sampel
+    terakhir, mirror data fase ini, error <= 1 dari baris yang dilewati (untuk log frekuensi), dan
+    apakah loop per sampel akan menandai embedding selesai di fase ini.
+    """
+    if bit_limit < 1:
+        raise ValueError("bit_limit minimal 1")
+
+    remainder = len(secret_data) - secret_index
+    empty = np.empty(0, dtype=np.int64)
+    if remainder <= 0:
+        return secret_index, None, 0, empty, empty, phase - 1 < len(watermarked_data)
+
+    rows = min(phase_row_count(len(watermarked_data), phase), len(predicted_values))
+    original_values = watermarked_data[_target_slice(phase, rows)].astype(np.int64)
+    predicted_values = np.asarray(predicted_values[:rows], dtype=np.int64)
+    embedding_errors = np.abs(original_values - predicted_values)
+
+    embeddable = embedding_errors > 1
+    bit_totals = np.zeros(rows, dtype=np.int64)
+    bit_totals[embeddable] = np.minimum(_floor_log2(embedding_errors[embeddable]), bit_limit)
+    bits_before = np.cumsum(bit_totals) - bit_totals
+
+    # Baris yang dilewati berakhir pada baris yang menghabiskan secret
+    visited_rows = rows
+    exhausted = bits_before + bit_totals >= remainder
+    if np.any(exhausted):
+        visited_rows = int(np.argmax(exhausted)) + 1
+    embedded_rows = np.flatnonzero(embeddable[:visited_rows])
+    errors = embedding_errors[:visited_rows][~embeddable[:visited_rows]]
+
+    bit_totals = np.minimum(bit_totals[embedded_rows], remainder - bits_before[embedded_rows])
+    secret_values = _secret_values(secret_data, secret_index + bits_before[embedded_rows], bit_totals)
+    original_values = original_values[embedded_rows]
+    predicted_values = predicted_values[embedded_rows]
+    embedding_errors = embedding_errors[embedded_rows]
+
+    watermarked_values, mirror_values = mirror_embed_values(original_values, predicted_values, bit_totals,
+                                                            secret_values)
+
+    targets = watermarked_data[_target_slice(phase, rows)]
+    targets[embedded_rows] = watermarked_values
+    watermarked_data[_target_slice(phase, rows)] = targets
+
+    secret_index += int(bit_totals.sum())
+    last_i = int(phase - 1 + PHASE_STEP * embedded_rows[-1]) if len(embedded_rows) else None
+    last_bits = int(bit_totals[-1]) if len(embedded_rows) else 0
+    has_embedding_end = (secret_index >= len(secret_data)
+                         and phase - 1 + PHASE_STEP * visited_rows < len(watermarked_data))
+    return secret_index, last_i, last_bits, mirror_values, errors, has_embedding_end
+
+
+def mirror_extract(original_data: np.ndarray, phase: Literal[1, 2, 3], predicted_values: np.ndarray,
+                   mirror_data: np.ndarray, row_stop: int, bit_limit: int,
+                   last_bits: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Kebalikan `mirror_embed` untuk satu fase secara vektor dan in-place.
+
+    Parameters:
+    - original_data (np.ndarray): Sinyal watermark yang dipulihkan in-place.
+    - phase (int): Fase 1, 2, atau 3.
+    - predicted_values (np.ndarray): Prediksi seluruh baris fase dari sinyal saat ini.
+    - mirror_data (np.ndarray): Mirror data yang belum dipakai; dipakai dari belakang.
+    - row_stop (int): Hanya baris 0..row_stop-1 yang diproses (baris terakhir yang disisipi + 1).
+    - bit_limit (int): ceil(payload_rate + threshold).
+    - last_bits (int, opsional): Jumlah bit sampel terakhir, hanya untuk fase yang diekstrak pertama.
+
+    Returns:
+    Tuple[str, int]: Bit yang terekstrak (urut dari baris pertama) dan jumlah mirror data yang dipakai.
+    """
+    rows = min(phase_row_count(len(original_data), phase), len(predicted_values), row_stop)
+    watermarked_values = original_data[_target_slice(phase, rows)].astype(np.int64)
+    predicted_values = np.asarray(predicted_values[:rows], dtype=np.int64)
+    distances = np.abs(watermarked_values - predicted_values)
+
+    embedded_rows = np.flatnonzero(distances > 1)
+    used = min(len(embedded_rows), len(mirror_data))
+    if used == 0:
+        return '', 0
+    embedded_rows = embedded_rows[len(embedded_rows) - used:]
+    mirror_values = np.asarray(mirror_data[len(mirror_data) - used:], dtype=np.int64)
+
+    watermarked_values = watermarked_values[embedded_rows]
+    predicted_values = predicted_values[embedded_rows]
+    distances = distances[embedded_rows]
+    extraction_errors = np.where(predicted_values <= watermarked_values,
+                                 distances - mirror_values, distances + mirror_values)
+
+    available_bits = _floor_log2(extraction_errors)
+    if last_bits is not None:
+        available_bits[-1] = last_bits
+    bit_totals = np.where(available_bits >= bit_limit, bit_limit, available_bits)
+    original_values, secret_values = mirror_extract_values(watermarked_values, predicted_values, mirror_values,
+                                                           bit_totals)
+
+    targets = original_data[_target_slice(phase, rows)]
+    targets[embedded_rows] = original_values
+    original_data[_target_slice(phase, rows)] = targets
+
+    bits = ''.join(format(int(value), f'0{int(total)}b') if total > 0 else ''
+                   for value, total in zip(secret_values, bit_totals))
+    return bits, used
+
+
+def embed_layer(watermarked_data: np.ndarray, secret_data: str, secret_index: int, bit_limit: int,
+                predict_phase: Callable[[np.ndarray, int], np.ndarray]
+                ) -> Tuple[int, Tuple[List[int], int, int, int], np.ndarray]:
+    """
+    Satu pass embedding PEEStego (v4) tiga fase secara in-place dengan `mirror_embed`.
+
+    Side info yang dihasilkan sama dengan `PEEStego.embed` (mirror_data, last_phase, last_i,
+    last_embedded_bit_total), sehingga satu layer juga bisa diekstrak dengan `PEEStego.extract`.
+
+    Parameters:
+    - watermarked_data (np.ndarray): Sinyal (asli atau hasil layer sebelumnya) yang diubah in-place.
+    - secret_data (str): Secret biner.
+    - secret_index (int): Posisi bit secret pertama untuk layer ini.
+    - bit_limit (int): ceil(payload_rate + threshold).
+    - predict_phase (Callable): Fungsi prediksi fase kelas stego.
+
+    Returns:
+    Tuple: secret_index baru, side info layer, dan error <= 1 yang dilewati.
+    """
+    mirror_data = []
+    errors = []
+    last_phase = 0
+    last_i = 0
+    last_embedded_bit_total = 0
+
+    has_embedding_end = False
+    for phase in range(1, 4):
+        if has_embedding_end:
+            break
+
+        predicted_values = predict_phase(watermarked_data, phase)
+        secret_index, phase_last_i, phase_last_bits, phase_mirror_data, phase_errors, has_embedding_end = \
+            mirror_embed(watermarked_data, phase, predicted_values, secret_data, secret_index, bit_limit)
+        mirror_data.append(phase_mirror_data)
+        errors.append(phase_errors)
+        if phase_last_i is not None:
+            last_i, last_embedded_bit_total = phase_last_i, phase_last_bits
+        last_phase = phase
+
+    side_info = (np.concatenate(mirror_data).tolist(), last_phase, last_i, last_embedded_bit_total)
+    return secret_index, side_info, np.concatenate(errors)
+
+
+def extract_layer(original_data: np.ndarray, side_info: Sequence, bit_limit: int,
+                  predict_phase: Callable[[np.ndarray, int], np.ndarray]) -> str:
+    """
+    Kebalikan `embed_layer`: memulihkan satu layer secara in-place, fase terakhir lebih dulu.
+
+    Parameters:
+    - original_data (np.ndarray): Sinyal watermark layer ini yang dipulihkan in-place.
+    - side_info (Sequence): (mirror_data, last_phase, last_i, last_embedded_bit_total) dari `embed_layer`.
+    - bit_limit (int): ceil(payload_rate + threshold).
+    - predict_phase (Callable): Fungsi prediksi fase kelas stego.
+
+    Returns:
+    str: Bit secret layer ini.
+    """
+    mirror_data, last_phase, last_i, last_embedded_bit_total = side_info
+    mirror_data = np.asarray(mirror_data, dtype=np.int64)
+    last_i_phase = last_i % PHASE_STEP + 1
+
+    secret_chunks = []
+    has_last_i = False
+    last_bits = last_embedded_bit_total
+    for phase in reversed(range(1, last_phase + 1)):
+        if not len(mirror_data):
+            break
+
+        # Baris fase terakhir hanya sampai last_i; fase sebelumnya diproses seluruhnya
+        row_stop = phase_row_count(len(original_data), phase)
+        if not has_last_i:
+            has_last_i = phase == last_i_phase
+            row_stop = last_i // PHASE_STEP + 1 if has_last_i else 0
+        if row_stop == 0:
+            continue
+
+        bits, used = mirror_extract(original_data, phase, predict_phase(original_data, phase), mirror_data,
+                                    row_stop, bit_limit, last_bits)
+        if used:
+            last_bits = None
+        mirror_data = mirror_data[:len(mirror_data) - used]
+        secret_chunks.append(bits)
+
+    return ''.join(reversed(secret_chunks))
@@ -0,0 +1,240 @@
+from collections import OrderedDict
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from typing import Literal, Sequence, Tuple
+
+# Susunan tetangga [x[i], x[i+1], x[i+3], x[i+4]] dengan target x[i+2]
+NEIGHBOUR_OFFSETS = (0, 1, 3, 4)
+TARGET_OFFSET = 2
+PHASE_STEP = 3
+
+
+def phase_row_count(length: int, phase: Literal[1, 2, 3]) -> int:
+    """
+    Jumlah baris fase ke-x, yaitu i = phase - 1, phase + 2, ... dengan i + 4 < length.
+    """
+    return max(0, (length - 4 - (phase - 1) + PHASE_STEP - 1) // PHASE_STEP)
+
+
+def phase_indexes(length: int, phase: Literal[1, 2, 3]) -> np.ndarray:
+    """
+    Indeks awal i tiap baris fase ke-x (target berada di i + 2).
+    """
+    return np.arange(phase_row_count(length, phase)) * PHASE_STEP + (phase - 1)
+
+
+def phase_neighbours(signal: np.ndarray, phase: Literal[1, 2, 3]) -> np.ndarray:
+    """
+    View tetangga fase ke-x tanpa salinan.
+
+    Parameters:
+    - signal (np.ndarray): Satu sinyal (n,) atau batch sinyal (batch, n).
+    - phase (int): Fase 1, 2, atau 3.
+
+    Returns:
+    np.ndarray: View read-only berbentuk (..., baris, 2, 2) dengan
+    view[..., r, a, b] = signal[..., i + 3a + b], sehingga [a=0] berisi x[i], x[i+1]
+    dan [a=1] berisi x[i+3], x[i+4].
+
+    Notes:
+    Data tidak disalin; perubahan pada sinyal langsung terlihat di view.
+    Gunakan `neighbour_matrix` jika model membutuhkan matriks (baris, 4).
+    """
+    signal = np.asarray(signal)
+    rows = phase_row_count(signal.shape[-1], phase)
+    step = signal.strides[-1]
+    start = signal[..., phase - 1:] if rows else signal[..., :0]
+    return as_strided(start,
+                      shape=signal.shape[:-1] + (rows, 2, 2),
+                      strides=signal.strides[:-1] + (PHASE_STEP * step, PHASE_STEP * step, step),
+                      writeable=False)
+
+
+def phase_targets(signal: np.ndarray, phase: Literal[1, 2, 3]) -> np.ndarray:
+    """
+    View target x[i+2] fase ke-x tanpa salinan, berbentuk (..., baris).
+    """
+    signal = np.asarray(signal)
+    rows = phase_row_count(signal.shape[-1], phase)
+    return signal[..., phase - 1 + TARGET_OFFSET::PHASE_STEP][..., :rows]
+
+
+def neighbour_matrix(signal: np.ndarray, phase: Literal[1, 2, 3], dtype=np.float64) -> np.ndarray:
+    """
+    Matriks tetangga (..., baris, 4) untuk input model, dibuat satu kali dari view `phase_neighbours`.
+    """
+    neighbours = phase_neighbours(signal, phase)
+    return np.ascontiguousarray(neighbours, dtype=dtype).reshape(neighbours.shape[:-2] + (4,))
+
+
+def training_pairs(signal: np.ndarray, phases: Sequence[int] = (1,), dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pasangan (tetangga, target) untuk training prediktor, dengan fitur yang sama persis seperti
+    yang dipakai kelas stego saat embed/extract.
+
+    Parameters:
+    - signal (np.ndarray): Satu sinyal (n,) atau batch sinyal (batch, n).
+    - phases (Sequence[int]): Fase yang diambil. Default: (1,), sama seperti `training.csv`.
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: Matriks X (baris, 4) dan target y (baris,).
+    """
+    features = []
+    targets = []
+    for phase in phases:
+        features.append(neighbour_matrix(signal, phase, dtype).reshape(-1, 4))
+        targets.append(np.asarray(phase_targets(signal, phase), dtype=dtype).reshape(-1))
+    return np.concatenate(features), np.concatenate(targets)
+
+
+def predict_model(model, signal: np.ndarray, phase: Literal[1, 2, 3]) -> np.ndarray:
+    """
+    Prediksi model untuk seluruh baris fase ke-x dalam satu panggilan `predict`, dibulatkan
+    ke arah nol seperti `int(model.predict(...))`.
+    """
+    return predict_neighbours(model, neighbour_matrix(signal, phase))
+
+
+def predict_neighbours(model, neighbours: np.ndarray) -> np.ndarray:
+    """
+    Prediksi model untuk matriks tetangga (baris, 4), dibulatkan ke arah nol.
+    """
+    if len(neighbours) == 0:
+        return np.empty(0, dtype=np.int64)
+    predicted_values = np.asarray(model.predict(neighbours), dtype=np.float64).reshape(-1)
+    return np.trunc(predicted_values).astype(np.int64)
+
+
+class PhasePredictionCache:
+    """
+    Cache prediksi model per fase yang disimpan bersama tetangganya.
+
+    Pemanggilan berikutnya hanya memprediksi ulang baris yang tetangganya berubah atau belum
+    pernah diprediksi, sehingga fase yang sama bisa dipakai bersama antar pass atau antar key
+    tanpa mengubah hasil.
+
+    Example:
+    cache = PhasePredictionCache(model)
+    predicted_values = cache.predict(signal, 2, 0, 256)  # hanya 256 baris pertama fase 2
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.predicted_rows = 0
+        self._features = {}
+        self._predictions = {}
+        self._known = {}
+
+    def predict(self, signal: np.ndarray, phase: Literal[1, 2, 3], start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Prediksi baris start..stop-1 fase ke-x dari sinyal saat ini.
+        """
+        rows = phase_row_count(len(signal), phase)
+        stop = rows if stop is None else min(stop, rows)
+        start = min(start, stop)
+        if phase not in self._features or len(self._features[phase]) != rows:
+            self._features[phase] = np.zeros((rows, 4))
+            self._predictions[phase] = np.zeros(rows, dtype=np.int64)
+            self._known[phase] = np.zeros(rows, dtype=bool)
+
+        features = neighbour_matrix(signal[PHASE_STEP * start:PHASE_STEP * stop + phase + 1], phase)
+        stale = ~self._known[phase][start:stop] | np.any(self._features[phase][start:stop] != features, axis=1)
+        stale_rows = np.flatnonzero(stale)
+        if len(stale_rows):
+            self._predictions[phase][start + stale_rows] = predict_neighbours(self.model, features[stale_rows])
+            self._features[phase][start + stale_rows] = features[stale_rows]
+            self._known[phase][start + stale_rows] = True
+            self.predicted_rows += len(stale_rows)
+        return self._predictions[phase][start:stop].copy()
+
+
+class MemoizedPredictor:
+    """
+    Pembungkus model dengan cache prediksi per tuple tetangga dan eviksi LRU.
+
+    Sinyal EKG berupa integer (mV x 1000) sehingga tuple tetangga yang sama sering berulang, terutama
+    di segmen baseline. Setiap batch diproses unique-then-scatter: tuple yang sama dalam satu batch
+    dan tuple yang sudah ada di cache tidak dikirim ke model, sisanya diprediksi dalam satu panggilan.
+
+    Parameters:
+    - model: Model apa pun dengan method predict(X) untuk X berbentuk (baris, 4), misalnya SVR atau ANN.
+    - max_size (int): Jumlah tuple maksimal di cache. Default: 1.000.000.
+
+    Notes:
+    Hasilnya sama dengan model.predict selama prediksi satu baris tidak bergantung pada baris lain
+    dalam batch yang sama.
+
+    Example:
+    stego = MLPEEStego(MemoizedPredictor(model))
+    stego.embed(original_data, secret_data, payload_rate=2)
+    stego.model.stats()
+    """
+
+    def __init__(self, model, max_size: int = 1_000_000):
+        self.model = model
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = OrderedDict()
+
+    def __getattr__(self, name):
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'evictions': self.evictions, 'size': len(self._cache)}
+
+    def predict(self, neighbours) -> np.ndarray:
+        """
+        Prediksi model untuk matriks tetangga (baris, 4); tiap tuple unik hanya diprediksi sekali.
+
+        Returns:
+        np.ndarray: Prediksi float64 berbentuk (baris,).
+        """
+        neighbours = np.ascontiguousarray(neighbours, dtype=np.float64)
+        if neighbours.ndim == 1:
+            neighbours = neighbours.reshape(1, -1)
+        if len(neighbours) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        keys = neighbours.view(np.dtype((np.void, neighbours.dtype.itemsize * neighbours.shape[1]))).ravel()
+        unique_keys, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        unique_values = np.empty(len(unique_keys), dtype=np.float64)
+        missing = []
+        for position, key in enumerate(unique_keys):
+            key = key.tobytes()
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                unique_values[position] = self._cache[key]
+            else:
+                missing.append(position)
+
+        if missing:
+            missing = np.asarray(missing)
+            predicted_values = np.asarray(self.model.predict(neighbours[first_rows[missing]]),
+                                          dtype=np.float64).reshape(-1)
+            unique_values[missing] = predicted_values
+            for position, value in zip(missing, predicted_values):
+                self._cache[unique_keys[position].tobytes()] = value
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+        self.misses += len(missing)
+        self.hits += len(neighbours) - len(missing)
+        return unique_values[inverse.reshape(-1)]
+
+    def clear(self):
+        self._cache.clear()
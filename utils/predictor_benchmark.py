@@ -0,0 +1,233 @@
+import argparse
+import glob
+import math
+import os
+import pickle
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+import numpy as np
+from utils.data_preparation import ECG_FOLDER_PATH
+from utils.neighbours import predict_neighbours
+from utils.tuning import estimate_embedding
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+MODEL_EXTENSIONS = ('.pkl', '.h5', '.keras')
+
+
+class LLPPredictor:
+    """
+    Prediktor LLP seperti `PEEStego.predict_phase`: rata-rata 4 tetangga yang dibulatkan.
+    """
+
+    def predict(self, neighbours):
+        return np.round(np.asarray(neighbours, dtype=np.float64).sum(axis=1) / 4)
+
+
+class KerasPredictor:
+    """
+    Pembungkus model Keras agar predict tidak mencetak progress bar dan memakai batch besar.
+    """
+
+    def __init__(self, model, batch_size: int = 65_536):
+        self.model = model
+        self.batch_size = batch_size
+
+    def predict(self, neighbours):
+        return self.model.predict(neighbours, batch_size=self.batch_size, verbose=0)
+
+
+def load_predictor(path: str):
+    """
+    Memuat model dari models/: .pkl dengan pickle, .h5/.keras dengan Keras (opsional).
+    """
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as model_file:
+            return pickle.load(model_file)
+
+    from tensorflow import keras
+    return KerasPredictor(keras.models.load_model(path, compile=False))
+
+
+def discover_predictors(model_dir: str = 'models') -> Dict[str, Callable[[], object]]:
+    """
+    Daftar prediktor yang tersedia: LLP dan semua file model di model_dir.
+
+    Returns:
+    Dict[str, Callable]: Nama prediktor -> fungsi pemuat model.
+    """
+    predictors = {'LLP': LLPPredictor}
+    for path in sorted(glob.glob(os.path.join(model_dir, '*'))):
+        if path.endswith(MODEL_EXTENSIONS):
+            predictors[os.path.basename(path)] = lambda path=path: load_predictor(path)
+    return predictors
+
+
+def error_histogram(errors: np.ndarray, limit: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram error prediksi untuk nilai -limit..limit. Error di luar rentang dimasukkan ke bin
+    paling ujung.
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: Nilai error tiap bin dan jumlahnya.
+    """
+    values = np.arange(-limit, limit + 1)
+    counts = np.bincount(np.clip(errors, -limit, limit) + limit, minlength=len(values))
+    return values, counts
+
+
+def benchmark_predictor(load: Callable[[], object], chunks: Sequence[Chunk], stego_version: int = 3,
+                        payload_rate: int = 2, threshold: int = 0, expansion_threshold: int = 4,
+                        histogram_limit: int = 32) -> Tuple[dict, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Mengukur satu prediktor pada potongan (tetangga, target) yang sama untuk semua prediktor.
+
+    Parameters:
+    - load (Callable): Fungsi pemuat model.
+    - chunks (Sequence[Chunk]): Potongan X (baris, 4) dan y (baris,).
+    - stego_version (int): 3 (MLPEEStego) atau 4 (PEEStego) untuk rumus distorsi. Default: 3.
+    - payload_rate (int), threshold (int): Parameter embedding mirror v3/v4. Default: 2 dan 0.
+    - expansion_threshold (int): Threshold expansion v1/v2. Default: 4.
+    - histogram_limit (int): Rentang histogram error. Default: 32.
+
+    Returns:
+    Tuple[dict, Tuple[np.ndarray, np.ndarray]]: Satu baris tabel dan histogram error.
+
+    Notes:
+    Kapasitas dan distorsi adalah estimasi `estimate_embedding` saat seluruh kapasitas terpakai,
+    dihitung dari error prediksi pada sinyal asli.
+    """
+    if stego_version == 4:
+        from pee_stego_v4 import PEEStego
+        expected_noise = PEEStego.expected_noise
+    else:
+        from ml_pee_stego_v3 import MLPEEStego
+        expected_noise = MLPEEStego.expected_noise
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    model = load()
+    load_time = time.perf_counter() - start_time
+    load_memory = tracemalloc.get_traced_memory()[0]
+
+    # Memori puncak prediksi diukur pada potongan pertama saja agar throughput tidak terganggu
+    tracemalloc.reset_peak()
+    if chunks:
+        predict_neighbours(model, chunks[0][0][:65_536])
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    errors = []
+    predict_time = 0.0
+    for features, targets in chunks:
+        start_time = time.perf_counter()
+        predicted_values = predict_neighbours(model, features)
+        predict_time += time.perf_counter() - start_time
+        errors.append(np.asarray(targets, dtype=np.int64) - predicted_values)
+
+    errors = np.concatenate(errors) if errors else np.empty(0, dtype=np.int64)
+    signal_power = float(sum(np.sum(np.asarray(targets, dtype=np.float64) ** 2) for _, targets in chunks))
+    absolute_errors = np.abs(errors)
+    estimate = estimate_embedding([absolute_errors], math.inf, math.ceil(payload_rate + threshold),
+                                  signal_power, expected_noise)
+
+    row = {
+        'stego': f'v{stego_version}',
+        'rows': len(errors),
+        'load_time': load_time,
+        'load_memory': load_memory,
+        'peak_predict_memory': peak_memory,
+        'predictions_per_second': len(errors) / predict_time if predict_time > 0 else math.inf,
+        'mae': float(absolute_errors.mean()) if len(errors) else math.nan,
+        'rmse': float(np.sqrt(np.mean(errors.astype(np.float64) ** 2))) if len(errors) else math.nan,
+        'within_1': float(np.mean(absolute_errors <= 1)) if len(errors) else math.nan,
+        'capacity': estimate['capacity'],
+        'bits_per_sample': estimate['capacity'] / len(errors) if len(errors) else math.nan,
+        'prd': estimate['prd'],
+        'snr': estimate['snr'],
+        'expansion_bits': int(np.count_nonzero(absolute_errors < expansion_threshold)),
+    }
+    return row, error_histogram(errors, histogram_limit)
+
+
+def benchmark(chunks: Iterable[Chunk],
+              predictors: Optional[Dict[str, Callable[[], object]]] = None,
+              payload_rate: int = 2,
+              threshold: int = 0,
+              expansion_threshold: int = 4,
+              histogram_limit: int = 32):
+    """
+    Leaderboard prediktor: akurasi, estimasi kapasitas dan distorsi, throughput, waktu muat, memori.
+
+    Parameters:
+    - chunks (Iterable[Chunk]): Potongan (tetangga, target), misalnya dari `iter_record_chunks`.
+      Semua potongan dimuat ke memori agar setiap prediktor diukur pada data yang sama.
+    - predictors (Dict[str, Callable], opsional): Default: `discover_predictors()`.
+
+    Returns:
+    Tuple[pandas.DataFrame, dict]: Tabel per prediktor (urut MAE) dan histogram error per
+    prediktor. Prediktor yang gagal dimuat (misalnya Keras tanpa TensorFlow) tercatat di kolom error.
+    """
+    import pandas as pd
+
+    chunks = list(chunks)
+    predictors = discover_predictors() if predictors is None else predictors
+    try:
+        # Biaya import sklearn tidak dihitung sebagai waktu muat model pertama
+        import sklearn.pipeline  # noqa: F401
+    except ImportError:
+        pass
+
+    rows = []
+    histograms = {}
+    for name, load in predictors.items():
+        try:
+            row, histograms[name] = benchmark_predictor(
+                load, chunks, 4 if name == 'LLP' else 3, payload_rate, threshold,
+                expansion_threshold, histogram_limit)
+            row['error'] = None
+        except Exception as error:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            row = {'error': f'{type(error).__name__}: {error}'}
+        rows.append({'predictor': name, **row})
+
+    table = pd.DataFrame(rows).set_index('predictor')
+    if 'mae' in table:
+        table = table.sort_values('mae', na_position='last')
+    return table, histograms
+
+
+def main():
+    from utils.training import iter_record_chunks
+
+    parser = argparse.ArgumentParser(description='Leaderboard prediktor: akurasi vs throughput')
+    parser.add_argument('--models', default='models')
+    parser.add_argument('--folder', default=ECG_FOLDER_PATH)
+    parser.add_argument('--patients', nargs='*', default=None)
+    parser.add_argument('--max-rows', type=int, default=1_000_000)
+    parser.add_argument('--payload-rate', type=int, default=2)
+    parser.add_argument('--threshold', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Simpan tabel ke CSV')
+    arguments = parser.parse_args()
+
+    chunks = []
+    total_rows = 0
+    for features, targets in iter_record_chunks(arguments.folder, arguments.patients,
+                                                chunk_size=min(arguments.max_rows, 1_000_000)):
+        features, targets = features[:arguments.max_rows - total_rows], targets[:arguments.max_rows - total_rows]
+        chunks.append((features, targets))
+        total_rows += len(targets)
+        if total_rows >= arguments.max_rows:
+            break
+
+    table, _ = benchmark(chunks, discover_predictors(arguments.models),
+                         arguments.payload_rate, arguments.threshold)
+    print(table.to_string())
+    if arguments.output:
+        table.to_csv(arguments.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Sequence, Tuple
+
+# Objektif milik proses worker, dikirim sekali saat pool dibuat
+_worker_func = None
+
+
+def _init_worker(func: Callable[[np.ndarray], np.ndarray]):
+    global _worker_func
+    _worker_func = func
+
+
+def _evaluate_worker(positions: np.ndarray) -> np.ndarray:
+    return _worker_func(positions)
+
+
+def pso(func: Callable[[np.ndarray], np.ndarray],
+        lb: Sequence[float],
+        ub: Sequence[float],
+        swarmsize: int = 100,
+        omega: float = 0.5,
+        phip: float = 0.5,
+        phig: float = 0.5,
+        maxiter: int = 100,
+        minstep: float = 1e-8,
+        minfunc: float = 1e-8,
+        processes: int = 1,
+        seed: Optional[int] = None,
+        debug: bool = False) -> Tuple[np.ndarray, float]:
+    """
+    Particle Swarm Optimization dengan evaluasi objektif per swarm.
+
+    Aturan update dan kriteria berhenti mengikuti `pyswarm.pso`, tetapi `func` menerima
+    seluruh posisi swarm sekaligus sehingga evaluasi bisa divektorisasi.
+
+    Parameters:
+    - func (Callable): Fungsi objektif (swarmsize, dimensi) -> (swarmsize,).
+    - lb (Sequence[float]): Batas bawah tiap parameter.
+    - ub (Sequence[float]): Batas atas tiap parameter.
+    - swarmsize (int): Jumlah partikel. Default: 100.
+    - omega (float): Faktor inersia kecepatan. Default: 0.5.
+    - phip (float): Faktor skala menuju posisi terbaik partikel. Default: 0.5.
+    - phig (float): Faktor skala menuju posisi terbaik swarm. Default: 0.5.
+    - maxiter (int): Jumlah iterasi maksimal. Default: 100.
+    - minstep (float): Perubahan posisi terbaik minimal sebelum berhenti. Default: 1e-8.
+    - minfunc (float): Perubahan nilai objektif minimal sebelum berhenti. Default: 1e-8.
+    - processes (int): Jumlah proses untuk membagi partikel. Default: 1 (tanpa pool).
+    - seed (int, opsional): Seed random generator.
+    - debug (bool): Tampilkan progres tiap iterasi. Default: False.
+
+    Returns:
+    Tuple[np.ndarray, float]: Posisi terbaik swarm dan nilai objektifnya.
+
+    Notes:
+    Jika processes > 1, `func` harus bisa di-pickle (fungsi level modul atau objek
+    seperti `AnnSwarmObjective`). `func` dikirim satu kali ke tiap worker saat pool dibuat,
+    sehingga tiap iterasi hanya mengirim posisi partikel, bukan data training objektif.
+    """
+    lb = np.asarray(lb, dtype=np.float64)
+    ub = np.asarray(ub, dtype=np.float64)
+    if lb.shape != ub.shape:
+        raise ValueError("Batas bawah dan batas atas harus memiliki panjang yang sama.")
+    if np.any(ub <= lb):
+        raise ValueError("Semua batas atas harus lebih besar dari batas bawah.")
+
+    rng = np.random.default_rng(seed)
+    dimension = len(lb)
+    velocity_limit = np.abs(ub - lb)
+
+    executor = None
+    if processes > 1:
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(func,))
+    try:
+        def evaluate(positions: np.ndarray) -> np.ndarray:
+            if executor is None:
+                return np.asarray(func(positions), dtype=np.float64).reshape(-1)
+            chunks = np.array_split(positions, processes)
+            return np.concatenate([np.asarray(values, dtype=np.float64).reshape(-1)
+                                   for values in executor.map(_evaluate_worker, chunks)])
+
+        # Inisialisasi posisi dan kecepatan partikel
+        x = lb + rng.random((swarmsize, dimension)) * (ub - lb)
+        v = -velocity_limit + rng.random((swarmsize, dimension)) * 2 * velocity_limit
+        p = x.copy()
+        fp = evaluate(x)
+
+        best_index = int(np.argmin(fp))
+        g = p[best_index].copy()
+        fg = fp[best_index]
+
+        for iteration in range(1, maxiter + 1):
+            rp = rng.random((swarmsize, dimension))
+            rg = rng.random((swarmsize, dimension))
+            v = omega * v + phip * rp * (p - x) + phig * rg * (g - x)
+            x = np.clip(x + v, lb, ub)
+
+            fx = evaluate(x)
+            improved = fx < fp
+            p[improved] = x[improved]
+            fp[improved] = fx[improved]
+
+            best_index = int(np.argmin(fp))
+            if fp[best_index] < fg:
+                if debug:
+                    print(f'Iterasi {iteration}: swarm terbaik baru {p[best_index]}, {fp[best_index]}')
+
+                stepsize = np.sqrt(np.sum((g - p[best_index]) ** 2))
+                if np.abs(fg - fp[best_index]) <= minfunc:
+                    print(f'Berhenti: perubahan objektif swarm terbaik kurang dari {minfunc}')
+                    return p[best_index].copy(), float(fp[best_index])
+                if stepsize <= minstep:
+                    print(f'Berhenti: perubahan posisi swarm terbaik kurang dari {minstep}')
+                    return p[best_index].copy(), float(fp[best_index])
+
+                g = p[best_index].copy()
+                fg = fp[best_index]
+
+            if debug:
+                print(f'Iterasi {iteration}: terbaik {g} {fg}')
+
+        print(f'Berhenti: iterasi maksimal {maxiter} tercapai')
+        return g, float(fg)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def unpack_ann_params(params: np.ndarray, input_units: int, hidden_units: int = 10):
+    """
+    Memecah vektor parameter PSO menjadi bobot ANN 1 hidden layer.
+
+    Susunan parameter sama dengan notebook `models/model-creation*.ipynb`, sehingga hasilnya
+    bisa langsung dipasang dengan `model.layers[0].set_weights([weights_layer1, bias_layer1])`
+    dan `model.layers[1].set_weights([weights_layer2, bias_layer2])`.
+
+    Parameters:
+    - params (np.ndarray): Parameter dengan bentuk (dimensi,) atau (swarmsize, dimensi).
+    - input_units (int): Jumlah input (4 tetangga).
+    - hidden_units (int): Jumlah unit hidden. Default: 10.
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: weights_layer1, bias_layer1,
+    weights_layer2, bias_layer2. Untuk input swarm, dimensi pertama adalah partikel.
+    """
+    params = np.asarray(params, dtype=np.float64)
+    leading_shape = params.shape[:-1]
+    num_weights_layer1 = input_units * hidden_units
+
+    weights_layer1 = params[..., :num_weights_layer1].reshape(
+        leading_shape + (input_units, hidden_units))
+    bias_layer1 = params[..., num_weights_layer1:num_weights_layer1 + hidden_units]
+    weights_layer2 = params[..., -hidden_units - 1:-1].reshape(leading_shape + (hidden_units, 1))
+    bias_layer2 = params[..., -1:]
+    return weights_layer1, bias_layer1, weights_layer2, bias_layer2
+
+
+class AnnSwarmObjective:
+    """
+    Fungsi objektif MSE ANN (Dense relu -> Dense linear) untuk seluruh swarm sekaligus.
+    Forward pass semua partikel dihitung bersamaan di atas matriks tetangga, per potongan baris
+    yang panjangnya diturunkan dari max_bytes, sehingga array sementara (swarmsize, baris, hidden)
+    tidak melebihi max_bytes berapa pun ukuran swarm.
+
+    Parameters:
+    - x, y (np.ndarray): Matriks tetangga (baris, 4) dan target.
+    - hidden_units (int): Jumlah unit hidden. Default: 10.
+    - max_bytes (int): Batas memori array sementara per potongan. Default: 64 MiB.
+    - batch_size (int, opsional): Batas tambahan jumlah baris per potongan.
+
+    Notes:
+    Objektif ini menilai MSE forward pass dari bobot partikel apa adanya. Notebook
+    `models/model-creation*.ipynb` memakai bobot partikel sebagai inisialisasi, melatih model
+    (fit 100 epoch dengan adam), lalu mengevaluasi MSE setelah training, sehingga nilai objektif
+    dan posisi terbaiknya tidak sama dengan hasil notebook.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, hidden_units: int = 10, max_bytes: int = 64 << 20,
+                 batch_size: Optional[int] = None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64).reshape(-1)
+        self.hidden_units = hidden_units
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+
+    @property
+    def dimension(self) -> int:
+        input_units = self.x.shape[1]
+        return input_units * self.hidden_units + self.hidden_units + self.hidden_units + 1
+
+    def chunk_rows(self, swarmsize: int) -> int:
+        """
+        Jumlah baris per potongan untuk swarm berukuran swarmsize: hidden (swarmsize, baris, hidden)
+        ditambah prediksi dan error (swarmsize, baris), masing-masing float64.
+        """
+        row_bytes = swarmsize * (self.hidden_units + 2) * np.dtype(np.float64).itemsize
+        rows = max(1, self.max_bytes // row_bytes)
+        return min(rows, self.batch_size) if self.batch_size is not None else rows
+
+    def __call__(self, params: np.ndarray) -> np.ndarray:
+        params = np.atleast_2d(params)
+        weights_layer1, bias_layer1, weights_layer2, bias_layer2 = unpack_ann_params(
+            params, self.x.shape[1], self.hidden_units)
+
+        chunk_rows = self.chunk_rows(len(params))
+        squared_error = np.zeros(len(params))
+        for start in range(0, len(self.x), chunk_rows):
+            x = self.x[start:start + chunk_rows]
+            y = self.y[start:start + chunk_rows]
+
+            hidden = np.einsum('nd,sdh->snh', x, weights_layer1) + bias_layer1[:, None, :]
+            np.maximum(hidden, 0, out=hidden)
+            predicted = np.einsum('snh,sh->sn', hidden, weights_layer2[..., 0]) + bias_layer2
+            squared_error += np.sum((predicted - y) ** 2, axis=1)
+
+        return squared_error / len(self.x)
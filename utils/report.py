@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.data_preparation import ECG_FOLDER_PATH, load_record
+from utils.key_sweep import quality_metrics
+
+SAMPLING_RATE = 360
+
+
+def envelope_decimate(signal: np.ndarray, width: int, sampling_rate: float = SAMPLING_RATE
+                      ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mengurangi sinyal menjadi envelope min/max per kolom piksel, sehingga garis yang digambar
+    terlihat sama dengan sinyal penuh tetapi hanya berisi 2 x width titik.
+
+    Parameters:
+    - signal (np.ndarray): Sinyal yang akan digambar.
+    - width (int): Jumlah kolom piksel (bucket).
+    - sampling_rate (float): Frekuensi sampling untuk sumbu waktu. Default: 360 Hz.
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: Waktu (detik) dan nilai. Sinyal yang tidak lebih panjang dari
+    2 x width dikembalikan utuh.
+
+    Example:
+    time, values = envelope_decimate(load_record('100'), 1600)
+    """
+    signal = np.asarray(signal)
+    if len(signal) <= 2 * width:
+        return np.arange(len(signal)) / sampling_rate, signal
+
+    starts = np.linspace(0, len(signal), width, endpoint=False).astype(np.int64)
+    minimum = np.minimum.reduceat(signal, starts)
+    maximum = np.maximum.reduceat(signal, starts)
+    return np.repeat(starts / sampling_rate, 2), np.column_stack((minimum, maximum)).ravel()
+
+
+def render_comparison(original_data: np.ndarray,
+                      watermarked_data: np.ndarray,
+                      restored_data: Optional[np.ndarray] = None,
+                      output_path: Optional[str] = None,
+                      title: Optional[str] = None,
+                      sampling_rate: float = SAMPLING_RATE,
+                      width: int = 1600,
+                      height: int = 900,
+                      dpi: int = 100):
+    """
+    Menggambar perbandingan sinyal asli, watermark, dan hasil pemulihan beserta selisihnya tanpa
+    pyplot (headless), dengan decimation min/max ke lebar piksel.
+
+    Parameters:
+    - original_data, watermarked_data (np.ndarray): Sinyal asli dan sinyal watermark (mV x 1000).
+    - restored_data (np.ndarray, opsional): Sinyal hasil ekstraksi.
+    - output_path (str, opsional): Jika diberikan, gambar disimpan ke file ini (misalnya PNG).
+    - title (str, opsional): Judul; NCC, PRD, dan SNR ditambahkan di belakangnya.
+    - width, height (int): Ukuran gambar dalam piksel. Default: 1600 x 900.
+
+    Returns:
+    Tuple[matplotlib.figure.Figure, dict]: Gambar dan metrik kualitas sinyal watermark.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    original_data = np.asarray(original_data, dtype=np.int64)
+    watermarked_data = np.asarray(watermarked_data, dtype=np.int64)
+    metrics = quality_metrics(original_data, watermarked_data)
+
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    signal_axes, difference_axes = figure.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': (2, 1)})
+
+    lines = [('Original', original_data, '-'), ('Watermarked', watermarked_data, '-')]
+    differences = [('Watermarked - Original', watermarked_data - original_data)]
+    if restored_data is not None:
+        restored_data = np.asarray(restored_data, dtype=np.int64)
+        lines.append(('Restored', restored_data, '--'))
+        differences.append(('Restored - Original', restored_data - original_data))
+
+    # Decimation dilakukan pada nilai integer, konversi ke mV hanya untuk titik yang digambar
+    for label, values, style in lines:
+        time, values = envelope_decimate(values, width, sampling_rate)
+        signal_axes.plot(time, values / 1000, style, label=label, linewidth=0.6)
+    for label, values in differences:
+        time, values = envelope_decimate(values, width, sampling_rate)
+        difference_axes.plot(time, values / 1000, label=label, linewidth=0.6)
+
+    summary = f"SNR: {metrics['snr']:.2f} dB, PRD: {metrics['prd']:.4f}, NCC: {metrics['ncc']:.6f}"
+    signal_axes.set_title(f'{title}\n{summary}' if title else summary)
+    signal_axes.set_ylabel('Amplitudo (mV)')
+    signal_axes.legend(loc='upper right')
+    difference_axes.set_ylabel('Selisih (mV)')
+    difference_axes.set_xlabel('Waktu (s)')
+    difference_axes.legend(loc='upper right')
+    figure.tight_layout()
+
+    if output_path:
+        figure.savefig(output_path)
+    return figure, metrics
+
+
+def _render_job(job: dict) -> dict:
+    job = dict(job)
+    name = job.pop('name')
+    output_path = job.pop('output_path')
+    _, metrics = render_comparison(job.pop('original_data'), job.pop('watermarked_data'),
+                                   job.pop('restored_data', None), output_path, title=name, **job)
+    return {'name': name, 'path': output_path, **metrics}
+
+
+def _map_jobs(function, jobs: List[dict], workers: Optional[int]) -> List[dict]:
+    if workers == 1 or len(jobs) <= 1:
+        return [function(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, jobs))
+
+
+def _write_summary(rows: List[dict], output_dir: str):
+    import pandas as pd
+
+    table = pd.DataFrame(rows)
+    table.to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+    return table
+
+
+def generate_reports(signals: Iterable[dict], output_dir: str = 'out/report',
+                     workers: Optional[int] = None, **render_options):
+    """
+    Membuat gambar perbandingan untuk banyak sinyal secara paralel (satu proses per gambar).
+
+    Parameters:
+    - signals (Iterable[dict]): Item dengan kunci name, original_data, watermarked_data, dan
+      restored_data (opsional).
+    - output_dir (str): Folder output; gambar disimpan sebagai <name>.png dan metrik di summary.csv.
+    - workers (int, opsional): Jumlah proses. 1 berarti tanpa proses tambahan. Default: jumlah CPU.
+    - render_options: Diteruskan ke `render_comparison`, misalnya width dan height.
+
+    Returns:
+    pandas.DataFrame: Nama, path gambar, dan metrik tiap sinyal.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [{**render_options, **signal, 'output_path': os.path.join(output_dir, f"{signal['name']}.png")}
+            for signal in signals]
+    return _write_summary(_map_jobs(_render_job, jobs, workers), output_dir)
+
+
+def _record_job(job: dict) -> dict:
+    stego = job['stego']
+    output_path = os.path.join(job['output_dir'], f"{job['patient_code']}.png")
+    original_data = load_record(job['patient_code'], job['folder_path'])
+
+    # embed/extract mencetak banyak baris; output worker dibuang agar log tidak bercampur
+    with contextlib.redirect_stdout(io.StringIO()):
+        watermarked_data, *side_info, _ = stego.embed(original_data.copy(), job['secret_data'],
+                                                      **job['embed_options'])
+        restored_data, extracted_secret_data = stego.extract(watermarked_data.copy(), *side_info,
+                                                             **job['embed_options'])
+
+    _, metrics = render_comparison(original_data, watermarked_data, restored_data, output_path,
+                                   title=f"Record {job['patient_code']}", **job['render_options'])
+    return {
+        'name': job['patient_code'],
+        'path': output_path,
+        'is_restored': bool(np.array_equal(original_data, restored_data)),
+        'is_secret_extracted': extracted_secret_data == job['secret_data'],
+        **metrics,
+    }
+
+
+def record_reports(patient_codes: Sequence[str], stego, secret_data: str,
+                   output_dir: str = 'out/report', folder_path: str = ECG_FOLDER_PATH,
+                   workers: Optional[int] = None, render_options: Optional[Dict] = None,
+                   **embed_options):
+    """
+    Embed, extract, dan gambar perbandingan untuk seluruh record secara paralel.
+
+    Parameters:
+    - patient_codes (Sequence[str]): Kode record, misalnya ['100', '101'].
+    - stego: Objek stego v3/v4 (embed mengembalikan side info dan Result). Harus bisa di-pickle
+      jika workers lebih dari 1.
+    - secret_data (str): Secret biner.
+    - output_dir (str): Folder output gambar dan summary.csv.
+    - folder_path (str): Folder database MIT-BIH.
+    - workers (int, opsional): Jumlah proses. Default: jumlah CPU.
+    - render_options (dict, opsional): Diteruskan ke `render_comparison`.
+    - embed_options: Parameter embed/extract, misalnya payload_rate dan threshold.
+
+    Returns:
+    pandas.DataFrame: Metrik, status pemulihan sinyal dan secret, serta path gambar per record.
+
+    Example:
+    record_reports(['100', '101'], PEEStego(is_frequency_log=False), secret, payload_rate=2)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [{'patient_code': patient_code, 'stego': stego, 'secret_data': secret_data,
+             'output_dir': output_dir, 'folder_path': folder_path,
+             'render_options': render_options or {}, 'embed_options': embed_options}
+            for patient_code in patient_codes]
+    return _write_summary(_map_jobs(_record_job, jobs, workers), output_dir)
+
+
+def main():
+    from pee_stego_v4 import PEEStego
+    from utils.data_preparation import get_secret_file
+
+    parser = argparse.ArgumentParser(description='Gambar perbandingan sinyal per record (v4)')
+    parser.add_argument('patients', nargs='+')
+    parser.add_argument('--secret', default='keys/bin/secret_0.99_bps.txt')
+    parser.add_argument('--folder', default=ECG_FOLDER_PATH)
+    parser.add_argument('--output', default='out/report')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--payload-rate', type=int, default=2)
+    parser.add_argument('--threshold', type=int, default=0)
+    arguments = parser.parse_args()
+
+    table = record_reports(arguments.patients, PEEStego(is_frequency_log=False),
+                           get_secret_file(arguments.secret), arguments.output, arguments.folder,
+                           arguments.workers, payload_rate=arguments.payload_rate,
+                           threshold=arguments.threshold)
+    print(table.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,27 @@
 from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
 import numpy as np
 from utils.log import THRESHOLD_ERROR_LOG
-from utils.calculation import Calculation
+from utils.calculation import Calculation, MetricAccumulator
+
+# Kolom teks disimpan sebagai kode int32 dengan tabel kategori, sisanya numerik
+RESULT_TEXT_FIELDS = ('version', 'predictor', 'secret_name')
+RESULT_FIELDS = (
+    ('version', np.int32),
+    ('predictor', np.int32),
+    ('payload_rate', np.float64),
+    ('threshold', np.float64),
+    ('index_signal', np.int64),
+    ('secret_name', np.int32),
+    ('len_secret_data', np.int64),
+    ('len_extracted_secret_data', np.int64),
+    ('unhidden_secret_count', np.int64),
+    ('ncc', np.float64),
+    ('prd', np.float64),
+    ('snr', np.float64),
+    ('psnr', np.float64),
+    ('time', np.float64),
+)
 
 
 class Result:
@@ -23,6 +43,21 @@ class Result:
         self.snr = Calculation.snr(original_signal, reconstructed_signal)
         self.psnr = Calculation.psnr(original_signal, reconstructed_signal)
         self.timer = execution_time
+        self.print_metrics()
+
+    def calculate_from(self, metrics: MetricAccumulator, execution_time: float):
+        """
+        Sama seperti `calculate`, tetapi dari akumulator metrik (misalnya hanya dari sampel yang
+        berubah) sehingga sinyal asli tidak perlu disalin.
+        """
+        self.ncc = metrics.ncc()
+        self.prd = metrics.prd()
+        self.snr = metrics.snr()
+        self.psnr = metrics.psnr()
+        self.timer = execution_time
+        self.print_metrics()
+
+    def print_metrics(self):
         print(f'Unhidden secret: {self.unhidden_secret_count}')
         print(f'NCC: {self.ncc}')
         print(f'PRD: {self.prd}')
@@ -62,3 +97,207 @@ class Result:
                     f"Total yang kurang dari sama dengan threshold (T = {threshold}): {greater_than_threshold_total}", file=file_log)
                 print(
                     f"Total yang kurang dari sama dengan threshold (T = {threshold}): {greater_than_threshold_total}")
+
+
+class ResultAccumulator:
+    """
+    Penampung hasil sweep berbasis structured array NumPy sebagai pengganti list objek Result.
+
+    Baris disimpan dalam potongan berukuran tetap yang dialokasikan di awal, sehingga jutaan sel
+    tidak membuat jutaan objek Python. Kolom teks (version, predictor, secret_name) disimpan
+    sebagai kode kategori.
+
+    Parameters:
+    - chunk_size (int): Jumlah baris per potongan. Default: 65.536.
+    - timing_fields (Sequence[str]): Kolom waktu tambahan per tahap, misalnya ('extract_time',).
+
+    Example:
+    results = ResultAccumulator(timing_fields=('extract_time',))
+    results.append(result, version=4, payload_rate=2, threshold=0, index_signal=0,
+                   secret_name='secret_0.99_bps', len_secret_data=3564,
+                   len_extracted_secret_data=3105, extract_time=0.01)
+    results.to_csv('out/result_v4.csv')
+    """
+
+    def __init__(self, chunk_size: int = 65_536, timing_fields: Sequence[str] = ()):
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(list(RESULT_FIELDS) + [(field, np.float64) for field in timing_fields])
+        self.categories: Dict[str, List[str]] = {field: [] for field in RESULT_TEXT_FIELDS}
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in RESULT_TEXT_FIELDS}
+        self._chunks: List[np.ndarray] = []
+        self._length = 0
+        self._records: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _new_chunk(self) -> np.ndarray:
+        chunk = np.zeros(self.chunk_size, dtype=self.dtype)
+        for field in self.dtype.names:
+            if field in RESULT_TEXT_FIELDS:
+                chunk[field] = -1
+            elif self.dtype[field].kind == 'f':
+                chunk[field] = np.nan
+            elif self.dtype[field].kind == 'i':
+                chunk[field] = np.iinfo(self.dtype[field]).min
+        return chunk
+
+    def _encode(self, field: str, value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(self.categories[field])
+            self.categories[field].append(value)
+        return codes[value]
+
+    def append(self, result: Optional[Result] = None, **fields):
+        """
+        Menambah satu baris. Jika result diberikan, ncc, prd, snr, psnr, time (timer) dan
+        unhidden_secret_count diambil dari result kecuali diberikan lewat fields.
+        """
+        if result is not None:
+            for field, attribute in (('ncc', 'ncc'), ('prd', 'prd'), ('snr', 'snr'), ('psnr', 'psnr'),
+                                     ('time', 'timer'), ('unhidden_secret_count', 'unhidden_secret_count')):
+                if field not in fields and hasattr(result, attribute):
+                    fields[field] = getattr(result, attribute)
+
+        unknown = set(fields) - set(self.dtype.names)
+        if unknown:
+            raise ValueError(f"Kolom {sorted(unknown)} tidak dikenal")
+
+        if self._length == len(self._chunks) * self.chunk_size:
+            self._chunks.append(self._new_chunk())
+        row = self._chunks[-1][self._length % self.chunk_size]
+        for field, value in fields.items():
+            row[field] = self._encode(field, value) if field in RESULT_TEXT_FIELDS else value
+        self._length += 1
+        self._records = None
+
+    def extend(self, **columns):
+        """
+        Menambah banyak baris sekaligus dari kolom array yang sama panjang, tanpa loop per baris.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Panjang kolom tidak sama")
+        count = lengths.pop() if lengths else 0
+
+        encoded = {}
+        for field, values in columns.items():
+            if field not in self.dtype.names:
+                raise ValueError(f"Kolom {field} tidak dikenal")
+            if field in RESULT_TEXT_FIELDS:
+                unique_values, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+                codes = np.array([self._encode(field, value) for value in unique_values], dtype=np.int32)
+                encoded[field] = codes[inverse]
+            else:
+                encoded[field] = np.asarray(values)
+
+        written = 0
+        while written < count:
+            if self._length == len(self._chunks) * self.chunk_size:
+                self._chunks.append(self._new_chunk())
+            offset = self._length % self.chunk_size
+            size = min(count - written, self.chunk_size - offset)
+            for field, values in encoded.items():
+                self._chunks[-1][field][offset:offset + size] = values[written:written + size]
+            written += size
+            self._length += size
+        self._records = None
+
+    @property
+    def records(self) -> np.ndarray:
+        """
+        Structured array semua baris (kolom teks masih berupa kode).
+
+        Hasil penggabungan potongan disimpan sampai ada baris baru, sehingga pemanggilan
+        `column` berulang tidak menyalin ulang semua baris. Array ini read-only.
+        """
+        if self._records is None:
+            records = np.concatenate(self._chunks)[:self._length] if self._chunks else \
+                np.zeros(0, dtype=self.dtype)
+            records.flags.writeable = False
+            self._records = records
+        return self._records
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Satu kolom; kolom teks dikembalikan sebagai array object berisi string atau None, begitu
+        juga kolom integer yang memiliki baris tanpa nilai.
+        """
+        return self._decode(field, self.records[field])
+
+    def _missing(self, field: str, values: np.ndarray) -> np.ndarray:
+        """
+        Mask baris yang kolomnya tidak pernah diisi.
+        """
+        if field in RESULT_TEXT_FIELDS:
+            return values == -1
+        if self.dtype[field].kind == 'f':
+            return np.isnan(values)
+        return values == np.iinfo(self.dtype[field]).min
+
+    def _decode(self, field: str, values: np.ndarray) -> np.ndarray:
+        if field in RESULT_TEXT_FIELDS:
+            categories = np.array(self.categories[field] + [None], dtype=object)
+            return categories[values]
+        if self.dtype[field].kind == 'i':
+            missing = self._missing(field, values)
+            if np.any(missing):
+                values = values.astype(object)
+                values[missing] = None
+        return values
+
+    def to_pandas(self):
+        import pandas as pd
+
+        records = self.records
+        columns = {}
+        for field in self.dtype.names:
+            values = records[field]
+            if field in RESULT_TEXT_FIELDS:
+                columns[field] = pd.Categorical.from_codes(values, self.categories[field])
+            elif self.dtype[field].kind == 'i':
+                columns[field] = pd.arrays.IntegerArray(values.astype(np.int64), self._missing(field, values))
+            else:
+                columns[field] = values
+        return pd.DataFrame(columns)
+
+    def to_csv(self, csv_path: str, columns: Optional[Sequence[str]] = None):
+        """
+        Menulis semua baris ke CSV; columns membatasi dan mengurutkan kolom, misalnya format
+        `out/result_v4_*.csv`.
+        """
+        table = self.to_pandas()
+        table.to_csv(csv_path, columns=list(columns) if columns else None, index=False)
+
+    def to_store(self, store, **defaults) -> int:
+        """
+        Menyimpan semua baris ke `ResultStore` dalam satu transaksi.
+
+        Kolom yang tidak pernah diisi pada suatu baris diambil dari defaults (misalnya version=4),
+        atau disimpan sebagai NULL. Kolom yang tidak ada di tabel results (misalnya timing_fields)
+        disimpan sebagai JSON di kolom extra.
+        """
+        from utils.result_store import RESULT_COLUMNS
+
+        records = self.records
+        columns = [column for column in RESULT_COLUMNS if column in self.dtype.names]
+        extra_columns = [field for field in self.dtype.names if field not in RESULT_COLUMNS]
+        values = []
+        for column in columns + extra_columns:
+            decoded = self._decode(column, records[column]).astype(object)
+            decoded[self._missing(column, records[column])] = None
+            values.append(decoded.tolist())
+
+        def to_row(row):
+            stored = {column: value for column, value in zip(columns, row) if value is not None}
+            extra = {field: value for field, value in zip(extra_columns, row[len(columns):]) if value is not None}
+            if extra:
+                stored['extra'] = extra
+            return stored
+
+        rows: Iterable[dict] = (to_row(row) for row in zip(*values))
+        return store.insert_many(rows, **defaults)
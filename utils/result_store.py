@@ -0,0 +1,176 @@
+import csv
+import json
+import os
+import re
+import sqlite3
+from typing import Iterable, List, Optional, Sequence, Union
+
+RESULT_COLUMNS = ('version', 'predictor', 'payload_rate', 'threshold', 'index_signal', 'secret_name',
+                  'len_secret_data', 'len_extracted_secret_data', 'ncc', 'prd', 'snr', 'psnr', 'time',
+                  'source', 'unhidden_secret_count', 'extra')
+
+SETTING_COLUMNS = ('version', 'predictor', 'payload_rate', 'threshold')
+
+CSV_COLUMN_ALIASES = {'model_name': 'predictor'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    version TEXT,
+    predictor TEXT,
+    payload_rate REAL,
+    threshold REAL,
+    index_signal INTEGER,
+    secret_name TEXT,
+    len_secret_data INTEGER,
+    len_extracted_secret_data INTEGER,
+    ncc REAL,
+    prd REAL,
+    snr REAL,
+    psnr REAL,
+    time REAL,
+    source TEXT,
+    unhidden_secret_count INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS results_setting ON results (version, predictor, payload_rate, threshold);
+CREATE INDEX IF NOT EXISTS results_predictor ON results (predictor);
+CREATE INDEX IF NOT EXISTS results_payload_rate ON results (payload_rate, threshold);
+CREATE INDEX IF NOT EXISTS results_signal ON results (index_signal);
+CREATE INDEX IF NOT EXISTS results_secret ON results (secret_name);
+"""
+
+# Kolom yang ditambahkan setelah skema awal, ditambahkan ke database lama saat dibuka
+_ADDED_COLUMNS = (('unhidden_secret_count', 'INTEGER'), ('extra', 'TEXT'))
+
+
+class ResultStore:
+    """
+    Penyimpanan hasil sweep berbasis SQLite dengan index pada version, predictor,
+    payload_rate, threshold, signal dan secret.
+    """
+
+    def __init__(self, database_path: str = 'out/results.sqlite'):
+        self.database_path = database_path
+        self.connection = sqlite3.connect(database_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+
+        existing = {row['name'] for row in self.connection.execute("PRAGMA table_info(results)")}
+        with self.connection:
+            for column, column_type in _ADDED_COLUMNS:
+                if column not in existing:
+                    self.connection.execute(f"ALTER TABLE results ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def insert_many(self, rows: Iterable[Union[dict, Sequence]], **defaults) -> int:
+        """
+        Menyimpan banyak baris hasil dalam satu transaksi.
+
+        Parameters:
+        - rows (Iterable[dict | Sequence]): Baris hasil. Dict memakai nama kolom RESULT_COLUMNS,
+          sequence harus berurutan sesuai RESULT_COLUMNS. Kolom extra boleh berupa dict
+          (misalnya waktu per tahap) dan disimpan sebagai JSON.
+        - defaults: Nilai kolom untuk baris yang tidak memilikinya, misalnya version=4.
+
+        Returns:
+        int: Jumlah baris yang disimpan.
+        """
+        def to_record(row):
+            if not isinstance(row, dict):
+                row = dict(zip(RESULT_COLUMNS, row))
+            return tuple(_to_sql_value(row.get(column, defaults.get(column))) for column in RESULT_COLUMNS)
+
+        placeholders = ', '.join('?' for _ in RESULT_COLUMNS)
+        with self.connection:
+            cursor = self.connection.executemany(
+                f"INSERT INTO results ({', '.join(RESULT_COLUMNS)}) VALUES ({placeholders})",
+                (to_record(row) for row in rows))
+        return cursor.rowcount
+
+    def import_csv(self, csv_path: str, version: Optional[Union[int, str]] = None,
+                   predictor: Optional[str] = None) -> int:
+        """
+        Mengimpor file `out/result_*.csv` secara streaming.
+
+        Versi diambil dari nama file (`result_v4_...`) jika tidak diberikan, dan kolom
+        `model_name` dibaca sebagai predictor.
+        """
+        filename = os.path.basename(csv_path)
+        if version is None:
+            version_match = re.match(r'result_v(\d+)', filename)
+            version = version_match.group(1) if version_match else None
+
+        with open(csv_path, newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            rows = ({CSV_COLUMN_ALIASES.get(column, column): value for column, value in row.items()}
+                    for row in reader)
+            return self.insert_many(rows, version=version, predictor=predictor, source=filename)
+
+    def query(self, sql: str, parameters: Sequence = ()) -> List[dict]:
+        return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def mean_metrics(self, group_by: Sequence[str] = SETTING_COLUMNS, **filters) -> List[dict]:
+        """
+        Rata-rata NCC, PRD, SNR, PSNR dan waktu untuk tiap setting.
+
+        Parameters:
+        - group_by (Sequence[str]): Kolom pengelompokan. Default: version, predictor,
+          payload_rate, threshold.
+        - filters: Filter kesamaan kolom, misalnya secret_name='secret_0.99_bps'.
+        """
+        group_columns = self._columns(group_by)
+        where, parameters = self._where(filters)
+        return self.query(
+            f"SELECT {group_columns}, COUNT(*) AS count, AVG(ncc) AS ncc, AVG(prd) AS prd, "
+            f"AVG(snr) AS snr, AVG(psnr) AS psnr, AVG(time) AS time "
+            f"FROM results {where} GROUP BY {group_columns} ORDER BY {group_columns}",
+            parameters)
+
+    def capacity_failures(self, group_by: Sequence[str] = SETTING_COLUMNS, **filters) -> List[dict]:
+        """
+        Jumlah sel yang secret-nya tidak terekstrak penuh (len_extracted_secret_data < len_secret_data)
+        untuk tiap setting, beserta rata-rata bit yang hilang.
+        """
+        group_columns = self._columns(group_by)
+        where, parameters = self._where(filters)
+        where = f"{where} AND" if where else "WHERE"
+        return self.query(
+            f"SELECT {group_columns}, COUNT(*) AS failures, "
+            f"AVG(len_secret_data - len_extracted_secret_data) AS missing_bits "
+            f"FROM results {where} len_extracted_secret_data < len_secret_data "
+            f"GROUP BY {group_columns} ORDER BY {group_columns}",
+            parameters)
+
+    @staticmethod
+    def _columns(columns: Sequence[str]) -> str:
+        unknown = [column for column in columns if column not in RESULT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Kolom {unknown} tidak ada di tabel results")
+        return ', '.join(columns)
+
+    @classmethod
+    def _where(cls, filters: dict):
+        if not filters:
+            return '', ()
+        cls._columns(filters.keys())
+        where = ' AND '.join(f'{column} = ?' for column in filters)
+        return f'WHERE {where}', tuple(_to_sql_value(value) for value in filters.values())
+
+
+def _to_sql_value(value):
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True) if value else None
+    if value is None or value == '':
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
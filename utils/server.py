@@ -0,0 +1,336 @@
+import argparse
+import contextlib
+import json
+import pickle
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+import numpy as np
+from utils.result import Result
+
+OPERATIONS = ('embed', 'extract', 'capacity')
+RESULT_FIELDS = ('ncc', 'prd', 'snr', 'psnr', 'timer', 'unhidden_secret_count')
+
+
+class _PendingPrediction:
+    def __init__(self, features: np.ndarray):
+        self.features = features
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class BatchingPredictor:
+    """
+    Pembungkus model yang menggabungkan panggilan predict dari banyak thread menjadi satu batch.
+
+    Permintaan yang datang dalam jendela max_wait detik setelah permintaan pertama digabung
+    (maksimal max_batch_rows baris), diprediksi dengan satu `model.predict`, lalu hasilnya
+    dibagi kembali ke masing-masing pemanggil.
+    """
+
+    def __init__(self, model, max_wait: float = 0.002, max_batch_rows: int = 262_144):
+        self.model = model
+        self.max_wait = max_wait
+        self.max_batch_rows = max_batch_rows
+        self.request_count = 0
+        self.batch_count = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def predict(self, features) -> np.ndarray:
+        pending = _PendingPrediction(np.asarray(features, dtype=np.float64))
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            rows = len(first.features)
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while rows < self.max_batch_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+                rows += len(pending.features)
+
+            self._predict_batch(batch)
+            if stop:
+                return
+
+    def _predict_batch(self, batch):
+        try:
+            predicted_values = np.asarray(self.model.predict(
+                np.concatenate([pending.features for pending in batch])), dtype=np.float64).reshape(-1)
+            offsets = np.cumsum([len(pending.features) for pending in batch])[:-1]
+            for pending, values in zip(batch, np.split(predicted_values, offsets)):
+                pending.result = values
+        except Exception as error:
+            for pending in batch:
+                pending.error = error
+        finally:
+            self.request_count += len(batch)
+            self.batch_count += 1
+            for pending in batch:
+                pending.done.set()
+
+
+class _ThreadSilencedStdout:
+    """
+    Pengganti sys.stdout yang membuang output thread yang sedang berada di dalam `silenced_stdout` dan
+    meneruskan output thread lain ke stdout aslinya.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        if getattr(self.local, 'silenced', False):
+            return len(text)
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def silenced_stdout():
+    """
+    Membungkam print di thread pemanggil saja. Berbeda dengan contextlib.redirect_stdout yang
+    mengganti sys.stdout untuk semua thread, aman dipakai bersamaan oleh banyak handler.
+    """
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadSilencedStdout):
+            sys.stdout = _ThreadSilencedStdout(sys.stdout)
+        stdout = sys.stdout
+    stdout.local.silenced = True
+    try:
+        yield
+    finally:
+        stdout.local.silenced = False
+
+
+def to_json_value(value):
+    """
+    Mengubah output embed/extract (array, tuple, Result) menjadi nilai yang bisa di-JSON-kan.
+    """
+    if isinstance(value, Result):
+        return {field: to_json_value(getattr(value, field, None)) for field in RESULT_FIELDS}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_json_value(item) for key, item in value.items()}
+    return value
+
+
+class StegoService:
+    """
+    Menyimpan objek PEEStego/MLPEEStego beserta modelnya tetap hangat di satu proses.
+
+    Setiap nama stego (misalnya 'v4' atau 'v3:SVR') memetakan ke satu objek. Model ML dibungkus
+    `BatchingPredictor`, sehingga prediksi dari permintaan yang bersamaan digabung.
+
+    Notes:
+    Objek stego dipakai bersama oleh semua thread handler. Ini aman karena method embed/extract/
+    estimate hanya membaca konfigurasi objek dan menyimpan state per panggilan di variabel lokal,
+    sedangkan model hanya dipanggil dari thread `BatchingPredictor`, sehingga model yang tidak
+    thread-safe (misalnya MemoizedPredictor) tidak pernah dipanggil bersamaan. Print debug kelas
+    stego dibungkam per thread handler (lihat `silenced_stdout`).
+    """
+
+    def __init__(self, models: Optional[Dict[str, object]] = None, max_wait: float = 0.002):
+        from ml_pee_stego_v1 import MLPEEStego as MLPEEStegoV1
+        from ml_pee_stego_v2 import MLPEEStego as MLPEEStegoV2
+        from ml_pee_stego_v3 import MLPEEStego as MLPEEStegoV3
+        from pee_stego_v4 import PEEStego
+
+        self.predictors = {}
+        self.stegos = {'v4': PEEStego(is_frequency_log=False)}
+        for model_name, model in (models or {}).items():
+            predictor = BatchingPredictor(model, max_wait=max_wait)
+            self.predictors[model_name] = predictor
+            self.stegos[f'v1:{model_name}'] = MLPEEStegoV1(predictor, is_frequency_log=False)
+            self.stegos[f'v2:{model_name}'] = MLPEEStegoV2(predictor, is_frequency_log=False)
+            self.stegos[f'v3:{model_name}'] = MLPEEStegoV3(predictor, is_frequency_log=False)
+
+    @classmethod
+    def from_model_files(cls, model_paths: Dict[str, str], max_wait: float = 0.002):
+        models = {}
+        for model_name, model_path in model_paths.items():
+            with open(model_path, 'rb') as model_file:
+                models[model_name] = pickle.load(model_file)
+        return cls(models, max_wait)
+
+    def handle(self, operation: str, request: dict):
+        """
+        Menjalankan satu permintaan.
+
+        Parameters:
+        - operation (str): 'embed', 'extract', atau 'capacity'.
+        - request (dict): 'stego' (nama stego), 'signal' (list int), 'args' (argumen posisi setelah
+          sinyal, opsional), dan argumen keyword lain dari method (secret_data, mirror_data,
+          payload_rate, threshold, secret_key, ...).
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Operasi '{operation}' tidak dikenal, pilih dari {OPERATIONS}")
+
+        arguments = dict(request)
+        stego_name = arguments.pop('stego', 'v4')
+        if stego_name not in self.stegos:
+            raise ValueError(f"Stego '{stego_name}' tidak tersedia, pilih dari {sorted(self.stegos)}")
+        stego = self.stegos[stego_name]
+        signal = np.asarray(arguments.pop('signal'), dtype=np.int64)
+        positional = arguments.pop('args', [])
+
+        if operation == 'capacity':
+            if not hasattr(stego, 'estimate'):
+                raise ValueError(f"Stego '{stego_name}' tidak mendukung estimasi kapasitas")
+            method = stego.estimate
+        else:
+            method = getattr(stego, operation)
+        with silenced_stdout():
+            return method(signal, *positional, **arguments)
+
+    def stats(self) -> dict:
+        return {
+            'stegos': sorted(self.stegos),
+            'predictors': {name: {'requests': predictor.request_count, 'batches': predictor.batch_count}
+                           for name, predictor in self.predictors.items()},
+        }
+
+    def close(self):
+        for predictor in self.predictors.values():
+            predictor.close()
+
+
+def make_server(service: StegoService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Membuat HTTP server lokal: POST /embed, /extract, /capacity dengan body JSON dan GET /stats.
+    Gunakan port 0 untuk port bebas; alamatnya ada di server.server_address.
+    """
+
+    class StegoRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body):
+            payload = json.dumps(to_json_value(body)).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send(200, service.stats())
+            else:
+                self._send(404, {'error': f'{self.path} tidak ditemukan'})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                self._send(200, {'output': service.handle(self.path.strip('/'), request)})
+            except Exception as error:
+                self._send(400, {'error': f'{type(error).__name__}: {error}'})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), StegoRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+class StegoClient:
+    """
+    Client untuk server lokal. Output dikembalikan dalam bentuk yang sama dengan method stego,
+    dengan sinyal sebagai np.ndarray dan Result sebagai dict metrik.
+    """
+
+    def __init__(self, url: str = 'http://127.0.0.1:8765', timeout: float = 600):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _post(self, operation: str, request: dict):
+        data = json.dumps(to_json_value(request)).encode('utf-8')
+        http_request = urllib.request.Request(f'{self.url}/{operation}', data=data,
+                                              headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+                return json.loads(response.read())['output']
+        except urllib.error.HTTPError as error:
+            raise RuntimeError(json.loads(error.read()).get('error')) from None
+
+    def embed(self, signal, secret_data: str, stego: str = 'v4', **parameters):
+        output = self._post('embed', dict(parameters, stego=stego, signal=signal, secret_data=secret_data))
+        return (np.asarray(output[0], dtype=np.int64),) + tuple(output[1:])
+
+    def extract(self, signal, *side_info, stego: str = 'v4', **parameters):
+        output = self._post('extract', dict(parameters, stego=stego, signal=signal, args=side_info))
+        return np.asarray(output[0], dtype=np.int64), output[1]
+
+    def capacity(self, signal, secret_length: int, stego: str = 'v4', **parameters):
+        return self._post('capacity', dict(parameters, stego=stego, signal=signal, secret_length=secret_length))
+
+    def stats(self) -> dict:
+        with urllib.request.urlopen(f'{self.url}/stats', timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Server embedding lokal PEE stego')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--model', action='append', default=[],
+                        help="Model dengan format NAMA=path.pkl, misalnya SVR=models/svr_model.pkl")
+    parser.add_argument('--max-wait', type=float, default=0.002)
+    arguments = parser.parse_args()
+
+    model_paths = dict(model.split('=', 1) for model in arguments.model)
+    service = StegoService.from_model_files(model_paths, arguments.max_wait)
+    server = make_server(service, arguments.host, arguments.port)
+    print(f"Server berjalan di http://{server.server_address[0]}:{server.server_address[1]} "
+          f"dengan stego {sorted(service.stegos)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional
+import numpy as np
+
+SWEEP_KEY_FIELDS = ('version', 'predictor', 'payload_rate',
+                    'threshold', 'index_signal', 'secret_name')
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipe {type(value).__name__} tidak bisa disimpan ke checkpoint")
+
+
+def cell_key(cell: dict) -> str:
+    """
+    Membuat kunci unik sel sweep dari (version, predictor, payload_rate, threshold,
+    index_signal, secret_name).
+
+    Parameters:
+    - cell (dict): Parameter sel sweep, minimal berisi semua field di SWEEP_KEY_FIELDS.
+
+    Returns:
+    str: Hash hex yang aman dipakai sebagai nama file.
+    """
+    missing = [field for field in SWEEP_KEY_FIELDS if field not in cell]
+    if missing:
+        raise KeyError(f"Sel sweep tidak memiliki field {missing}")
+
+    identity = json.dumps([cell[field] for field in SWEEP_KEY_FIELDS], default=_json_default)
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+class SweepExecutor:
+    """
+    Menjalankan sel sweep dengan checkpoint per sel di disk.
+
+    Sel yang sudah selesai disimpan secara atomik di `checkpoint_dir/done`, sehingga saat
+    dijalankan ulang sel tersebut dilewati. Sel yang sedang dikerjakan diklaim lewat file lock
+    di `checkpoint_dir/locks`, sehingga beberapa proses lokal atau mesin yang berbagi folder
+    tidak mengerjakan sel yang sama.
+
+    Lock berisi host, pid, dan token unik pemiliknya. Selama sel dikerjakan, mtime lock diperbarui
+    setiap heartbeat_interval detik (default lock_timeout / 4), sehingga hanya lock milik worker
+    yang mati yang menjadi basi dan bisa diambil alih.
+    """
+
+    def __init__(self, checkpoint_dir: str, lock_timeout: float = 6 * 60 * 60,
+                 heartbeat_interval: Optional[float] = None):
+        self.checkpoint_dir = checkpoint_dir
+        self.lock_timeout = lock_timeout
+        self.heartbeat_interval = lock_timeout / 4 if heartbeat_interval is None else heartbeat_interval
+        self._owner_tokens = {}
+        self.done_dir = os.path.join(checkpoint_dir, 'done')
+        self.lock_dir = os.path.join(checkpoint_dir, 'locks')
+        os.makedirs(self.done_dir, exist_ok=True)
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+    def done_path(self, key: str) -> str:
+        return os.path.join(self.done_dir, f'{key}.json')
+
+    def lock_path(self, key: str) -> str:
+        return os.path.join(self.lock_dir, f'{key}.lock')
+
+    def is_done(self, key: str) -> bool:
+        return os.path.exists(self.done_path(key))
+
+    def _read_lock(self, path: str) -> Optional[str]:
+        try:
+            with open(path) as lock_file:
+                return lock_file.read()
+        except FileNotFoundError:
+            return None
+
+    def owns(self, key: str) -> bool:
+        """
+        Apakah lock sel masih berisi token yang ditulis proses ini saat claim.
+        """
+        token = self._owner_tokens.get(key)
+        return token is not None and self._read_lock(self.lock_path(key)) == token
+
+    def claim(self, key: str) -> bool:
+        """
+        Mengklaim sel dengan membuat file lock secara eksklusif.
+        Lock yang lebih tua dari lock_timeout dianggap milik worker yang mati dan diambil alih.
+        """
+        lock_path = self.lock_path(key)
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._remove_stale_lock(lock_path):
+                    return False
+                continue
+
+            token = f'{socket.gethostname()} {os.getpid()} {uuid.uuid4().hex}'
+            with os.fdopen(fd, 'w') as lock_file:
+                lock_file.write(token)
+            self._owner_tokens[key] = token
+            return True
+        return False
+
+    def _remove_stale_lock(self, lock_path: str) -> bool:
+        """
+        Menghapus lock basi. Pengambilalihan satu token basi diserialkan lewat file penanda
+        `<lock>.<hash token>.takeover` yang dibuat dengan O_EXCL, sehingga hanya satu worker yang
+        boleh menghapus lock berisi token tersebut. Worker lain yang melihat token yang sama
+        mundur. Karena token unik dan tidak pernah ditulis ulang, pemegang penanda cukup memeriksa
+        bahwa lock masih berisi token basi itu: begitu token tersebut dihapus, tidak ada worker
+        yang bisa melihatnya lagi, sehingga lock baru milik worker lain tidak pernah ikut terhapus.
+
+        Returns:
+        bool: True jika lock sudah tidak ada dan claim boleh dicoba lagi.
+        """
+        stale_token = self._read_lock(lock_path)
+        try:
+            lock_age = time.time() - os.path.getmtime(lock_path)
+        except FileNotFoundError:
+            return True
+        if stale_token is None or lock_age <= self.lock_timeout:
+            return stale_token is None
+
+        token_hash = hashlib.sha1(stale_token.encode('utf-8')).hexdigest()[:16]
+        takeover_path = f'{lock_path}.{token_hash}.takeover'
+        try:
+            os.close(os.open(takeover_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            # Penanda yatim dari worker yang mati di tengah pengambilalihan, dibersihkan
+            # supaya sel tidak terkunci selamanya
+            try:
+                if time.time() - os.path.getmtime(takeover_path) > self.lock_timeout:
+                    os.remove(takeover_path)
+            except FileNotFoundError:
+                pass
+            return False
+
+        try:
+            if self._read_lock(lock_path) != stale_token:
+                return False
+            os.remove(lock_path)
+            return True
+        except FileNotFoundError:
+            return True
+        finally:
+            os.remove(takeover_path)
+
+    def refresh(self, key: str) -> bool:
+        """
+        Memperbarui mtime lock milik proses ini. False jika lock sudah bukan miliknya.
+        """
+        if not self.owns(key):
+            return False
+        try:
+            os.utime(self.lock_path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, key: str):
+        """
+        Menghapus lock hanya jika masih milik proses ini.
+        """
+        if self.owns(key):
+            try:
+                os.remove(self.lock_path(key))
+            except FileNotFoundError:
+                pass
+        self._owner_tokens.pop(key, None)
+
+    def _heartbeat(self, key: str, stopped: threading.Event):
+        while not stopped.wait(self.heartbeat_interval):
+            if not self.refresh(key):
+                return
+
+    def save(self, key: str, cell: dict, result: dict):
+        """
+        Menyimpan hasil sel secara atomik: tulis ke file sementara lalu os.replace.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.done_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as temp_file:
+                json.dump({'cell': cell, 'result': result}, temp_file, default=_json_default)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, self.done_path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.done_path(key)) as done_file:
+                return json.load(done_file)
+        except FileNotFoundError:
+            return None
+
+    def run(self, cells: Iterable[dict], run_cell: Callable[[dict], dict], workers: int = 1) -> int:
+        """
+        Menjalankan semua sel yang belum selesai.
+
+        Parameters:
+        - cells (Iterable[dict]): Parameter tiap sel sweep.
+        - run_cell (Callable): Fungsi sel -> dict hasil (misalnya panjang secret, ncc, prd, snr).
+        - workers (int): Jumlah proses lokal. Jika lebih dari 1, run_cell harus bisa di-pickle.
+
+        Returns:
+        int: Jumlah sel yang dikerjakan pada pemanggilan ini.
+        """
+        cells = list(cells)
+        if workers <= 1:
+            return self._run_cells(cells, run_cell)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_worker, self.checkpoint_dir, self.lock_timeout,
+                                       self.heartbeat_interval, cells, run_cell)
+                       for _ in range(workers)]
+            return sum(future.result() for future in futures)
+
+    def _run_cells(self, cells: List[dict], run_cell: Callable[[dict], dict]) -> int:
+        completed = 0
+        for cell in cells:
+            key = cell_key(cell)
+            if self.is_done(key) or not self.claim(key):
+                continue
+
+            stopped = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(key, stopped), daemon=True)
+            heartbeat.start()
+            try:
+                # Cek ulang setelah klaim, bisa saja worker lain selesai tepat sebelum lock dibuat
+                if self.is_done(key):
+                    continue
+                self.save(key, cell, run_cell(cell))
+                completed += 1
+            finally:
+                stopped.set()
+                heartbeat.join()
+                self.release(key)
+        return completed
+
+    def results(self) -> List[dict]:
+        """
+        Memuat semua hasil sel yang sudah selesai sebagai baris (parameter sel + hasil).
+        """
+        rows = []
+        for filename in sorted(os.listdir(self.done_dir)):
+            if not filename.endswith('.json'):
+                continue
+            with open(os.path.join(self.done_dir, filename)) as done_file:
+                checkpoint = json.load(done_file)
+            rows.append({**checkpoint['cell'], **checkpoint['result']})
+        return rows
+
+
+def _run_worker(checkpoint_dir: str, lock_timeout: float, heartbeat_interval: float,
+                cells: List[dict], run_cell: Callable[[dict], dict]) -> int:
+    return SweepExecutor(checkpoint_dir, lock_timeout, heartbeat_interval)._run_cells(cells, run_cell)
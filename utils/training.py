@@ -0,0 +1,243 @@
+import argparse
+import os
+import pickle
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+import numpy as np
+import wfdb
+from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, Ridge, SGDRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from utils.data_preparation import ECG_FOLDER_PATH, get_filenames_from_folder
+from utils.neighbours import PHASE_STEP, training_pairs
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+LINEAR_MODELS = ('linear', 'ridge', 'lasso', 'elastic_net')
+
+
+def iter_record_chunks(folder_path: str = ECG_FOLDER_PATH,
+                       patient_codes: Optional[Sequence[str]] = None,
+                       phases: Sequence[int] = (1, 2, 3),
+                       chunk_size: int = 1_000_000,
+                       segment_samples: int = 300_000) -> Iterator[Chunk]:
+    """
+    Mengalirkan pasangan (tetangga, target) dari semua record MIT-BIH dalam potongan.
+
+    Parameters:
+    - folder_path (str): Folder database MIT-BIH.
+    - patient_codes (Sequence[str], opsional): Kode record. Default: semua file .dat di folder.
+    - phases (Sequence[int]): Fase yang diambil. Default: (1, 2, 3).
+    - chunk_size (int): Jumlah baris maksimal tiap potongan. Default: 1.000.000.
+    - segment_samples (int): Jumlah sampel yang dibaca dari record sekaligus. Default: 300.000.
+
+    Returns:
+    Iterator[Tuple[np.ndarray, np.ndarray]]: Potongan X (baris, 4) dan y (baris,) dalam satuan
+    mV x 1000, sama seperti `get_original_data`.
+
+    Notes:
+    Record dibaca per segmen dengan `sampfrom`/`sampto`, sehingga memori terpakai dibatasi oleh
+    segment_samples dan chunk_size, bukan ukuran database. Segmen dimulai pada kelipatan 3 dan
+    ditambah 4 sampel agar baris di perbatasan tetap lengkap dan fase tidak bergeser.
+    """
+    if patient_codes is None:
+        patient_codes = sorted(get_filenames_from_folder('dat', folder_path))
+
+    segment_samples = max(PHASE_STEP, segment_samples - segment_samples % PHASE_STEP)
+    for patient_code in patient_codes:
+        record_path = os.path.join(folder_path, patient_code)
+        signal_length = wfdb.rdheader(record_path).sig_len
+
+        for segment_start in range(0, signal_length, segment_samples):
+            segment_end = min(signal_length, segment_start + segment_samples + 4)
+            record, _ = wfdb.rdsamp(record_path, sampfrom=segment_start, sampto=segment_end,
+                                    channel_names=['MLII'])
+            if record is None or record.shape[1] == 0:
+                break
+
+            signal = (record[:, 0] * 1000).astype(np.int64)
+            features, targets = training_pairs(signal, phases)
+            for start in range(0, len(targets), chunk_size):
+                yield features[start:start + chunk_size], targets[start:start + chunk_size]
+
+
+class SufficientStatistics:
+    """
+    Statistik cukup (n, rata-rata, X^T X dan X^T y terpusat) yang digabung per potongan
+    dengan algoritma paralel Chan, sehingga model linear bisa dihitung tanpa menyimpan data.
+    """
+
+    def __init__(self, n_features: int = 4):
+        self.n = 0
+        self.mean_x = np.zeros(n_features)
+        self.mean_y = 0.0
+        self.gram = np.zeros((n_features, n_features))
+        self.xy = np.zeros(n_features)
+
+    def update(self, features: np.ndarray, targets: np.ndarray):
+        features = np.asarray(features, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        chunk_n = len(targets)
+        if chunk_n == 0:
+            return
+
+        chunk_mean_x = features.mean(axis=0)
+        chunk_mean_y = targets.mean()
+        centered_x = features - chunk_mean_x
+        centered_y = targets - chunk_mean_y
+
+        total = self.n + chunk_n
+        delta_x = chunk_mean_x - self.mean_x
+        delta_y = chunk_mean_y - self.mean_y
+        weight = self.n * chunk_n / total
+
+        self.gram += centered_x.T @ centered_x + weight * np.outer(delta_x, delta_x)
+        self.xy += centered_x.T @ centered_y + weight * delta_x * delta_y
+        self.mean_x += delta_x * chunk_n / total
+        self.mean_y += delta_y * chunk_n / total
+        self.n = total
+
+
+def solve_linear(statistics: SufficientStatistics, kind: str = 'linear', alpha: float = 1.0,
+                 l1_ratio: float = 0.5, max_iter: int = 1_000, tol: float = 1e-4):
+    """
+    Menghitung model linear sklearn dari statistik cukup.
+
+    Parameters:
+    - statistics (SufficientStatistics): Statistik hasil streaming.
+    - kind (str): 'linear', 'ridge', 'lasso', atau 'elastic_net'.
+    - alpha (float): Kekuatan regularisasi, sama dengan parameter sklearn. Default: 1.0.
+    - l1_ratio (float): Rasio L1 untuk elastic_net. Default: 0.5.
+    - max_iter (int): Iterasi coordinate descent maksimal. Default: 1000.
+    - tol (float): Toleransi perubahan koefisien coordinate descent. Default: 1e-4.
+
+    Returns:
+    Objek LinearRegression/Ridge/Lasso/ElasticNet yang sudah berisi coef_ dan intercept_,
+    sehingga bisa di-pickle dan langsung dipakai `MLPEEStego`.
+
+    Notes:
+    Lasso dan ElasticNet diselesaikan dengan coordinate descent pada matriks Gram dengan objektif
+    yang sama seperti sklearn: (1 / 2n) ||y - Xw||^2 + alpha * l1_ratio * ||w||_1
+    + 0.5 * alpha * (1 - l1_ratio) * ||w||^2.
+    """
+    if statistics.n == 0:
+        raise ValueError("Statistik kosong, tidak ada data training.")
+
+    gram = statistics.gram
+    xy = statistics.xy
+    n_features = len(xy)
+
+    if kind == 'linear':
+        model = LinearRegression()
+        coef = np.linalg.lstsq(gram, xy, rcond=None)[0]
+    elif kind == 'ridge':
+        model = Ridge(alpha=alpha)
+        coef = np.linalg.solve(gram + alpha * np.eye(n_features), xy)
+    elif kind in ('lasso', 'elastic_net'):
+        if kind == 'lasso':
+            model = Lasso(alpha=alpha, max_iter=max_iter, tol=tol)
+            l1_ratio = 1.0
+        else:
+            model = ElasticNet(alpha=alpha, l1_ratio=l1_ratio, max_iter=max_iter, tol=tol)
+
+        l1_penalty = statistics.n * alpha * l1_ratio
+        l2_penalty = statistics.n * alpha * (1 - l1_ratio)
+        coef = np.zeros(n_features)
+        for iteration in range(max_iter):
+            max_change = 0.0
+            for j in range(n_features):
+                residual = xy[j] - gram[j] @ coef + gram[j, j] * coef[j]
+                new_coef = np.sign(residual) * max(abs(residual) - l1_penalty, 0.0) / (gram[j, j] + l2_penalty)
+                max_change = max(max_change, abs(new_coef - coef[j]))
+                coef[j] = new_coef
+            if max_change <= tol * max(np.max(np.abs(coef)), 1e-12):
+                break
+        model.n_iter_ = iteration + 1
+    else:
+        raise ValueError(f"Model linear '{kind}' tidak dikenal, pilih dari {LINEAR_MODELS}")
+
+    model.coef_ = coef
+    model.intercept_ = statistics.mean_y - statistics.mean_x @ coef
+    model.n_features_in_ = n_features
+    return model
+
+
+def fit_linear(chunks: Iterable[Chunk], kind: str = 'linear', **solver_options):
+    """
+    Melatih model linear dalam satu lintasan data dengan statistik cukup.
+    """
+    statistics = SufficientStatistics()
+    for features, targets in chunks:
+        statistics.update(features, targets)
+    return solve_linear(statistics, kind, **solver_options)
+
+
+def fit_sgd(make_chunks: Callable[[], Iterable[Chunk]], epochs: int = 5, random_state: Optional[int] = None, **sgd_options):
+    """
+    Melatih make_pipeline(StandardScaler(), SGDRegressor()) secara inkremental, format yang sama
+    dengan `models/sgd_model.pkl`.
+
+    Parameters:
+    - make_chunks (Callable): Fungsi yang setiap dipanggil menghasilkan iterator potongan baru.
+    - epochs (int): Jumlah lintasan partial_fit SGD. Default: 5.
+    - random_state (int, opsional): Seed SGDRegressor.
+
+    Notes:
+    Lintasan pertama hanya untuk StandardScaler.partial_fit, lalu SGD dilatih per potongan
+    yang sudah diskalakan.
+    """
+    scaler = StandardScaler()
+    for features, _ in make_chunks():
+        scaler.partial_fit(features)
+
+    regressor = SGDRegressor(random_state=random_state, **sgd_options)
+    for _ in range(epochs):
+        for features, targets in make_chunks():
+            regressor.partial_fit(scaler.transform(features), targets)
+
+    return make_pipeline(scaler, regressor)
+
+
+def train_predictor(kind: str, output_path: str, folder_path: str = ECG_FOLDER_PATH,
+                    patient_codes: Optional[Sequence[str]] = None, phases: Sequence[int] = (1, 2, 3),
+                    chunk_size: int = 1_000_000, epochs: int = 5, **model_options):
+    """
+    Melatih prediktor pada seluruh database lalu menyimpannya sebagai pickle di output_path.
+
+    Parameters:
+    - kind (str): 'sgd' atau salah satu LINEAR_MODELS.
+    - output_path (str): Path file .pkl, misalnya 'models/lasso_model_full.pkl'.
+
+    Returns:
+    Model yang sudah dilatih.
+    """
+    def make_chunks():
+        return iter_record_chunks(folder_path, patient_codes, phases, chunk_size)
+
+    if kind == 'sgd':
+        model = fit_sgd(make_chunks, epochs=epochs, **model_options)
+    else:
+        model = fit_linear(make_chunks(), kind, **model_options)
+
+    with open(output_path, 'wb') as model_file:
+        pickle.dump(model, model_file)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Training prediktor out-of-core pada MIT-BIH')
+    parser.add_argument('--model', choices=('sgd',) + LINEAR_MODELS, required=True)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--folder', default=ECG_FOLDER_PATH)
+    parser.add_argument('--alpha', type=float, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--epochs', type=int, default=5)
+    arguments = parser.parse_args()
+
+    model_options = {} if arguments.alpha is None else {'alpha': arguments.alpha}
+    model = train_predictor(arguments.model, arguments.output, arguments.folder,
+                            chunk_size=arguments.chunk_size, epochs=arguments.epochs, **model_options)
+    print(f"Model {arguments.model} disimpan ke {arguments.output}: {model}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import math
+import numpy as np
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+def estimate_embedding(phase_errors: List[np.ndarray],
+                       secret_length: int,
+                       embedded_bit_limit: int,
+                       signal_power: float,
+                       expected_noise: Callable[[np.ndarray, np.ndarray], np.ndarray]) -> dict:
+    """
+    Mengestimasi kapasitas dan distorsi embedding mirror (v3/v4) tanpa embedding penuh.
+
+    Parameters:
+    - phase_errors (List[np.ndarray]): Error absolut |original - prediksi| tiap fase, urut fase 1..3.
+    - secret_length (int): Panjang secret dalam bit.
+    - embedded_bit_limit (int): Batas bit per sampel, yaitu ceil(payload_rate + threshold).
+    - signal_power (float): Jumlah kuadrat sinyal asli.
+    - expected_noise (Callable): Fungsi (error, bit) -> ekspektasi kuadrat perubahan sampel.
+
+    Returns:
+    dict: capacity, embedded_bits, used_samples, noise_power, prd, snr, dan fits.
+
+    Notes:
+    Prediksi setiap fase diambil dari sinyal asli, sehingga pengaruh fase sebelumnya
+    terhadap tetangga fase berikutnya diabaikan. Hasilnya estimasi, bukan nilai eksak.
+    """
+    errors = np.concatenate(phase_errors) if phase_errors else np.empty(0, np.int64)
+    errors = errors[errors > 1]
+
+    available_bits = np.minimum(np.floor(np.log2(errors)).astype(np.int64),
+                                embedded_bit_limit)
+    capacity = int(available_bits.sum())
+
+    # Sampel yang terpakai berhenti ketika secret habis, sampel terakhir bisa terpotong
+    cumulative_bits = np.cumsum(available_bits)
+    used_samples = int(np.searchsorted(cumulative_bits, secret_length)) + 1
+    used_samples = min(used_samples, len(available_bits)) if secret_length > 0 else 0
+    used_bits = available_bits[:used_samples].copy()
+    if used_samples > 0 and cumulative_bits[used_samples - 1] > secret_length:
+        used_bits[-1] -= cumulative_bits[used_samples - 1] - secret_length
+
+    noise_power = float(np.sum(expected_noise(errors[:used_samples], used_bits)))
+    embedded_bits = int(used_bits.sum())
+
+    if noise_power > 0:
+        prd = float(np.sqrt(noise_power / signal_power) * 100)
+        snr = float(10 * np.log10(signal_power / noise_power))
+    else:
+        prd = 0.0
+        snr = float('inf')
+
+    return {
+        'capacity': capacity,
+        'embedded_bits': embedded_bits,
+        'used_samples': used_samples,
+        'noise_power': noise_power,
+        'prd': prd,
+        'snr': snr,
+        'fits': capacity >= secret_length,
+    }
+
+
+def meets_target(estimate: dict, target_prd: Optional[float] = None, target_snr: Optional[float] = None) -> bool:
+    """
+    Memeriksa apakah estimasi memuat seluruh secret dan memenuhi target PRD/SNR.
+    """
+    if not estimate['fits']:
+        return False
+    if target_prd is not None and estimate['prd'] > target_prd:
+        return False
+    if target_snr is not None and estimate['snr'] < target_snr:
+        return False
+    return True
+
+
+def select_setting(estimates: List[dict],
+                   target_prd: Optional[float] = None,
+                   target_snr: Optional[float] = None) -> dict:
+    """
+    Memilih setting terbaik dari daftar estimasi.
+
+    Urutan prioritas: memenuhi target, memuat seluruh secret, bit terbanyak, lalu
+    distorsi (noise_power) terkecil. Jika setara, urutan kandidat awal dipertahankan.
+
+    Returns:
+    dict: Salinan estimasi terbaik dengan tambahan key 'meets_target'.
+    """
+    if not estimates:
+        raise ValueError("Tidak ada kandidat setting yang diestimasi.")
+
+    ranked = sorted(estimates, key=lambda estimate: (
+        not meets_target(estimate, target_prd, target_snr),
+        not estimate['fits'],
+        -estimate['embedded_bits'],
+        estimate['noise_power'],
+    ))
+    best = dict(ranked[0])
+    best['meets_target'] = meets_target(best, target_prd, target_snr)
+    return best
+
+
+def tune_setting(stego,
+                 original_data: np.ndarray,
+                 secret_length: int,
+                 target_prd: Optional[float] = None,
+                 target_snr: Optional[float] = None,
+                 payload_rates: Sequence[int] = (1, 2, 3),
+                 thresholds: Sequence[int] = (0, 1),
+                 secret_data: Optional[str] = None) -> Tuple[dict, List[dict]]:
+    """
+    Memilih payload_rate dan threshold untuk panjang secret dan target PRD/SNR (dipakai `tune` v3/v4).
+
+    Semua kandidat diestimasi dari error fase yang sama, sehingga tidak ada embedding selama pencarian.
+    Kandidat dengan ceil(payload_rate + threshold) yang sama memakai satu estimasi.
+
+    Parameters:
+    - stego: Objek stego v3/v4 dengan get_phase_errors, expected_noise, dan embed.
+    - original_data (np.ndarray): Sinyal asli.
+    - secret_length (int): Panjang secret dalam bit.
+    - target_prd, target_snr (float, opsional): PRD maksimal dan SNR minimal.
+    - payload_rates, thresholds (Sequence[int]): Kandidat setting.
+    - secret_data (str, opsional): Jika diberikan, setting terpilih dikonfirmasi dengan satu embed.
+
+    Returns:
+    Tuple[dict, List[dict]]: Estimasi terbaik (dengan hasil embed di 'embedding' jika secret_data
+    diberikan) dan estimasi semua kandidat.
+    """
+    phase_errors = stego.get_phase_errors(original_data)
+    signal_power = float(np.sum(original_data ** 2))
+
+    estimates = []
+    estimate_cache = {}
+    for payload_rate in payload_rates:
+        for threshold in thresholds:
+            embedded_bit_limit = math.ceil(payload_rate + threshold)
+            if embedded_bit_limit not in estimate_cache:
+                estimate_cache[embedded_bit_limit] = estimate_embedding(
+                    phase_errors, secret_length, embedded_bit_limit, signal_power, stego.expected_noise)
+            estimates.append(dict(estimate_cache[embedded_bit_limit],
+                                  payload_rate=payload_rate, threshold=threshold))
+
+    best = select_setting(estimates, target_prd, target_snr)
+    if secret_data is not None:
+        best['embedding'] = stego.embed(original_data, secret_data,
+                                        payload_rate=best['payload_rate'],
+                                        threshold=best['threshold'])
+
+    return best, estimates